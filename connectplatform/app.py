@@ -4,19 +4,22 @@ import uuid
 import os
 import hmac
 import hashlib
-import razorpay
-import requests
-from datetime import datetime
+import base64
+import gzip
+import re
+import time
+import random
+import traceback
+import bisect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
 from boto3.dynamodb.conditions import Attr, Key
-from botocore.exceptions import ClientError
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.config import Config
+from botocore.exceptions import ClientError, ParamValidationError
 from decimal import Decimal
 
-# Initialize AWS clients
-dynamodb = boto3.resource('dynamodb')
-dynamodb_client = boto3.client('dynamodb')
-# Use chime-sdk-meetings instead of the legacy chime service
-chime_client = boto3.client('chime-sdk-meetings')
-
 # Get environment stage, default to prod
 stage = os.environ.get('STAGE', 'prod')
 
@@ -26,69 +29,578 @@ BOOKINGS_TABLE = f'Bookings-{stage}'
 PROFILE_TABLE = f'UserProfiles-{stage}'
 AVAILABILITY_TABLE = f'TeacherAvailability-{stage}'
 SESSION_TABLE = f'Sessions-{stage}'
+SESSION_ITEMS_TABLE = f'SessionItems-{stage}'
 PAYMENTS_TABLE = f'Payments-{stage}'
 RAZORPAY_CONFIG_TABLE = f'RazorPayConfig-{stage}'
+SEARCH_INDEX_TABLE = f'TeacherSearchIndex-{stage}'
+PAYMENT_ROLLUPS_TABLE = f'PaymentRollups-{stage}'
+
+# Upper bound for the 'limit' query parameter on paginated list endpoints
+MAX_PAGE_SIZE = 100
+
+# Most items a list endpoint returns when called without limit/cursor (plain
+# array responses); the rest are reachable through the X-Next-Cursor header
+MAX_UNPAGED_ITEMS = 1000
+
+# HMAC key for pagination cursors so clients cannot forge ExclusiveStartKeys.
+# The stack generates it per stage (CursorSigningSecret); there is deliberately
+# no fallback, so cursors are never signed with a key anyone can read.
+CURSOR_SIGNING_KEY = os.environ.get('CURSOR_SIGNING_KEY', '').encode()
+
+# Response bodies at least this large are gzipped for clients that accept it
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', '1024'))
+
+# Teacher search index: every word prefix between these lengths is indexed
+SEARCH_MIN_PREFIX = 2
+SEARCH_MAX_PREFIX = 20
+# Index entries read by one /search/teachers request before it returns a cursor
+SEARCH_MAX_ENTRIES_READ = 1000
+
+# Open-slot search window (in days) used by get_availabilities
+DEFAULT_OPEN_SLOT_DAYS = 30
+MAX_OPEN_SLOT_DAYS = 90
+
+# Bulk availability creation: most slots one request may create, and the
+# longest a recurrence rule may run
+MAX_BULK_SLOTS = 500
+MAX_RECURRENCE_WEEKS = 52
+
+# Tables whose time attributes (and TTLs) backfill_time_keys normalizes, with
+# their key attribute, and how many parallel scan segments it reads each table in
+TIME_KEY_TABLES = {
+    AVAILABILITY_TABLE: 'availability_id',
+    BOOKINGS_TABLE: 'booking_id',
+    PAYMENTS_TABLE: 'payment_id',
+    SESSION_TABLE: 'session_id',
+}
+DEFAULT_BACKFILL_SEGMENTS = 8
+
+# Archival: items get an expires_at TTL on write; DynamoDB deletes them once it
+# passes and archive_expired_items exports them to ARCHIVE_BUCKET from the stream.
+# Past slots and sessions are kept for a while after they end; abandoned
+# 'initiated' payments only briefly. Completed payments never expire.
+ARCHIVE_BUCKET = os.environ.get('ARCHIVE_BUCKET', f'yoursanskritteacher-archive-{stage}')
+TTL_ATTRIBUTE = 'expires_at'
+AVAILABILITY_RETENTION_DAYS = int(os.environ.get('AVAILABILITY_RETENTION_DAYS', '30'))
+SESSION_RETENTION_DAYS = int(os.environ.get('SESSION_RETENTION_DAYS', '90'))
+INITIATED_PAYMENT_RETENTION_DAYS = int(os.environ.get('INITIATED_PAYMENT_RETENTION_DAYS', '7'))
+
+# Most teachers one /availability/freebusy request may ask about
+MAX_FREEBUSY_TEACHERS = 25
+
+# Longest slot a teacher may publish. Bounding durations lets the overlap check
+# look only at slots starting within this much of a new slot.
+MAX_SLOT_DURATION = timedelta(hours=8)
+
+# How long a warm container reuses the RazorPay config record and client
+RAZORPAY_CACHE_TTL_SECONDS = int(os.environ.get('RAZORPAY_CACHE_TTL_SECONDS', '300'))
+
+# How long a warm container remembers whether Chime accepted optional features
+CHIME_FEATURE_CACHE_TTL_SECONDS = int(os.environ.get('CHIME_FEATURE_CACHE_TTL_SECONDS', '3600'))
+
+# Scheduled meeting warmer/sweeper windows. Chime ends a meeting nobody has
+# joined after about five minutes, so warming much further ahead is wasted.
+MEETING_WARM_AHEAD_MINUTES = int(os.environ.get('MEETING_WARM_AHEAD_MINUTES', '5'))
+MEETING_SWEEP_GRACE_MINUTES = int(os.environ.get('MEETING_SWEEP_GRACE_MINUTES', '15'))
+MEETING_SWEEP_LOOKBACK_HOURS = int(os.environ.get('MEETING_SWEEP_LOOKBACK_HOURS', '24'))
+
+# Join tokens stored on a session are only trusted for the life of a Chime meeting (24h max)
+MEETING_MAX_LIFETIME_SECONDS = 24 * 60 * 60
+
+# SessionItems keys start with the writing container's clock, so an item that
+# commits late can sort before one a poller already has. /sessions/{id}/changes
+# re-reads this far behind the cursor and clients drop item_keys they have seen.
+SESSION_CHANGES_OVERLAP_SECONDS = int(os.environ.get('SESSION_CHANGES_OVERLAP_SECONDS', '30'))
+
+# ========== AWS Clients ==========
+# Clients are created on first use and memoized for the life of the container,
+# so a cold start only pays for the clients the first request actually needs
+# (e.g. /profiles never constructs the Chime or S3 clients). All of them share
+# one botocore Config: bounded timeouts so a slow dependency fails inside the
+# Lambda timeout, kept-alive pooled connections sized for _executor, and
+# adaptive retries that back off client-side when DynamoDB throttles.
+AWS_CLIENT_CONFIG = Config(
+    connect_timeout=float(os.environ.get('AWS_CONNECT_TIMEOUT_SECONDS', '2')),
+    read_timeout=float(os.environ.get('AWS_READ_TIMEOUT_SECONDS', '5')),
+    retries={'max_attempts': int(os.environ.get('AWS_MAX_ATTEMPTS', '5')), 'mode': 'adaptive'},
+    max_pool_connections=int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '16')),
+    tcp_keepalive=True
+)
+
+_aws_clients = {}
+# Reentrant so a factory may itself fetch another memoized client
+_aws_clients_lock = threading.RLock()
+
+# Error codes AWS uses when a request is throttled
+THROTTLING_ERROR_CODES = {
+    'ProvisionedThroughputExceededException', 'ThrottlingException', 'ThrottledClientException',
+    'RequestLimitExceeded', 'TooManyRequestsException', 'SlowDown'
+}
+
+# Retry/throttle counters for the container's lifetime; lambda_handler also
+# tracks them per request (see _request_context) and logs any it sees
+aws_call_stats = {'retries': 0, 'throttles': 0, 'throttle_failures': 0}
+_aws_call_stats_lock = threading.Lock()
+
+def _count_aws_call(name):
+    with _aws_call_stats_lock:
+        aws_call_stats[name] += 1
+        _request_context[name] = _request_context.get(name, 0) + 1
+
+def _on_needs_retry(response=None, attempts=None, **kwargs):
+    """Counts each throttled attempt and each retry botocore decides to make."""
+    if response and response[1].get('Error', {}).get('Code') in THROTTLING_ERROR_CODES:
+        _count_aws_call('throttles')
+
+def _on_after_call(parsed=None, **kwargs):
+    """Counts the retries a finished call needed and calls that still failed throttled."""
+    parsed = parsed or {}
+    for _ in range(parsed.get('ResponseMetadata', {}).get('RetryAttempts', 0)):
+        _count_aws_call('retries')
+    if parsed.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES:
+        _count_aws_call('throttle_failures')
+
+def _instrument(client):
+    """Attaches the retry/throttle counters to a botocore client and returns it."""
+    client.meta.events.register('needs-retry', _on_needs_retry)
+    client.meta.events.register('after-call', _on_after_call)
+    return client
+
+def _memoized_client(name, factory):
+    """Returns the cached client called name, creating it with factory on first use."""
+    client = _aws_clients.get(name)
+    if client is None:
+        with _aws_clients_lock:
+            client = _aws_clients.get(name)
+            if client is None:
+                client = factory()
+                _aws_clients[name] = client
+    return client
+
+def _create_dynamodb():
+    resource = boto3.resource('dynamodb', config=AWS_CLIENT_CONFIG)
+    _instrument(resource.meta.client)
+    return resource
+
+def get_dynamodb():
+    """Returns the shared DynamoDB service resource."""
+    return _memoized_client('dynamodb', _create_dynamodb)
+
+def get_table(name):
+    """Returns the shared Table handle for a DynamoDB table name."""
+    dynamodb = get_dynamodb()
+    return _memoized_client(f'table:{name}', lambda: dynamodb.Table(name))
+
+def get_chime_client():
+    """Returns the shared Chime SDK Meetings client (not the legacy chime service)."""
+    return _memoized_client(
+        'chime-sdk-meetings', lambda: _instrument(boto3.client('chime-sdk-meetings', config=AWS_CLIENT_CONFIG))
+    )
+
+def get_s3_client():
+    """Returns the shared S3 client."""
+    return _memoized_client('s3', lambda: _instrument(boto3.client('s3', config=AWS_CLIENT_CONFIG)))
+
+# ========== Structured Logging ==========
+# One JSON object per log line. LOG_LEVEL (DEBUG, INFO, WARN, ERROR) sets the
+# minimum level; LOG_SAMPLE_RATES is a JSON map of route template (or "*") to
+# the fraction of requests whose DEBUG lines are emitted regardless of level,
+# e.g. '{"/availability": 0.1}'. Log fields are only serialized, and callable
+# field values only evaluated, when the line is actually written.
+LOG_LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARN': 30, 'ERROR': 40}
+LOG_LEVEL = LOG_LEVELS.get(os.environ.get('LOG_LEVEL', 'INFO').upper(), LOG_LEVELS['INFO'])
+try:
+    LOG_SAMPLE_RATES = json.loads(os.environ.get('LOG_SAMPLE_RATES') or '{}')
+except json.JSONDecodeError:
+    LOG_SAMPLE_RATES = {}
+
+# Per-request logging context, reset by lambda_handler on every invocation
+_log_context = {'request_id': None, 'route': None, 'debug_sampled': False}
+
+def set_log_context(request_id=None, route=None):
+    """Starts the logging context for a request and decides whether its debug lines are sampled."""
+    rate = LOG_SAMPLE_RATES.get(route, LOG_SAMPLE_RATES.get('*', 0)) if route else 0
+    try:
+        sampled = random.random() < float(rate)
+    except (TypeError, ValueError):
+        sampled = False
+    _log_context.update(request_id=request_id, route=route, debug_sampled=sampled)
+
+def log_enabled(level):
+    """Returns True if a line at this level would be written for the current request."""
+    if LOG_LEVELS[level] >= LOG_LEVEL:
+        return True
+    return level == 'DEBUG' and _log_context['debug_sampled']
+
+def log(level, message, **fields):
+    """Writes a structured log line with the request context and the given fields."""
+    if not log_enabled(level):
+        return
+    record = {
+        'level': level,
+        'message': message,
+        'request_id': _log_context['request_id'],
+        'route': _log_context['route'],
+    }
+    for name, value in fields.items():
+        record[name] = value() if callable(value) else value
+    print(json.dumps(record, default=str))
+
+def log_debug(message, **fields):
+    log('DEBUG', message, **fields)
+
+def log_info(message, **fields):
+    log('INFO', message, **fields)
+
+def log_warn(message, **fields):
+    log('WARN', message, **fields)
+
+def log_error(message, **fields):
+    log('ERROR', message, **fields)
 
 # ========== Utility Functions for Sanskrit Teacher API ==========
-def convert_decimal(obj):
-    """Recursively converts DynamoDB decimal types to Python floats."""
-    if isinstance(obj, list):
-        return [convert_decimal(i) for i in obj]
-    elif isinstance(obj, dict):
-        return {k: convert_decimal(v) for k, v in obj.items()}
-    elif isinstance(obj, Decimal):
-        return float(obj)
-    return obj
-
-def response_with_cors(status_code, body):
-    """Utility to return responses with CORS headers."""
+class DynamoJSONEncoder(json.JSONEncoder):
+    """JSON encoder for DynamoDB items, converting Decimals and datetimes while serializing.
+
+    Items are encoded in a single pass, with no converted copy built first.
+    Integral Decimals become ints (so 5 stays 5, not 5.0); others become floats.
+    """
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return int(obj) if obj == obj.to_integral_value() else float(obj)
+        if isinstance(obj, (datetime, date)):
+            return obj.isoformat()
+        if isinstance(obj, (set, frozenset)):
+            return list(obj)
+        return super().default(obj)
+
+# Per-request settings that shape the response, reset by lambda_handler on every invocation
+_request_context = {'gzip': False, 'retries': 0, 'throttles': 0, 'throttle_failures': 0}
+
+def accepts_gzip(accept_encoding):
+    """Returns True if an Accept-Encoding header value allows gzip (explicitly or via '*')."""
+    for part in (accept_encoding or '').lower().split(','):
+        name, _, params = part.strip().partition(';')
+        if name.strip() not in ('gzip', '*'):
+            continue
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                return float(quality[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+# Shared pool for overlapping independent AWS calls within a single request.
+# boto3 clients are thread-safe; Table handles only forward calls to the shared client.
+_executor = ThreadPoolExecutor(max_workers=8)
+
+def run_concurrently(*calls):
+    """Runs zero-argument callables in parallel and returns their results in order.
+
+    An exception raised by any call is re-raised to the caller.
+    """
+    futures = [_executor.submit(call) for call in calls]
+    return [future.result() for future in futures]
+
+def get_header(event, name):
+    """Returns a request header by case-insensitive name, or None."""
+    name = name.lower()
+    for key, value in (event.get('headers') or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+def is_condition_conflict(error):
+    """Returns True if a ClientError is a failed condition, directly or inside a cancelled transaction."""
+    code = error.response['Error']['Code']
+    if code == 'ConditionalCheckFailedException':
+        return True
+    if code == 'TransactionCanceledException':
+        reasons = error.response.get('CancellationReasons', [])
+        return any(reason.get('Code') == 'ConditionalCheckFailed' for reason in reasons)
+    return False
+
+def response_with_cors(status_code, body, headers=None):
+    """Utility to return responses with CORS headers (plus any extra headers given)."""
     response = {
         "statusCode": status_code,
         "headers": {
             "Access-Control-Allow-Origin": "*",  # Allow any origin for development, restrict to domain in production
             "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
-            "Access-Control-Allow-Headers": "Content-Type, X-Amz-Date, Authorization, X-Api-Key, X-Amz-Security-Token",
+            "Access-Control-Allow-Headers": "Content-Type, X-Amz-Date, Authorization, X-Api-Key, X-Amz-Security-Token, If-None-Match",
             "Access-Control-Allow-Credentials": "true",
             "Content-Type": "application/json"
         },
-        "body": json.dumps(body)
+        # 304 Not Modified responses must not carry a body
+        "body": json.dumps(body, cls=DynamoJSONEncoder) if status_code != 304 else ""
     }
-
-    # Log response details based on status code
+    if headers:
+        response["headers"].update(headers)
+
+    # Compress large bodies; API Gateway decodes isBase64Encoded bodies to binary
+    # (BinaryMediaTypes is '*/*' in the template)
+    if _request_context['gzip'] and len(response["body"]) >= COMPRESSION_MIN_BYTES:
+        response["body"] = base64.b64encode(gzip.compress(response["body"].encode('utf-8'))).decode('ascii')
+        response["isBase64Encoded"] = True
+        response["headers"]["Content-Encoding"] = "gzip"
+        response["headers"]["Vary"] = "Accept-Encoding"
+
+    # Log response details based on status code. Error bodies are small and worth
+    # keeping; success bodies are only attached to (sampled) debug lines.
     if status_code >= 500:
         # Server error responses
-        print(f"[ERROR] Server error response {status_code}: {json.dumps(body, default=str)}")
+        log_error("Server error response", status_code=status_code, body=body)
     elif status_code >= 400:
         # Client error responses
-        print(f"[WARN] Client error response {status_code}: {json.dumps(body, default=str)}")
-    elif status_code >= 300:
-        # Redirection responses
-        print(f"[INFO] Redirect response {status_code}")
-    elif status_code >= 200:
-        # Success responses - include response body for /availability endpoints to aid debugging
-        if body and isinstance(body, dict):
-            # For availability-related endpoints, log more details even for success
-            if 'availability_id' in body or (isinstance(body, list) and body and 'availability_id' in body[0]):
-                print(f"[INFO] Availability success response {status_code}: {json.dumps(body, default=str)}")
-            else:
-                print(f"[INFO] Success response {status_code}")
-        else:
-            print(f"[INFO] Success response {status_code}")
+        log_warn("Client error response", status_code=status_code, body=body)
     else:
-        # Information responses
-        print(f"[INFO] Informational response {status_code}")
+        log_info("Response", status_code=status_code)
+        log_debug("Response body", body=body)
 
     return response
 
+# ========== Pagination Helpers ==========
+def sign_cursor(payload):
+    """Returns the URL-safe HMAC signature for a cursor payload.
+
+    Raises RuntimeError when CURSOR_SIGNING_KEY is not configured.
+    """
+    if not CURSOR_SIGNING_KEY:
+        raise RuntimeError("CURSOR_SIGNING_KEY is not configured")
+    digest = hmac.new(CURSOR_SIGNING_KEY, payload.encode(), hashlib.sha256).digest()[:16]
+    return base64.urlsafe_b64encode(digest).decode().rstrip('=')
+
+def encode_cursor(last_evaluated_key):
+    """Encodes a DynamoDB LastEvaluatedKey as an opaque, signed, URL-safe cursor token."""
+    if not last_evaluated_key:
+        return None
+    # Keep the DynamoDB type of each key attribute so numeric keys survive the round trip
+    typed_key = {
+        name: {'N': str(value)} if isinstance(value, Decimal) else {'S': value}
+        for name, value in last_evaluated_key.items()
+    }
+    payload = base64.urlsafe_b64encode(json.dumps(typed_key).encode()).decode().rstrip('=')
+    return f"{payload}.{sign_cursor(payload)}"
+
+def decode_cursor(cursor):
+    """Decodes a cursor token produced by encode_cursor into an ExclusiveStartKey.
+
+    Raises ValueError for malformed cursors and for cursors whose signature does not match.
+    """
+    try:
+        payload, _, signature = cursor.partition('.')
+        if not hmac.compare_digest(signature, sign_cursor(payload)):
+            raise ValueError("Invalid pagination cursor")
+        padded = payload + '=' * (-len(payload) % 4)
+        typed_key = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        return {
+            name: Decimal(value['N']) if 'N' in value else value['S']
+            for name, value in typed_key.items()
+        }
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise ValueError("Invalid pagination cursor")
+
+def parse_page_limit(query_params):
+    """Reads the optional 'limit' query parameter, capped at MAX_PAGE_SIZE."""
+    limit = query_params.get('limit')
+    if limit is None:
+        return None
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be a positive integer")
+    if limit <= 0:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, MAX_PAGE_SIZE)
+
+ATTRIBUTE_NAME_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+def projection_kwargs(fields):
+    """Builds ProjectionExpression/ExpressionAttributeNames query arguments reading only fields."""
+    return {
+        'ProjectionExpression': ", ".join(f"#p{i}" for i in range(len(fields))),
+        'ExpressionAttributeNames': {f"#p{i}": field for i, field in enumerate(fields)}
+    }
+
+def parse_fields(query_params):
+    """Reads the optional comma-separated 'fields' query parameter into projection query arguments.
+
+    Returns {} when it is absent, so every attribute is read.
+    """
+    fields = query_params.get('fields')
+    if fields is None:
+        return {}
+    names = list(dict.fromkeys(field.strip() for field in fields.split(',') if field.strip()))
+    if not names or not all(ATTRIBUTE_NAME_PATTERN.match(name) for name in names):
+        raise ValueError("fields must be a comma-separated list of attribute names")
+    return projection_kwargs(names)
+
+def time_range_condition(attribute, start=None, end=None):
+    """Builds an optional sort key condition restricting attribute to [start, end]."""
+    if start and end:
+        return Key(attribute).between(start, end)
+    if start:
+        return Key(attribute).gte(start)
+    if end:
+        return Key(attribute).lte(end)
+    return None
+
+def fetch_page(operation, limit=None, cursor=None, max_items=None, **kwargs):
+    """Runs a DynamoDB query or scan and returns (items, next_cursor).
+
+    Without a limit or cursor pages are followed via LastEvaluatedKey until
+    the results end or max_items have been returned, in which case the cursor
+    to continue from is returned. With either one, a single page is read and
+    the cursor for the following page is returned (None on the last page).
+    """
+    if limit is None and cursor is None:
+        items = []
+        start_key = None
+        key_names = None
+        while True:
+            page_kwargs = dict(kwargs)
+            if start_key:
+                page_kwargs['ExclusiveStartKey'] = start_key
+            if max_items is not None:
+                # A fixed page size, so a sparse filter costs one call per
+                # max_items evaluated rather than ever smaller pages
+                page_kwargs['Limit'] = max_items
+            response = operation(**page_kwargs)
+            page = response['Items']
+            start_key = response.get('LastEvaluatedKey')
+            if start_key:
+                key_names = list(start_key)
+
+            if max_items is not None and len(items) + len(page) > max_items:
+                kept = page[:max_items - len(items)]
+                # Resume after the last item returned; its key attributes are the
+                # ones LastEvaluatedKey carries. A projection that left them out
+                # means the whole page is returned instead.
+                if key_names and all(name in kept[-1] for name in key_names):
+                    return items + kept, encode_cursor({name: kept[-1][name] for name in key_names})
+                return items + page, encode_cursor(start_key)
+
+            items.extend(page)
+            if not start_key:
+                return items, None
+            if max_items is not None and len(items) >= max_items:
+                return items, encode_cursor(start_key)
+
+    if limit is not None:
+        kwargs['Limit'] = limit
+    if cursor:
+        kwargs['ExclusiveStartKey'] = decode_cursor(cursor)
+    response = operation(**kwargs)
+    return response['Items'], encode_cursor(response.get('LastEvaluatedKey'))
+
+def list_response(items, next_cursor, paginated):
+    """Returns a list endpoint response.
+
+    Paginated requests (limit or cursor supplied) get an envelope carrying the
+    next cursor; other requests keep the plain JSON array existing clients
+    expect, with an X-Next-Cursor header when it was cut at MAX_UNPAGED_ITEMS.
+    """
+    if paginated:
+        return response_with_cors(200, {"items": items, "next_cursor": next_cursor})
+    if next_cursor:
+        return response_with_cors(200, items, {
+            "X-Next-Cursor": next_cursor,
+            "Access-Control-Expose-Headers": "X-Next-Cursor"
+        })
+    return response_with_cors(200, items)
+
+# ========== Routing ==========
+# Handlers register themselves with @route. Path templates are compiled into a
+# segment trie once at import time, so dispatch is a dict lookup on
+# (method, resource) when API Gateway supplies the resource template and a
+# single walk of the trie when only the raw path is available.
+ROUTES = {}
+_ROUTE_TRIE = {'literal': {}, 'param': None, 'template': None}
+
+def _add_route_template(template):
+    """Adds a path template such as /bookings/{booking_id}/session to the route trie."""
+    node = _ROUTE_TRIE
+    for segment in template.strip('/').split('/'):
+        if segment.startswith('{') and segment.endswith('}'):
+            if node['param'] is None:
+                node['param'] = (segment[1:-1], {'literal': {}, 'param': None, 'template': None})
+            node = node['param'][1]
+        else:
+            node = node['literal'].setdefault(segment, {'literal': {}, 'param': None, 'template': None})
+    # Aliases such as {booking-id} share the trie path of the first template registered
+    if node['template'] is None:
+        node['template'] = template
+
+def _match_route_segments(node, segments, index, params):
+    """Walks the route trie, preferring literal segments over parameters."""
+    if index == len(segments):
+        return node['template']
+    segment = segments[index]
+    child = node['literal'].get(segment)
+    if child is not None:
+        template = _match_route_segments(child, segments, index + 1, params)
+        if template:
+            return template
+    if node['param'] is not None and segment:
+        name, child = node['param']
+        template = _match_route_segments(child, segments, index + 1, params)
+        if template:
+            params[name] = segment
+            return template
+    return None
+
+def match_route(path):
+    """Matches a request path against the registered templates.
+
+    Returns (template, path_parameters), or (None, {}) when nothing matches.
+    """
+    params = {}
+    template = _match_route_segments(_ROUTE_TRIE, path.strip('/').split('/'), 0, params)
+    return template, params if template else {}
+
+def route(method, *templates):
+    """Decorator registering a handler for a HTTP method and one or more path templates."""
+    def decorator(handler):
+        for template in templates:
+            ROUTES[(method, template)] = handler
+            _add_route_template(template)
+        return handler
+    return decorator
+
+def resolve_route(event):
+    """Finds the handler for an API Gateway event.
+
+    Returns (handler, resource). Path parameters extracted from the raw path are
+    merged into event['pathParameters'] without overwriting ones API Gateway sent.
+    """
+    method = event['httpMethod']
+    resource = event.get('resource')
+
+    handler = ROUTES.get((method, resource))
+    if handler:
+        return handler, resource
+
+    # Proxy resources ({proxy+}) and older API Gateway configs: match the raw path
+    template, params = match_route(event.get('path', ''))
+    if not template:
+        return None, resource
+
+    if params:
+        event['pathParameters'] = {**params, **(event.get('pathParameters') or {})}
+    return ROUTES.get((method, template)), template
+
 # Tables are created by CloudFormation, not by Lambda code
 # This improves Lambda cold-start performance and separates concerns
 
 # ========== Profile Management ==========
+@route('GET', '/profiles', '/profiles/{user_id}')
 def get_user_profile(event):
     """Fetches a user profile from the UserProfiles table."""
     try:
         # Log the full event for debugging
-        print(f"GET profile event: {json.dumps(event)}")
+        log_debug("GET profile event", event=event)
 
         # Get query parameters - handle both regular and path-based API Gateway configs
         query_params = event.get('queryStringParameters', {}) or {}
@@ -109,56 +621,56 @@ def get_user_profile(event):
             if len(path_parts) > 2 and path_parts[1] == 'profiles':
                 user_id = path_parts[2]  # Assuming path format like /profiles/{user_id}
 
-        print(f"Looking up profile for user_id: {user_id}")
+        log_debug("Looking up profile", user_id=user_id)
 
         if not user_id:
             return response_with_cors(400, {"message": "user_id is required to fetch the profile."})
 
         try:
             # Use only the stage-specific table name (e.g. UserProfiles-prod)
-            print(f"Looking up profile in table: {PROFILE_TABLE}")
-            table = dynamodb.Table(PROFILE_TABLE)
+            log_debug("Looking up profile in table", table=PROFILE_TABLE)
+            table = get_table(PROFILE_TABLE)
 
             # Use ConsistentRead for the most up-to-date data
             response = table.get_item(Key={'user_id': user_id}, ConsistentRead=True)
 
             # Log response for debugging
             if 'Item' in response:
-                print(f"Found user profile for {user_id}")
+                log_debug("Found user profile", user_id=user_id)
             else:
-                print(f"No profile found for user {user_id}")
+                log_info("No profile found", user_id=user_id)
 
         except Exception as table_error:
-            print(f"Error accessing table {PROFILE_TABLE}: {str(table_error)}")
+            log_error("Error accessing profiles table", table=PROFILE_TABLE, error=str(table_error))
             return response_with_cors(500, {"message": "Error accessing user profiles database.", "error": str(table_error)})
 
         if 'Item' not in response:
             return response_with_cors(404, {"message": "User profile not found."})
 
-        profile_data = convert_decimal(response['Item'])
-        return response_with_cors(200, {"profile": profile_data})
+        return response_with_cors(200, {"profile": response['Item']})
 
     except Exception as e:
         error_msg = str(e)
-        print(f"Error in get_user_profile: {error_msg}")
+        log_error("Error in get_user_profile", error=error_msg)
         return response_with_cors(500, {"message": "Error fetching profile.", "error": error_msg})
 
+@route('POST', '/profiles')
 def create_user_profile(event):
     """Creates or updates a user profile in the UserProfiles table."""
     try:
-        print(f"Processing profile creation request: {json.dumps(event, default=str)}")
+        log_debug("Processing profile creation request", event=event)
 
         # Check if the body exists and is not empty
         if not event.get('body'):
-            print("Error: Empty request body")
+            log_warn("Empty request body")
             return response_with_cors(400, {"message": "Request body is required."})
 
         # Parse the body with error handling
         try:
             body = json.loads(event['body'])
-            print(f"Parsed request body: {json.dumps(body, default=str)}")
+            log_debug("Parsed request body", body=body)
         except json.JSONDecodeError as json_error:
-            print(f"Error decoding JSON body: {str(json_error)}, Body: {event.get('body', 'None')}")
+            log_warn("Error decoding JSON body", error=str(json_error), body=event.get('body'))
             return response_with_cors(400, {"message": "Invalid JSON in request body."})
 
         # Get user_id and roles from body
@@ -187,10 +699,10 @@ def create_user_profile(event):
             # Direct profile data without nesting
             profile_data = body
 
-        print(f"Profile creation for user_id: {user_id}, roles: {roles}, data: {json.dumps(profile_data, default=str)}")
+        log_debug("Profile creation", user_id=user_id, roles=roles, profile_data=profile_data)
 
         if not user_id:
-            print("Error: Missing user_id in request")
+            log_warn("Missing user_id in request")
             return response_with_cors(400, {"message": "user_id is required to create or update profile."})
 
         # Create profile item with timestamps
@@ -214,13 +726,14 @@ def create_user_profile(event):
                 profile_item[key] = value
 
         # Check if profile already exists
-        table = dynamodb.Table(PROFILE_TABLE)
-        print(f"Checking if user already exists in table: {PROFILE_TABLE}")
+        table = get_table(PROFILE_TABLE)
+        existing_profile = None
+        log_debug("Checking if user already exists", table=PROFILE_TABLE)
         try:
             get_response = table.get_item(Key={'user_id': user_id})
             existing_profile = get_response.get('Item')
             if existing_profile:
-                print(f"Existing profile found for {user_id}, updating")
+                log_info("Existing profile found, updating", user_id=user_id)
                 profile_item['created_at'] = existing_profile['created_at']
                 
                 # Handle migration for existing profiles without 'roles' field
@@ -230,26 +743,28 @@ def create_user_profile(event):
                     if not roles and existing_profile.get('role'):
                         profile_item['roles'] = [existing_profile['role']]
             else:
-                print(f"No existing profile for {user_id}, creating new")
+                log_info("No existing profile, creating new", user_id=user_id)
         except Exception as get_error:
-            print(f"Error checking for existing profile: {str(get_error)}")
+            log_error("Error checking for existing profile", error=str(get_error))
             # Continue with creation even if check fails
 
         # Save the profile
-        print(f"Saving profile to table {PROFILE_TABLE}: {json.dumps(profile_item, default=str)}")
+        log_debug("Saving profile", table=PROFILE_TABLE, profile=profile_item)
         try:
             put_response = table.put_item(Item=profile_item)
-            print(f"Profile saved successfully: {json.dumps(put_response, default=str)}")
+            log_debug("Profile saved", result=put_response)
+            update_teacher_search_index(user_id, existing_profile, profile_item)
             return response_with_cors(201, {"message": "User profile created/updated successfully.", "profile": profile_item})
         except Exception as put_error:
-            print(f"Error saving profile: {str(put_error)}")
+            log_error("Error saving profile", error=str(put_error))
             return response_with_cors(500, {"message": "Error saving profile to database.", "error": str(put_error)})
 
     except Exception as e:
-        print(f"Unexpected error in create_user_profile: {str(e)}")
+        log_error("Unexpected error in create_user_profile", error=str(e))
         return response_with_cors(500, {"message": "Error processing profile data.", "error": str(e)})
 
 # ========== Service Management ==========
+@route('POST', '/services')
 def create_service(event):
     """Creates a new service in the ServiceCatalog table."""
     try:
@@ -261,24 +776,36 @@ def create_service(event):
             'service_id': service_id,
             **body
         }
-        dynamodb.Table(SERVICE_TABLE).put_item(Item=new_service)
+        get_table(SERVICE_TABLE).put_item(Item=new_service)
         return response_with_cors(201, {"message": "Service created successfully", "service_id": service_id})
     except (ClientError, json.JSONDecodeError) as e:
         return response_with_cors(500, {"message": "Error creating service.", "error": str(e)})
 
+@route('GET', '/services')
 def get_services(event):
-    """Retrieves services from the ServiceCatalog table."""
+    """Retrieves services from the ServiceCatalog table, with optional limit/cursor pagination."""
     try:
-        table = dynamodb.Table(SERVICE_TABLE)
-        response = table.scan()
-        services = convert_decimal(response['Items'])
-        return response_with_cors(200, services)
+        query_params = event.get('queryStringParameters', {}) or {}
+        limit = parse_page_limit(query_params)
+        cursor = query_params.get('cursor')
+
+        table = get_table(SERVICE_TABLE)
+        services, next_cursor = fetch_page(table.scan, limit, cursor, MAX_UNPAGED_ITEMS)
+        return list_response(services, next_cursor, limit is not None or cursor is not None)
+    except ValueError as e:
+        return response_with_cors(400, {"message": str(e)})
     except ClientError as e:
         return response_with_cors(500, {"message": "Error fetching services.", "error": str(e)})
 
 # ========== Booking Management ==========
+@route('POST', '/bookings')
 def create_booking(event):
-    """Creates a booking in the Bookings table."""
+    """Creates a booking in the Bookings table.
+
+    The booking is written and the slot flipped to 'booked' in one DynamoDB
+    transaction conditioned on the slot still being available, so concurrent
+    requests for the same slot produce exactly one booking; the rest get a 409.
+    """
     try:
         body = json.loads(event['body'])
 
@@ -293,9 +820,10 @@ def create_booking(event):
         timestamp = datetime.utcnow().isoformat()
 
         # Get the availability record
-        availability_table = dynamodb.Table(AVAILABILITY_TABLE)
+        availability_table = get_table(AVAILABILITY_TABLE)
         availability_response = availability_table.get_item(
-            Key={'availability_id': body['availability_id']}
+            Key={'availability_id': body['availability_id']},
+            ConsistentRead=True
         )
 
         if 'Item' not in availability_response:
@@ -303,9 +831,9 @@ def create_booking(event):
 
         availability = availability_response['Item']
 
-        # Check if the slot is available
+        # Check if the slot is available (the transaction below re-checks atomically)
         if availability['status'] != 'available':
-            return response_with_cors(400, {"message": "This time slot is no longer available"})
+            return response_with_cors(409, {"message": "This time slot is no longer available"})
 
         # Create the booking
         new_booking = {
@@ -327,22 +855,40 @@ def create_booking(event):
         for key, value in body.items():
             if key not in new_booking and key != 'availability_id':
                 new_booking[key] = value
+        with_time_keys(new_booking)
 
-        # Create the booking
-        bookings_table = dynamodb.Table(BOOKINGS_TABLE)
-        bookings_table.put_item(Item=new_booking)
-
-        # Update the availability status to 'booked'
-        availability_table.update_item(
-            Key={'availability_id': body['availability_id']},
-            UpdateExpression="SET #status = :status",
-            ExpressionAttributeNames={
-                '#status': 'status'
-            },
-            ExpressionAttributeValues={
-                ':status': 'booked'
-            }
-        )
+        # Create the booking and mark the slot 'booked' (dropping it from OpenSlotsIndex)
+        # in a single transaction that only succeeds while the slot is still available
+        try:
+            get_dynamodb().meta.client.transact_write_items(TransactItems=[
+                {
+                    'Put': {
+                        'TableName': BOOKINGS_TABLE,
+                        'Item': new_booking,
+                        'ConditionExpression': 'attribute_not_exists(booking_id)'
+                    }
+                },
+                {
+                    'Update': {
+                        'TableName': AVAILABILITY_TABLE,
+                        'Key': {'availability_id': body['availability_id']},
+                        'UpdateExpression': "SET #status = :status REMOVE open_status",
+                        'ConditionExpression': "#status = :available",
+                        'ExpressionAttributeNames': {
+                            '#status': 'status'
+                        },
+                        'ExpressionAttributeValues': {
+                            ':status': 'booked',
+                            ':available': 'available'
+                        }
+                    }
+                }
+            ])
+        except ClientError as e:
+            if is_condition_conflict(e):
+                log_info("Booking conflict, slot already taken", availability_id=body['availability_id'])
+                return response_with_cors(409, {"message": "This time slot is no longer available"})
+            raise
 
         return response_with_cors(201, {
             "message": "Booking created successfully",
@@ -352,135 +898,576 @@ def create_booking(event):
     except (ClientError, json.JSONDecodeError) as e:
         return response_with_cors(500, {"message": "Error creating booking.", "error": str(e)})
 
+@route('GET', '/bookings')
 def get_bookings(event):
-    """Retrieves bookings from the Bookings table."""
+    """Retrieves bookings from the Bookings table.
+
+    Student and teacher lookups query the StudentBookingsIndex and
+    TeacherBookingsIndex GSIs, which are sorted by start_time. Optional
+    start_date/end_date parameters restrict the start_time range,
+    limit/cursor return a single page at a time and fields limits the
+    attributes read.
+    """
     try:
-        query_params = event.get('queryStringParameters', {})
-        table = dynamodb.Table(BOOKINGS_TABLE)
+        query_params = event.get('queryStringParameters', {}) or {}
+        table = get_table(BOOKINGS_TABLE)
+
+        limit = parse_page_limit(query_params)
+        cursor = query_params.get('cursor')
+        start_date = canonical_time_bound(query_params.get('start_date'), 'start_date')
+        end_date = canonical_time_bound(query_params.get('end_date'), 'end_date')
+        projection = parse_fields(query_params)
 
         # Check if filtering by student_id or teacher_id
         if 'student_id' in query_params:
             # Get bookings for a specific student
-            filtered_bookings = table.scan(
-                FilterExpression=Attr('student_id').eq(query_params['student_id'])
-            )
-            bookings = filtered_bookings['Items']
+            index_name = 'StudentBookingsIndex'
+            key_condition = Key('student_id').eq(query_params['student_id'])
         elif 'teacher_id' in query_params:
             # Get bookings for a specific teacher
-            filtered_bookings = table.scan(
-                FilterExpression=Attr('teacher_id').eq(query_params['teacher_id'])
+            index_name = 'TeacherBookingsIndex'
+            key_condition = Key('teacher_id').eq(query_params['teacher_id'])
+        else:
+            index_name = None
+
+        if index_name:
+            range_condition = time_range_condition('start_time', start_date, end_date)
+            if range_condition is not None:
+                key_condition = key_condition & range_condition
+
+            bookings, next_cursor = fetch_page(
+                table.query, limit, cursor, MAX_UNPAGED_ITEMS,
+                IndexName=index_name,
+                KeyConditionExpression=key_condition,
+                **projection
             )
-            bookings = filtered_bookings['Items']
         else:
-            # Get all bookings
-            response = table.scan()
-            bookings = response['Items']
-
-        return response_with_cors(200, convert_decimal(bookings))
+            # Get all bookings, optionally restricted to a start_time range
+            scan_kwargs = {}
+            if start_date and end_date:
+                scan_kwargs['FilterExpression'] = Attr('start_time').between(start_date, end_date)
+            elif start_date:
+                scan_kwargs['FilterExpression'] = Attr('start_time').gte(start_date)
+            elif end_date:
+                scan_kwargs['FilterExpression'] = Attr('start_time').lte(end_date)
+
+            bookings, next_cursor = fetch_page(table.scan, limit, cursor, MAX_UNPAGED_ITEMS, **scan_kwargs, **projection)
+
+        return list_response(bookings, next_cursor, limit is not None or cursor is not None)
+    except ValueError as e:
+        return response_with_cors(400, {"message": str(e)})
     except ClientError as e:
         return response_with_cors(500, {"message": "Error fetching bookings.", "error": str(e)})
 
 # ========== Availability Management ==========
+WEEKDAYS = {'mon': 0, 'tue': 1, 'wed': 2, 'thu': 3, 'fri': 4, 'sat': 5, 'sun': 6}
+
+def parse_slot_time(value, field):
+    """Parses an ISO-8601 slot time into a naive UTC datetime; raises ValueError naming field."""
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f"{field} must be an ISO-8601 timestamp")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def format_slot_time(value):
+    """Formats a UTC datetime the way the web app stores slot times (Date.toISOString)."""
+    return value.strftime('%Y-%m-%dT%H:%M:%S.') + f"{value.microsecond // 1000:03d}Z"
+
+# Time attributes normalized on write, and the numeric epoch-seconds key stored
+# beside each. Canonical UTC strings are fixed width, so they sort the same way
+# as the epochs and string-keyed indexes give correct key-range queries.
+TIME_KEY_ATTRIBUTES = {
+    'start_time': 'start_epoch',
+    'end_time': 'end_epoch',
+    'created_at': 'created_epoch',
+    'updated_at': 'updated_epoch',
+}
+
+def epoch_seconds(value):
+    """Returns a naive UTC datetime as whole seconds since the Unix epoch."""
+    return int(value.replace(tzinfo=timezone.utc).timestamp())
+
+def with_time_keys(item):
+    """Normalizes item's time attributes to canonical UTC and adds their epoch keys, in place.
+
+    Values that do not parse are left untouched and get no epoch key.
+    Returns item.
+    """
+    for attribute, epoch_attribute in TIME_KEY_ATTRIBUTES.items():
+        if not item.get(attribute):
+            continue
+        try:
+            parsed = parse_slot_time(item[attribute], attribute)
+        except ValueError:
+            continue
+        item[attribute] = format_slot_time(parsed)
+        item[epoch_attribute] = epoch_seconds(parsed)
+    return item
+
+def archive_expiry(table_name, item):
+    """Returns the expires_at TTL (epoch seconds) for an item with time keys, or None to keep it."""
+    if table_name == AVAILABILITY_TABLE:
+        base, days = item.get('end_epoch'), AVAILABILITY_RETENTION_DAYS
+    elif table_name == SESSION_TABLE:
+        base, days = item.get('start_epoch'), SESSION_RETENTION_DAYS
+    elif table_name == PAYMENTS_TABLE and item.get('status') == 'initiated':
+        base, days = item.get('created_epoch'), INITIATED_PAYMENT_RETENTION_DAYS
+    else:
+        return None
+    if base is None:
+        return None
+    return int(base) + days * 86400
+
+def with_archive_expiry(table_name, item):
+    """Sets item's expires_at TTL when archive_expiry gives one, in place; returns item."""
+    expires_at = archive_expiry(table_name, item)
+    if expires_at is not None:
+        item[TTL_ATTRIBUTE] = expires_at
+    return item
+
+def canonical_time_bound(value, field):
+    """Normalizes an optional client-supplied time bound (e.g. start_date) to the stored form."""
+    if not value:
+        return None
+    return format_slot_time(parse_slot_time(value, field))
+
+def build_availability_item(teacher_id, start_time, end_time, fields):
+    """Returns a new open availability slot item with normalized time keys and its TTL."""
+    return with_archive_expiry(AVAILABILITY_TABLE, with_time_keys({
+        'availability_id': f"avail-{uuid.uuid4()}",
+        'teacher_id': teacher_id,
+        'start_time': start_time,
+        'end_time': end_time,
+        'topic': fields.get('topic', ''),  # Topic is now optional
+        'description': fields.get('description', ''),
+        'status': 'available',
+        # Sparse key for OpenSlotsIndex, removed once the slot is booked
+        'open_status': 'available',
+        'created_at': datetime.utcnow().isoformat(),
+        'price': fields.get('price', 500),  # Default price is 500 (INR)
+        'currency': fields.get('currency', 'INR'),  # Default currency is INR
+    }))
+
+def expand_recurrence(rule):
+    """Expands a weekly recurrence rule into (start, end) UTC datetimes.
+
+    rule: days (e.g. ["mon", "wed"]), start_time ("18:00", local), duration_minutes,
+    weeks, start_date ("YYYY-MM-DD", local; defaults to today) and
+    utc_offset_minutes (the teacher's offset from UTC, e.g. 330 for IST).
+    """
+    if not isinstance(rule, dict):
+        raise ValueError("recurrence must be an object")
+
+    days = rule.get('days') or []
+    try:
+        weekdays = sorted({WEEKDAYS[str(day).lower()[:3]] for day in days})
+    except KeyError:
+        raise ValueError("recurrence.days must be weekday names such as 'mon' or 'wednesday'")
+    if not weekdays:
+        raise ValueError("recurrence.days is required")
+
+    try:
+        hour, minute = (int(part) for part in str(rule.get('start_time', '')).split(':'))
+        local_time = timedelta(hours=hour, minutes=minute)
+        duration = timedelta(minutes=int(rule.get('duration_minutes', 30)))
+        weeks = int(rule.get('weeks', 1))
+        offset = timedelta(minutes=int(rule.get('utc_offset_minutes', 0)))
+        start_date = (datetime.strptime(rule['start_date'], '%Y-%m-%d') if rule.get('start_date')
+                      else (datetime.utcnow() + offset).replace(hour=0, minute=0, second=0, microsecond=0))
+    except (TypeError, ValueError):
+        raise ValueError("recurrence needs start_time as HH:MM and numeric duration_minutes, weeks and utc_offset_minutes")
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError("recurrence.start_time must be a valid HH:MM time")
+    if duration <= timedelta(0):
+        raise ValueError("recurrence.duration_minutes must be positive")
+    if not 1 <= weeks <= MAX_RECURRENCE_WEEKS:
+        raise ValueError(f"recurrence.weeks must be between 1 and {MAX_RECURRENCE_WEEKS}")
+
+    slots = []
+    for day_offset in range(weeks * 7):
+        day = start_date + timedelta(days=day_offset)
+        if day.weekday() in weekdays:
+            start = day + local_time - offset
+            slots.append((start, start + duration))
+    return slots
+
+def find_slot_conflicts(teacher_id, intervals):
+    """Returns [(start, end, existing)] for each new (start, end) interval that overlaps
+    one of the teacher's existing slots or bookings.
+
+    Existing intervals come from one TeacherAvailabilityIndex and one
+    TeacherBookingsIndex range query around the new intervals; since no slot is
+    longer than MAX_SLOT_DURATION, each new interval is then checked against
+    only the existing ones starting within that window (via bisect).
+    """
+    window_start = format_slot_time(min(start for start, _ in intervals) - MAX_SLOT_DURATION)
+    window_end = format_slot_time(max(end for _, end in intervals))
+
+    def existing_in_window(table_name, index_name, id_field, **kwargs):
+        items, _ = fetch_page(
+            get_table(table_name).query,
+            IndexName=index_name,
+            KeyConditionExpression=Key('teacher_id').eq(teacher_id) & Key('start_time').between(window_start, window_end),
+            **projection_kwargs([id_field, 'start_time', 'end_time', 'status']),
+            **kwargs
+        )
+        return items
+
+    slots, bookings = run_concurrently(
+        lambda: existing_in_window(AVAILABILITY_TABLE, 'TeacherAvailabilityIndex', 'availability_id'),
+        lambda: existing_in_window(BOOKINGS_TABLE, 'TeacherBookingsIndex', 'booking_id',
+                                   FilterExpression=Attr('status').ne('cancelled'))
+    )
+
+    existing = []
+    for item in slots + bookings:
+        try:
+            existing.append((parse_slot_time(item['start_time'], 'start_time'),
+                             parse_slot_time(item['end_time'], 'end_time'), item))
+        except (KeyError, ValueError):
+            # Legacy rows with missing or free-form times cannot be compared
+            continue
+    existing.sort(key=lambda interval: interval[0])
+    existing_starts = [interval[0] for interval in existing]
+
+    conflicts = []
+    for start, end in intervals:
+        first = bisect.bisect_left(existing_starts, start - MAX_SLOT_DURATION)
+        last = bisect.bisect_left(existing_starts, end)
+        for other_start, other_end, item in existing[first:last]:
+            if other_end > start:
+                conflicts.append((start, end, item))
+    return conflicts
+
+def describe_conflicts(conflicts):
+    """Formats find_slot_conflicts results for an API response."""
+    return [{
+        'start_time': format_slot_time(start),
+        'end_time': format_slot_time(end),
+        'conflicts_with': item.get('availability_id') or item.get('booking_id'),
+        'conflict_start_time': item['start_time'],
+        'conflict_end_time': item['end_time']
+    } for start, end, item in conflicts]
+
+def validate_slot_times(times):
+    """Checks that each (start, end, ...) slot is well-formed and that the slots do not overlap each other."""
+    previous_end = None
+    for slot in sorted(times, key=lambda slot: slot[0]):
+        start, end = slot[0], slot[1]
+        if end <= start:
+            raise ValueError(f"Slot starting {format_slot_time(start)} must end after it starts")
+        if end - start > MAX_SLOT_DURATION:
+            raise ValueError(f"Slots may be at most {int(MAX_SLOT_DURATION.total_seconds() // 3600)} hours long")
+        if previous_end is not None and start < previous_end:
+            raise ValueError(f"Slot starting {format_slot_time(start)} overlaps another slot in the request")
+        previous_end = end
+
+def create_availability_bulk(body):
+    """Creates many availability slots from a 'slots' list or a 'recurrence' rule in one request.
+
+    Slots are expanded, validated and checked for overlaps up front, then
+    written with batch_writer, which sends 25-item BatchWriteItem chunks and
+    resubmits unprocessed items.
+    """
+    teacher_id = body['teacher_id']
+    defaults = {key: body[key] for key in ('topic', 'description', 'price', 'currency') if key in body}
+
+    if 'recurrence' in body:
+        times = [(start, end, defaults) for start, end in expand_recurrence(body['recurrence'])]
+    else:
+        if not isinstance(body['slots'], list) or not body['slots']:
+            raise ValueError("slots must be a non-empty list")
+        times = []
+        for index, slot in enumerate(body['slots']):
+            if not isinstance(slot, dict) or 'start_time' not in slot or 'end_time' not in slot:
+                raise ValueError(f"slots[{index}] needs start_time and end_time")
+            start = parse_slot_time(slot['start_time'], f"slots[{index}].start_time")
+            end = parse_slot_time(slot['end_time'], f"slots[{index}].end_time")
+            times.append((start, end, dict(defaults, **{
+                key: slot[key] for key in ('topic', 'description', 'price', 'currency') if key in slot
+            })))
+
+    if len(times) > MAX_BULK_SLOTS:
+        raise ValueError(f"A single request can create at most {MAX_BULK_SLOTS} slots")
+    validate_slot_times(times)
+
+    # Overlaps with existing slots or bookings are rejected, or with
+    # on_conflict='skip' the overlapping new slots are left out
+    on_conflict = body.get('on_conflict', 'reject')
+    if on_conflict not in ('reject', 'skip'):
+        raise ValueError("on_conflict must be 'reject' or 'skip'")
+    conflicts = find_slot_conflicts(teacher_id, [(start, end) for start, end, _ in times]) if times else []
+    if conflicts and on_conflict == 'reject':
+        return response_with_cors(409, {
+            "message": "Some slots overlap existing availability or bookings",
+            "conflicts": describe_conflicts(conflicts)
+        })
+    conflicting_starts = {start for start, _, _ in conflicts}
+    times = [slot for slot in times if slot[0] not in conflicting_starts]
+
+    items = [
+        build_availability_item(teacher_id, format_slot_time(start), format_slot_time(end), fields)
+        for start, end, fields in sorted(times, key=lambda slot: slot[0])
+    ]
+
+    with get_table(AVAILABILITY_TABLE).batch_writer() as batch:
+        for item in items:
+            batch.put_item(Item=item)
+
+    log_info("Created availability slots", teacher_id=teacher_id, count=len(items), skipped=len(conflicting_starts))
+    return response_with_cors(201, {
+        "message": f"{len(items)} availability slots created successfully",
+        "availability_ids": [item['availability_id'] for item in items],
+        "availabilities": items,
+        "skipped": describe_conflicts(conflicts)
+    })
+
+@route('POST', '/availability')
 def create_availability(event):
-    """Creates a new availability slot for a teacher."""
+    """Creates an availability slot for a teacher, or many at once.
+
+    A body with 'slots' (a list of start_time/end_time objects) or 'recurrence'
+    (see expand_recurrence) is handled by create_availability_bulk. Slots that
+    overlap the teacher's existing slots or bookings get a 409.
+    """
     try:
-        print(f"[TRACE] create_availability called with event: {json.dumps(event, default=str)}")
-        
         # Parse the body with error handling
         try:
             body = json.loads(event['body'])
-            print(f"[TRACE] Parsed request body: {json.dumps(body, default=str)}")
         except json.JSONDecodeError as json_error:
-            print(f"[ERROR] Error decoding JSON body: {str(json_error)}, Body: {event.get('body', 'None')}")
+            log_warn("Error decoding JSON body", error=str(json_error), body=event.get('body'))
             return response_with_cors(400, {"message": "Invalid JSON in request body."})
 
+        if 'teacher_id' not in body:
+            log_warn("Missing required field in request", field='teacher_id')
+            return response_with_cors(400, {"message": "Missing required field: teacher_id"})
+
+        if 'slots' in body or 'recurrence' in body:
+            return create_availability_bulk(body)
+
         # Validate required fields
-        required_fields = ['teacher_id', 'start_time', 'end_time']
+        required_fields = ['start_time', 'end_time']
         for field in required_fields:
             if field not in body:
-                print(f"[ERROR] Missing required field in request: {field}")
+                log_warn("Missing required field in request", field=field)
                 return response_with_cors(400, {"message": f"Missing required field: {field}"})
-        
-        print(f"[TRACE] Required fields validation passed")
 
-        # Generate a unique availability ID
-        availability_id = f"avail-{uuid.uuid4()}"
-        timestamp = datetime.utcnow().isoformat()
-        print(f"[TRACE] Generated availability_id: {availability_id}")
+        # Reject slots that overlap the teacher's existing slots or bookings
+        start = parse_slot_time(body['start_time'], 'start_time')
+        end = parse_slot_time(body['end_time'], 'end_time')
+        validate_slot_times([(start, end)])
+        conflicts = find_slot_conflicts(body['teacher_id'], [(start, end)])
+        if conflicts:
+            return response_with_cors(409, {
+                "message": "This slot overlaps existing availability or bookings",
+                "conflicts": describe_conflicts(conflicts)
+            })
 
         # Create the availability record
-        new_availability = {
-            'availability_id': availability_id,
-            'teacher_id': body['teacher_id'],
-            'start_time': body['start_time'],
-            'end_time': body['end_time'],
-            'topic': body.get('topic', ''),  # Topic is now optional
-            'description': body.get('description', ''),
-            'status': 'available',
-            'created_at': timestamp,
-            'price': body.get('price', 500),  # Default price is 500 (INR)
-            'currency': body.get('currency', 'INR'),  # Default currency is INR
-        }
-        
-        print(f"[TRACE] Created base availability record: {json.dumps(new_availability, default=str)}")
+        new_availability = build_availability_item(body['teacher_id'], body['start_time'], body['end_time'], body)
+        availability_id = new_availability['availability_id']
 
         # Add any additional availability data
-        additional_fields = []
         for key, value in body.items():
             if key not in new_availability:
                 new_availability[key] = value
-                additional_fields.append(key)
-        
-        if additional_fields:
-            print(f"[TRACE] Added additional fields to availability record: {', '.join(additional_fields)}")
 
         # Store in DynamoDB
         try:
-            print(f"[TRACE] Storing availability in DynamoDB table: {AVAILABILITY_TABLE}")
-            availability_table = dynamodb.Table(AVAILABILITY_TABLE)
-            result = availability_table.put_item(Item=new_availability)
-            print(f"[TRACE] DynamoDB put_item result: {json.dumps(result, default=str)}")
+            get_table(AVAILABILITY_TABLE).put_item(Item=new_availability)
         except ClientError as db_error:
-            print(f"[ERROR] DynamoDB error creating availability: {str(db_error)}")
+            log_error("DynamoDB error creating availability", error=str(db_error))
             return response_with_cors(500, {"message": "Database error creating availability slot.", "error": str(db_error)})
 
-        print(f"[TRACE] Successfully created availability slot: {availability_id}")
+        log_info("Created availability slot", availability_id=availability_id)
         return response_with_cors(201, {
             "message": "Availability slot created successfully",
             "availability_id": availability_id,
             "availability": new_availability
         })
+    except ValueError as e:
+        return response_with_cors(400, {"message": str(e)})
     except (ClientError, json.JSONDecodeError) as e:
-        print(f"[ERROR] Exception in create_availability: {str(e)}")
+        log_error("Exception in create_availability", error=str(e))
         return response_with_cors(500, {"message": "Error creating availability slot.", "error": str(e)})
     except Exception as unexpected_error:
-        print(f"[ERROR] Unexpected error in create_availability: {str(unexpected_error)}")
+        log_error("Unexpected error in create_availability", error=str(unexpected_error))
         return response_with_cors(500, {"message": "Unexpected error creating availability slot.", "error": str(unexpected_error)})
 
+@route('GET', '/availability')
 def get_availabilities(event):
-    """Retrieves availability slots."""
+    """Retrieves availability slots.
+
+    With teacher_id, queries TeacherAvailabilityIndex for that teacher's slots
+    (optionally restricted by start_date/end_date). Without it, queries the
+    sparse OpenSlotsIndex for open slots starting in the next `days` days.
+    Both paths support limit/cursor pagination and a fields projection.
+    """
     try:
-        query_params = event.get('queryStringParameters', {})
-        table = dynamodb.Table(AVAILABILITY_TABLE)
+        query_params = event.get('queryStringParameters', {}) or {}
+        table = get_table(AVAILABILITY_TABLE)
+
+        limit = parse_page_limit(query_params)
+        cursor = query_params.get('cursor')
+        start_date = canonical_time_bound(query_params.get('start_date'), 'start_date')
+        end_date = canonical_time_bound(query_params.get('end_date'), 'end_date')
+        projection = parse_fields(query_params)
 
         # Check if filtering by teacher_id
         if 'teacher_id' in query_params:
             # Get availability for a specific teacher
-            response = table.scan(
-                FilterExpression=Attr('teacher_id').eq(query_params['teacher_id'])
-            )
-            availabilities = response['Items']
+            index_name = 'TeacherAvailabilityIndex'
+            key_condition = Key('teacher_id').eq(query_params['teacher_id'])
+            range_condition = time_range_condition('start_time', start_date, end_date)
+            if range_condition is not None:
+                key_condition = key_condition & range_condition
         else:
-            # Get all available slots (for student search)
-            response = table.scan(
-                FilterExpression=Attr('status').eq('available')
-            )
-            availabilities = response['Items']
+            # Get open slots in the upcoming window (for student search)
+            try:
+                days = int(query_params.get('days', DEFAULT_OPEN_SLOT_DAYS))
+            except ValueError:
+                raise ValueError("days must be a positive integer")
+            if days <= 0:
+                raise ValueError("days must be a positive integer")
+            days = min(days, MAX_OPEN_SLOT_DAYS)
+
+            now = datetime.utcnow()
+            window_start = start_date or format_slot_time(now)
+            window_end = end_date or format_slot_time(now + timedelta(days=days))
+
+            index_name = 'OpenSlotsIndex'
+            key_condition = Key('open_status').eq('available') & Key('start_time').between(window_start, window_end)
+
+        availabilities, next_cursor = fetch_page(
+            table.query, limit, cursor, MAX_UNPAGED_ITEMS,
+            IndexName=index_name,
+            KeyConditionExpression=key_condition,
+            **projection
+        )
 
-        return response_with_cors(200, convert_decimal(availabilities))
+        return list_response(availabilities, next_cursor, limit is not None or cursor is not None)
+    except ValueError as e:
+        return response_with_cors(400, {"message": str(e)})
     except ClientError as e:
         return response_with_cors(500, {"message": "Error fetching availability slots.", "error": str(e)})
 
+def merge_free_busy(free, busy, window_start, window_end):
+    """Merges free and busy (start, end) intervals into disjoint free and busy blocks.
+
+    A sweep line walks the sorted interval boundaries keeping a count of open
+    free and busy intervals; time is busy while any busy interval is open,
+    free while only free ones are, and a block ends whenever that state changes.
+    Intervals are clipped to [window_start, window_end].
+    """
+    events = []
+    for kind, intervals in (('free', free), ('busy', busy)):
+        for start, end in intervals:
+            start, end = max(start, window_start), min(end, window_end)
+            if start < end:
+                events.append((start, kind, 1))
+                events.append((end, kind, -1))
+    events.sort(key=lambda event: event[0])
+
+    blocks = {'free': [], 'busy': []}
+    open_count = {'free': 0, 'busy': 0}
+    state, state_start = None, None
+    index = 0
+    while index < len(events):
+        # Apply every boundary at this instant before deciding the new state
+        moment = events[index][0]
+        while index < len(events) and events[index][0] == moment:
+            _, kind, delta = events[index]
+            open_count[kind] += delta
+            index += 1
+        new_state = 'busy' if open_count['busy'] else 'free' if open_count['free'] else None
+        if new_state != state:
+            if state is not None:
+                blocks[state].append({'start': format_slot_time(state_start), 'end': format_slot_time(moment)})
+            state, state_start = new_state, moment
+    return blocks
+
+def teacher_free_busy(teacher_id, window_start, window_end):
+    """Returns free/busy blocks and the open slot count for one teacher over a window."""
+    # Slots and bookings that start before the window can still run into it
+    range_start = format_slot_time(window_start - MAX_SLOT_DURATION)
+    range_end = format_slot_time(window_end)
+
+    def intervals(table_name, index_name, **kwargs):
+        items, _ = fetch_page(
+            get_table(table_name).query,
+            IndexName=index_name,
+            KeyConditionExpression=Key('teacher_id').eq(teacher_id) & Key('start_time').between(range_start, range_end),
+            **projection_kwargs(['start_time', 'end_time', 'status']),
+            **kwargs
+        )
+        parsed = []
+        for item in items:
+            try:
+                parsed.append((parse_slot_time(item['start_time'], 'start_time'),
+                               parse_slot_time(item['end_time'], 'end_time'), item.get('status')))
+            except (KeyError, ValueError):
+                continue
+        return parsed
+
+    slots = intervals(AVAILABILITY_TABLE, 'TeacherAvailabilityIndex')
+    bookings = intervals(BOOKINGS_TABLE, 'TeacherBookingsIndex', FilterExpression=Attr('status').ne('cancelled'))
+
+    free = [(start, end) for start, end, status in slots if status == 'available']
+    busy = [(start, end) for start, end, status in slots if status != 'available']
+    busy.extend((start, end) for start, end, _ in bookings)
+
+    blocks = merge_free_busy(free, busy, window_start, window_end)
+    blocks['open_slots'] = sum(1 for start, end in free if start >= window_start and start < window_end)
+    return blocks
+
+@route('GET', '/availability/freebusy')
+def get_free_busy(event):
+    """Returns merged free and busy time blocks for one or more teachers.
+
+    Parameters: teacher_ids (comma separated, or teacher_id), and an optional
+    start_date/end_date window (default: now to DEFAULT_OPEN_SLOT_DAYS ahead).
+    Each teacher's slots and bookings are range-queried and merged on the
+    server, so clients receive a few blocks instead of every slot.
+    """
+    try:
+        query_params = event.get('queryStringParameters', {}) or {}
+        teacher_ids = [teacher_id.strip() for teacher_id in
+                       (query_params.get('teacher_ids') or query_params.get('teacher_id') or '').split(',')
+                       if teacher_id.strip()]
+        teacher_ids = list(dict.fromkeys(teacher_ids))
+        if not teacher_ids:
+            return response_with_cors(400, {"message": "teacher_ids is required"})
+        if len(teacher_ids) > MAX_FREEBUSY_TEACHERS:
+            return response_with_cors(400, {"message": f"At most {MAX_FREEBUSY_TEACHERS} teacher_ids per request"})
+
+        now = datetime.utcnow()
+        window_start = parse_slot_time(query_params['start_date'], 'start_date') if query_params.get('start_date') else now
+        window_end = (parse_slot_time(query_params['end_date'], 'end_date') if query_params.get('end_date')
+                      else window_start + timedelta(days=DEFAULT_OPEN_SLOT_DAYS))
+        if window_end <= window_start:
+            raise ValueError("end_date must be after start_date")
+        if window_end - window_start > timedelta(days=MAX_OPEN_SLOT_DAYS):
+            raise ValueError(f"The window can be at most {MAX_OPEN_SLOT_DAYS} days long")
+
+        results = run_concurrently(*[
+            (lambda teacher_id=teacher_id: teacher_free_busy(teacher_id, window_start, window_end))
+            for teacher_id in teacher_ids
+        ])
+
+        return response_with_cors(200, {
+            "start": format_slot_time(window_start),
+            "end": format_slot_time(window_end),
+            "teachers": dict(zip(teacher_ids, results))
+        })
+    except ValueError as e:
+        return response_with_cors(400, {"message": str(e)})
+    except ClientError as e:
+        return response_with_cors(500, {"message": "Error computing free/busy times.", "error": str(e)})
+
+@route('DELETE', '/availability/{id}')
 def delete_availability(event):
     """Deletes an availability slot."""
     try:
@@ -490,7 +1477,7 @@ def delete_availability(event):
             return response_with_cors(400, {"message": "Missing availability ID"})
 
         # Check if the availability exists
-        table = dynamodb.Table(AVAILABILITY_TABLE)
+        table = get_table(AVAILABILITY_TABLE)
         response = table.get_item(Key={'availability_id': availability_id})
 
         if 'Item' not in response:
@@ -509,7 +1496,152 @@ def delete_availability(event):
     except ClientError as e:
         return response_with_cors(500, {"message": "Error deleting availability slot.", "error": str(e)})
 
+def backfill_open_slots(event, context):
+    """Direct-invocation entry point that adds open_status to existing open slots.
+
+    Slots created before OpenSlotsIndex existed lack the sparse key and do not
+    show up in student search until this has been run once per stage.
+    """
+    table = get_table(AVAILABILITY_TABLE)
+    scan_kwargs = {
+        'FilterExpression': Attr('status').eq('available') & Attr('open_status').not_exists(),
+        'ProjectionExpression': 'availability_id'
+    }
+    updated = 0
+
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response['Items']:
+            try:
+                table.update_item(
+                    Key={'availability_id': item['availability_id']},
+                    UpdateExpression="SET open_status = :open",
+                    ConditionExpression=Attr('status').eq('available'),
+                    ExpressionAttributeValues={':open': 'available'}
+                )
+                updated += 1
+            except ClientError as e:
+                # The slot was booked while the backfill was running
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    log_info("Backfilled open_status on availability slots", updated=updated)
+    return {"updated": updated}
+
+def backfill_time_keys_segment(table_name, key_attribute, segment, total_segments):
+    """Normalizes time attributes and sets missing TTLs on one parallel scan segment; returns the items updated."""
+    table = get_table(table_name)
+    attributes = [key_attribute, 'status', TTL_ATTRIBUTE] + list(TIME_KEY_ATTRIBUTES) + list(TIME_KEY_ATTRIBUTES.values())
+    scan_kwargs = {
+        'Segment': segment,
+        'TotalSegments': total_segments,
+        **projection_kwargs(attributes)
+    }
+    updated = 0
+
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response['Items']:
+            normalized = with_time_keys(dict(item))
+            if TTL_ATTRIBUTE not in item:
+                with_archive_expiry(table_name, normalized)
+            changes = {key: value for key, value in normalized.items() if item.get(key) != value}
+            if not changes:
+                continue
+
+            # Only rewrite values that are still what the scan saw, so a
+            # concurrent write is never overwritten with stale times
+            condition = Attr(key_attribute).exists()
+            if TTL_ATTRIBUTE in changes and 'status' in item:
+                # A payment verified since the scan must not get the initiated-payment TTL
+                condition &= Attr('status').eq(item['status'])
+            for attribute in changes:
+                condition &= Attr(attribute).eq(item[attribute]) if attribute in item else Attr(attribute).not_exists()
+            try:
+                table.update_item(
+                    Key={key_attribute: item[key_attribute]},
+                    UpdateExpression="SET " + ", ".join(f"#t{i} = :t{i}" for i in range(len(changes))),
+                    ConditionExpression=condition,
+                    ExpressionAttributeNames={f"#t{i}": attribute for i, attribute in enumerate(changes)},
+                    ExpressionAttributeValues={f":t{i}": value for i, value in enumerate(changes.values())}
+                )
+                updated += 1
+            except ClientError as e:
+                # Deleted or rewritten since the scan; new writes are already normalized
+                if not is_condition_conflict(e):
+                    raise
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    return updated
+
+def backfill_time_keys(event, context):
+    """Direct-invocation entry point that normalizes time attributes on existing items.
+
+    Items written before time keys were normalized on write may hold offset or
+    naive ISO strings and lack the *_epoch attributes, so they are missed by
+    StatusCreatedIndex and can sort wrongly in start_time ranges. Items that
+    would now get an expires_at TTL on write get one too. Each table is
+    scanned in event['segments'] (default 8) parallel segments. Safe to re-run.
+    """
+    total_segments = int((event or {}).get('segments', DEFAULT_BACKFILL_SEGMENTS))
+    jobs = [
+        (table_name, key_attribute, segment)
+        for table_name, key_attribute in TIME_KEY_TABLES.items()
+        for segment in range(total_segments)
+    ]
+    results = run_concurrently(*[
+        (lambda job=job: backfill_time_keys_segment(*job, total_segments))
+        for job in jobs
+    ])
+
+    updated = {table_name: 0 for table_name in TIME_KEY_TABLES}
+    for (table_name, _, _), count in zip(jobs, results):
+        updated[table_name] += count
+    log_info("Backfilled time keys", updated=updated)
+    return {"updated": updated}
+
 # ========== Session Management ==========
+# Session attributes never sent to clients: the participants' stored join
+# tokens, and the notes/documents lists sessions carried before SessionItems
+PRIVATE_SESSION_ATTRIBUTES = ('chime_attendees', 'chime_attendees_expire_at', 'notes', 'shared_documents')
+
+def public_session(session):
+    """Returns the session summary sent to clients; notes and documents are read from /sessions/{id}/items."""
+    return {key: value for key, value in session.items() if key not in PRIVATE_SESSION_ATTRIBUTES}
+
+def new_session_id(start_time):
+    """Returns a fresh session ID carrying the session's start date (session-YYYYMMDD-<uuid>)."""
+    try:
+        start = parse_slot_time(start_time, 'start_time')
+    except ValueError:
+        start = datetime.utcnow()
+    return f"session-{start.strftime('%Y%m%d')}-{uuid.uuid4()}"
+
+def build_session_item(booking_id, teacher_id, student_id, start_time=None):
+    """Returns a new session item for a booking with a fresh session ID and its TTL."""
+    timestamp = datetime.utcnow().isoformat()
+    return with_archive_expiry(SESSION_TABLE, with_time_keys({
+        'session_id': new_session_id(start_time or timestamp),
+        'booking_id': booking_id,
+        'teacher_id': teacher_id,
+        'student_id': student_id,
+        'start_time': start_time or timestamp,
+        'status': 'active',
+        'recording_url': '',
+        'note_count': 0,
+        'document_count': 0,
+        'version': 0,
+        'created_at': timestamp,
+    }))
+
+@route('POST', '/sessions')
 def create_session(event):
     """Creates a new virtual session."""
     try:
@@ -521,41 +1653,30 @@ def create_session(event):
             if field not in body:
                 return response_with_cors(400, {"message": f"Missing required field: {field}"})
 
-        # Generate a unique session ID
-        session_id = f"session-{uuid.uuid4()}"
-        timestamp = datetime.utcnow().isoformat()
-
         # Create the session record
-        new_session = {
-            'session_id': session_id,
-            'booking_id': body['booking_id'],
-            'teacher_id': body['teacher_id'],
-            'student_id': body['student_id'],
-            'start_time': body.get('start_time', timestamp),
-            'status': 'active',
-            'recording_url': '',
-            'notes': [],
-            'shared_documents': [],
-            'created_at': timestamp,
-        }
+        new_session = build_session_item(
+            body['booking_id'], body['teacher_id'], body['student_id'], body.get('start_time')
+        )
+        session_id = new_session['session_id']
 
         # Add any additional session data
         for key, value in body.items():
-            if key not in new_session:
+            if key not in new_session and key not in PRIVATE_SESSION_ATTRIBUTES:
                 new_session[key] = value
 
         # Store in DynamoDB
-        session_table = dynamodb.Table(SESSION_TABLE)
+        session_table = get_table(SESSION_TABLE)
         session_table.put_item(Item=new_session)
 
         return response_with_cors(201, {
             "message": "Session created successfully",
             "session_id": session_id,
-            "session": new_session
+            "session": public_session(new_session)
         })
     except (ClientError, json.JSONDecodeError) as e:
         return response_with_cors(500, {"message": "Error creating session.", "error": str(e)})
 
+@route('GET', '/sessions/{id}')
 def get_session(event):
     """Retrieves a specific session."""
     try:
@@ -564,21 +1685,42 @@ def get_session(event):
         if not session_id:
             return response_with_cors(400, {"message": "Missing session ID"})
 
-        # Get the session
-        table = dynamodb.Table(SESSION_TABLE)
+        # Get the session, falling back to the archive once it has expired
+        table = get_table(SESSION_TABLE)
         response = table.get_item(Key={'session_id': session_id})
 
-        if 'Item' not in response:
-            return response_with_cors(404, {"message": "Session not found"})
-
-        session = convert_decimal(response['Item'])
+        if 'Item' in response:
+            session = public_session(response['Item'])
+        else:
+            archived = read_archived_session(session_id) if session_id_may_be_archived(session_id) else None
+            if not archived:
+                return response_with_cors(404, {"message": "Session not found"})
+            session = public_session(archived)
+            session["archived"] = True
 
         return response_with_cors(200, session)
     except ClientError as e:
         return response_with_cors(500, {"message": "Error fetching session.", "error": str(e)})
 
+def build_session_child_item(session_id, item_type, fields, timestamp, suffix=None):
+    """Returns a SessionItems record; item_key sorts by time, then type, then a unique suffix."""
+    item = {
+        'session_id': session_id,
+        'item_key': f"{timestamp}#{item_type}#{suffix or uuid.uuid4().hex[:8]}",
+        'item_type': item_type,
+        'timestamp': timestamp,
+    }
+    item.update(fields)
+    return item
+
+@route('PUT', '/sessions/{id}')
 def update_session(event):
-    """Updates a session with notes, documents, or recording URL."""
+    """Updates a session with notes, documents, or recording URL.
+
+    Notes and documents are written as SessionItems children in the same
+    transaction that updates the session's counters, so an update is a single
+    write with no reads and the session item stays small.
+    """
     try:
         session_id = event.get('pathParameters', {}).get('id')
 
@@ -586,84 +1728,420 @@ def update_session(event):
             return response_with_cors(400, {"message": "Missing session ID"})
 
         body = json.loads(event['body'])
-
-        # Get the current session
-        table = dynamodb.Table(SESSION_TABLE)
-        response = table.get_item(Key={'session_id': session_id})
-
-        if 'Item' not in response:
-            return response_with_cors(404, {"message": "Session not found"})
+        timestamp = datetime.utcnow().isoformat()
 
         # Prepare update expressions based on what's provided
-        update_expression = "SET "
+        set_clauses = []
+        add_clauses = []
         expression_names = {}
         expression_values = {}
+        child_items = []
 
-        # Handle notes (append to existing)
+        # Handle notes (stored as a child item)
         if 'note' in body:
-            new_note = {
+            child_items.append(build_session_child_item(session_id, 'note', {
                 'text': body['note'],
-                'timestamp': datetime.utcnow().isoformat(),
                 'author_id': body.get('author_id', 'unknown')
-            }
-            update_expression += "#notes = list_append(if_not_exists(#notes, :empty_list), :new_note), "
-            expression_names["#notes"] = "notes"
-            expression_values[":empty_list"] = []
-            expression_values[":new_note"] = [new_note]
+            }, timestamp))
+            add_clauses.append("note_count :one")
 
-        # Handle shared documents (append to existing)
+        # Handle shared documents (stored as a child item)
         if 'document' in body:
-            new_document = {
+            child_items.append(build_session_child_item(session_id, 'document', {
                 'url': body['document'],
                 'name': body.get('document_name', 'Untitled'),
-                'timestamp': datetime.utcnow().isoformat(),
                 'author_id': body.get('author_id', 'unknown')
-            }
-            update_expression += "#docs = list_append(if_not_exists(#docs, :empty_list), :new_doc), "
-            expression_names["#docs"] = "shared_documents"
-            expression_values[":empty_list"] = []
-            expression_values[":new_doc"] = [new_document]
+            }, timestamp))
+            add_clauses.append("document_count :one")
+
+        if child_items:
+            set_clauses.append("last_item_at = :last_item_at")
+            expression_values[":last_item_at"] = timestamp
 
         # Handle recording URL (replace)
         if 'recording_url' in body:
-            update_expression += "#rec = :rec, "
+            set_clauses.append("#rec = :rec")
             expression_names["#rec"] = "recording_url"
             expression_values[":rec"] = body['recording_url']
 
         # Handle status change
         if 'status' in body:
-            update_expression += "#status = :status, "
+            set_clauses.append("#status = :status")
             expression_names["#status"] = "status"
             expression_values[":status"] = body['status']
 
         # Check if any updates were provided
-        if update_expression == "SET ":
+        if not set_clauses:
             return response_with_cors(400, {"message": "No updates provided"})
 
-        # Remove trailing comma and space
-        update_expression = update_expression[:-2]
+        # Every change bumps the session version that /sessions/{id}/changes uses as its ETag
+        add_clauses.append("version :one")
+        expression_values[":one"] = 1
 
-        # Update the session
-        table.update_item(
-            Key={'session_id': session_id},
-            UpdateExpression=update_expression,
-            ExpressionAttributeNames=expression_names,
-            ExpressionAttributeValues=expression_values,
-            ReturnValues="ALL_NEW"
-        )
+        update_expression = "SET " + ", ".join(set_clauses) + " ADD " + ", ".join(add_clauses)
 
-        # Get the updated session
-        updated_response = table.get_item(Key={'session_id': session_id})
-        updated_session = convert_decimal(updated_response['Item'])
+        session_update = {
+            'Key': {'session_id': session_id},
+            'UpdateExpression': update_expression,
+            'ConditionExpression': "attribute_exists(session_id)",
+            'ExpressionAttributeValues': expression_values
+        }
+        if expression_names:
+            session_update['ExpressionAttributeNames'] = expression_names
+
+        try:
+            if child_items:
+                # Update the session and add its new notes/documents in one transaction
+                get_dynamodb().meta.client.transact_write_items(TransactItems=[
+                    {'Update': dict(session_update, TableName=SESSION_TABLE)}
+                ] + [
+                    {'Put': {'TableName': SESSION_ITEMS_TABLE, 'Item': item}} for item in child_items
+                ])
+                return response_with_cors(200, {
+                    "message": "Session updated successfully",
+                    "session_id": session_id,
+                    "items": child_items
+                })
+
+            table = get_table(SESSION_TABLE)
+            response = table.update_item(ReturnValues="ALL_NEW", **session_update)
+        except ClientError as e:
+            if is_condition_conflict(e):
+                return response_with_cors(404, {"message": "Session not found"})
+            raise
 
         return response_with_cors(200, {
             "message": "Session updated successfully",
-            "session": updated_session
+            "session_id": session_id,
+            "session": public_session(response['Attributes']),
+            "items": []
         })
     except (ClientError, json.JSONDecodeError) as e:
         return response_with_cors(500, {"message": "Error updating session.", "error": str(e)})
 
+@route('GET', '/sessions/{id}/items')
+def get_session_items(event):
+    """Lists a session's notes and shared documents in time order.
+
+    Optional parameters: since (return only items after this ISO timestamp),
+    type ('note' or 'document'), and limit/cursor for paging.
+    """
+    try:
+        session_id = event.get('pathParameters', {}).get('id')
+
+        if not session_id:
+            return response_with_cors(400, {"message": "Missing session ID"})
+
+        query_params = event.get('queryStringParameters', {}) or {}
+        limit = parse_page_limit(query_params)
+        cursor = query_params.get('cursor')
+        since = query_params.get('since')
+        item_type = query_params.get('type')
+
+        if item_type and item_type not in ('note', 'document'):
+            return response_with_cors(400, {"message": "type must be 'note' or 'document'"})
+
+        key_condition = Key('session_id').eq(session_id)
+        if since:
+            # '$' sorts just after the '#' separator, so items stamped exactly
+            # at 'since' are skipped and anything later is included
+            key_condition = key_condition & Key('item_key').gt(f"{since}$")
+
+        query_kwargs = {'KeyConditionExpression': key_condition}
+        if item_type:
+            query_kwargs['FilterExpression'] = Attr('item_type').eq(item_type)
+
+        table = get_table(SESSION_ITEMS_TABLE)
+        items, next_cursor = fetch_page(table.query, limit, cursor, MAX_UNPAGED_ITEMS, **query_kwargs)
+
+        return list_response(items, next_cursor, limit is not None or cursor is not None)
+    except ValueError as e:
+        return response_with_cors(400, {"message": str(e)})
+    except ClientError as e:
+        return response_with_cors(500, {"message": "Error fetching session items.", "error": str(e)})
+
+# Session fields returned with every /sessions/{id}/changes response
+SESSION_CHANGE_FIELDS = ['status', 'recording_url', 'note_count', 'document_count', 'last_item_at', 'version']
+
+def session_changes_bound(cursor):
+    """Returns the item_key lower bound for a /changes cursor: its timestamp less the overlap window."""
+    try:
+        timestamp = datetime.fromisoformat(cursor.split('#', 1)[0])
+    except ValueError:
+        raise ValueError("since must be a cursor returned by /sessions/{id}/changes")
+    return (timestamp - timedelta(seconds=SESSION_CHANGES_OVERLAP_SECONDS)).isoformat()
+
+@route('GET', '/sessions/{id}/changes')
+def get_session_changes(event):
+    """Returns the notes and documents added to a session after a cursor, for live polling.
+
+    The response's ETag is the session version; sending it back in
+    If-None-Match gets a bodyless 304 while nothing has changed, which costs
+    one small projected read. Otherwise the new items are returned with the
+    cursor (the last item_key) to send as 'since' on the next poll. Items from
+    the SESSION_CHANGES_OVERLAP_SECONDS before the cursor are returned again.
+    At most MAX_UNPAGED_ITEMS items are returned at once; when more remain,
+    next_cursor is set and is sent back as 'cursor' (with the same 'since')
+    for the following page.
+    """
+    try:
+        session_id = event.get('pathParameters', {}).get('id')
+
+        if not session_id:
+            return response_with_cors(400, {"message": "Missing session ID"})
+
+        query_params = event.get('queryStringParameters', {}) or {}
+        since = query_params.get('since')
+        page_cursor = query_params.get('cursor')
+
+        sessions_table = get_table(SESSION_TABLE)
+        session_response = sessions_table.get_item(
+            Key={'session_id': session_id},
+            **projection_kwargs(SESSION_CHANGE_FIELDS)
+        )
+
+        if 'Item' not in session_response:
+            return response_with_cors(404, {"message": "Session not found"})
+
+        summary = session_response['Item']
+        etag = f'"{summary.get("version", 0)}"'
+        headers = {"ETag": etag, "Access-Control-Expose-Headers": "ETag"}
+
+        if get_header(event, 'If-None-Match') == etag:
+            return response_with_cors(304, None, headers)
+
+        key_condition = Key('session_id').eq(session_id)
+        if since:
+            key_condition = key_condition & Key('item_key').gt(session_changes_bound(since))
+
+        items_table = get_table(SESSION_ITEMS_TABLE)
+        items, next_cursor = fetch_page(
+            items_table.query,
+            MAX_UNPAGED_ITEMS if page_cursor else None,
+            page_cursor,
+            MAX_UNPAGED_ITEMS,
+            KeyConditionExpression=key_condition
+        )
+
+        return response_with_cors(200, {
+            "session": summary,
+            "items": items,
+            "cursor": items[-1]['item_key'] if items else since,
+            "next_cursor": next_cursor
+        }, headers)
+    except ValueError as e:
+        return response_with_cors(400, {"message": str(e)})
+    except ClientError as e:
+        return response_with_cors(500, {"message": "Error fetching session changes.", "error": str(e)})
+
+def migrate_session_items(event, context):
+    """Direct-invocation entry point that moves embedded notes/shared_documents lists into SessionItems.
+
+    Sessions written before SessionItems existed keep their notes on the
+    session item; this copies them out, sets the counters and removes the lists.
+    """
+    sessions_table = get_table(SESSION_TABLE)
+    items_table = get_table(SESSION_ITEMS_TABLE)
+    scan_kwargs = {
+        'FilterExpression': Attr('notes').exists() | Attr('shared_documents').exists()
+    }
+    migrated = 0
+
+    while True:
+        response = sessions_table.scan(**scan_kwargs)
+        for session in response['Items']:
+            notes = session.get('notes') or []
+            documents = session.get('shared_documents') or []
+
+            # Keys are derived from the list position, so a re-run after a
+            # partial failure overwrites rather than duplicates
+            with items_table.batch_writer() as batch:
+                for item_type, entries in (('note', notes), ('document', documents)):
+                    for position, entry in enumerate(entries):
+                        fields = {key: value for key, value in entry.items() if key != 'timestamp'}
+                        batch.put_item(Item=build_session_child_item(
+                            session['session_id'], item_type, fields,
+                            entry.get('timestamp', session.get('created_at', '')),
+                            suffix=f"legacy{position:04d}"
+                        ))
+
+            sessions_table.update_item(
+                Key={'session_id': session['session_id']},
+                UpdateExpression="ADD note_count :notes, document_count :documents REMOVE notes, shared_documents",
+                ExpressionAttributeValues={':notes': len(notes), ':documents': len(documents)}
+            )
+            migrated += 1
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    log_info("Migrated session notes and documents to SessionItems", sessions=migrated)
+    return {"migrated": migrated}
+
+# ========== Archival ==========
+# Archive prefix for each table with a TTL. Objects are gzipped NDJSON under
+# <prefix>/month=YYYY-MM/; archived sessions are also stored one per object,
+# by session_id and by booking_id, for the read-through in get_session and
+# get_booking_session.
+ARCHIVE_PREFIXES = {
+    AVAILABILITY_TABLE: 'availability',
+    PAYMENTS_TABLE: 'payments',
+    SESSION_TABLE: 'sessions',
+}
+
+# Meeting state and join tokens are useless once a meeting has ended and are not archived
+ARCHIVE_DROPPED_ATTRIBUTES = ('chime_meeting_id', 'chime_meeting_data', 'chime_attendees', 'chime_attendees_expire_at')
+
+_deserializer = TypeDeserializer()
+
+def is_ttl_removal(record):
+    """Returns True if a DynamoDB stream record is a deletion made by TTL expiry."""
+    identity = record.get('userIdentity') or {}
+    return (record.get('eventName') == 'REMOVE'
+            and identity.get('type') == 'Service'
+            and identity.get('principalId') == 'dynamodb.amazonaws.com')
+
+def archive_month(item):
+    """Returns the YYYY-MM partition an archived item belongs to, from its start_time or created_at."""
+    for attribute in ('start_time', 'created_at'):
+        try:
+            return parse_slot_time(item[attribute], attribute).strftime('%Y-%m')
+        except (KeyError, ValueError):
+            continue
+    return datetime.utcnow().strftime('%Y-%m')
+
+def put_archive_object(key, body):
+    """Writes gzip-compressed text to ARCHIVE_BUCKET."""
+    get_s3_client().put_object(
+        Bucket=ARCHIVE_BUCKET,
+        Key=key,
+        Body=gzip.compress(body.encode('utf-8')),
+        ContentType='application/x-ndjson',
+        ContentEncoding='gzip'
+    )
+
+# Set once this container finds that ARCHIVE_BUCKET does not exist (stacks
+# deployed with UseExistingResources=true create no archive bucket)
+_archive_bucket_missing = False
+
+def archive_available():
+    """Returns True if archived items can be read: ARCHIVE_BUCKET is set and not known to be missing."""
+    return bool(ARCHIVE_BUCKET) and not _archive_bucket_missing
+
+def archive_read(read):
+    """Runs an S3 read against ARCHIVE_BUCKET, returning None when the object or bucket does not exist."""
+    global _archive_bucket_missing
+    if not archive_available():
+        return None
+    try:
+        return read(get_s3_client())
+    except ClientError as e:
+        code = e.response['Error']['Code']
+        if code == 'NoSuchBucket':
+            log_error("Archive bucket does not exist; archive lookups disabled", bucket=ARCHIVE_BUCKET)
+            _archive_bucket_missing = True
+            return None
+        if code in ('NoSuchKey', '404'):
+            return None
+        raise
+
+def read_archive_object(key):
+    """Returns the JSON record stored at key in ARCHIVE_BUCKET, or None if there is none."""
+    response = archive_read(lambda s3: s3.get_object(Bucket=ARCHIVE_BUCKET, Key=key))
+    if response is None:
+        return None
+    return json.loads(gzip.decompress(response['Body'].read()), parse_float=Decimal)
+
+def archive_expired_items(event, context):
+    """DynamoDB Streams entry point that exports items deleted by TTL expiry to S3.
+
+    The stream's old image is the item as it was just before deletion. Records
+    are grouped into one gzipped NDJSON object per table and month, named after
+    the batch's first event so a retried batch overwrites rather than duplicates.
+    Failures are raised so Lambda retries the batch while it is still in the stream.
+    """
+    groups = {}
+    sessions = []
+    for record in event.get('Records', []):
+        if not is_ttl_removal(record):
+            continue
+        table_name = record['eventSourceARN'].split('/')[1]
+        prefix = ARCHIVE_PREFIXES.get(table_name)
+        if not prefix:
+            continue
+
+        item = {
+            name: _deserializer.deserialize(value)
+            for name, value in record['dynamodb'].get('OldImage', {}).items()
+            if name not in ARCHIVE_DROPPED_ATTRIBUTES
+        }
+        group = groups.setdefault((prefix, archive_month(item)), {'event_id': record['eventID'], 'items': []})
+        group['items'].append(item)
+        if table_name == SESSION_TABLE:
+            sessions.append(item)
+
+    writes = [
+        (lambda prefix=prefix, month=month, group=group: put_archive_object(
+            f"{prefix}/month={month}/{group['event_id']}.ndjson.gz",
+            "".join(json.dumps(item, cls=DynamoJSONEncoder) + "\n" for item in group['items'])
+        ))
+        for (prefix, month), group in groups.items()
+    ]
+    for session in sessions:
+        body = json.dumps(session, cls=DynamoJSONEncoder)
+        writes.append(lambda session=session, body=body: put_archive_object(
+            f"sessions/by-id/{session['session_id']}.json.gz", body
+        ))
+        if session.get('booking_id'):
+            # Keyed by creation time so the newest archived session for a booking sorts last
+            writes.append(lambda session=session, body=body: put_archive_object(
+                f"sessions/by-booking/{session['booking_id']}/"
+                f"{int(session.get('created_epoch') or 0):010d}-{session['session_id']}.json.gz",
+                body
+            ))
+    run_concurrently(*writes)
+
+    archived = sum(len(group['items']) for group in groups.values())
+    log_info("Archived expired items", items=archived, objects=len(writes))
+    return {"archived": archived}
+
+def read_archived_session(session_id):
+    """Returns an archived session by ID, or None."""
+    return read_archive_object(f"sessions/by-id/{session_id}.json.gz")
+
+def session_id_may_be_archived(session_id):
+    """Returns True if a session ID's start date is old enough for its TTL to have passed.
+
+    IDs from before new_session_id carried the date are always looked up.
+    """
+    match = re.match(r'session-(\d{8})-', session_id)
+    if not match:
+        return True
+    try:
+        start = datetime.strptime(match.group(1), '%Y%m%d')
+    except ValueError:
+        return True
+    return start < datetime.utcnow() - timedelta(days=SESSION_RETENTION_DAYS)
+
+def session_may_be_archived(booking):
+    """Returns True if a booking started long enough ago for its sessions' TTL to have passed."""
+    try:
+        start = parse_slot_time(booking['start_time'], 'start_time')
+    except (KeyError, ValueError):
+        return True
+    return start < datetime.utcnow() - timedelta(days=SESSION_RETENTION_DAYS)
+
+def read_archived_booking_session(booking_id):
+    """Returns the newest archived session for a booking, or None."""
+    response = archive_read(lambda s3: s3.list_objects_v2(
+        Bucket=ARCHIVE_BUCKET, Prefix=f"sessions/by-booking/{booking_id}/"
+    ))
+    keys = sorted(entry['Key'] for entry in (response or {}).get('Contents', []))
+    return read_archive_object(keys[-1]) if keys else None
+
 # ========== S3 Presigned URLs ==========
+@route('POST', '/presigned-url')
 def generate_presigned_url(event):
     """Generates a pre-signed URL for S3 uploads."""
     try:
@@ -671,8 +2149,8 @@ def generate_presigned_url(event):
         file_type = body.get('file_type', 'image/jpeg')
         file_name = body.get('file_name', f"image-{uuid.uuid4()}.jpg")
 
-        # Initialize S3 client
-        s3_client = boto3.client('s3')
+        # Reuse the container's S3 client
+        s3_client = get_s3_client()
 
         # Define the bucket and key
         bucket_name = 'yoursanskritteacher-uploads-prod'  # Production bucket name
@@ -693,7 +2171,7 @@ def generate_presigned_url(event):
 
         # Construct the public URL that will be accessible after upload
         # Use the S3 URL format with region - this is more reliable
-        region = boto3.session.Session().region_name or 'us-east-1'
+        region = s3_client.meta.region_name or 'us-east-1'
         public_url = f"https://{bucket_name}.s3.{region}.amazonaws.com/{key}"
 
         return response_with_cors(200, {
@@ -701,99 +2179,310 @@ def generate_presigned_url(event):
             'public_url': public_url
         })
     except Exception as e:
-        print(f"Error generating presigned URL: {str(e)}")
+        log_error("Error generating presigned URL", error=str(e))
         return response_with_cors(500, {"message": "Error generating upload URL", "error": str(e)})
 
 # ========== Video Meeting Management ==========
-def create_chime_meeting(event):
-    """Creates a new Amazon Chime meeting for a session."""
-    try:
-        body = json.loads(event['body'])
-        session_id = body.get('session_id')
-
-        if not session_id:
-            return response_with_cors(400, {"message": "session_id is required"})
-
-        # Get the session to verify it exists
-        sessions_table = dynamodb.Table(SESSION_TABLE)
-        session_response = sessions_table.get_item(Key={'session_id': session_id})
-
-        if 'Item' not in session_response:
-            return response_with_cors(404, {"message": "Session not found"})
-
-        session = session_response['Item']
-
-        # Create a unique meeting ID based on the session
-        external_meeting_id = f"session-meeting-{session_id}"
-
-        # Check if a meeting already exists for this session
+# Chime rejects MeetingFeatures / attendee Capabilities in some regions and
+# accounts. Rather than paying for a failed call on every join, remember per
+# container (for CHIME_FEATURE_CACHE_TTL_SECONDS) whether each API accepted them.
+_chime_feature_support = {}
+
+# Errors that mean "try again later", never "this parameter is unsupported"
+CHIME_TRANSIENT_ERRORS = {
+    'ThrottlingException', 'ThrottledClientException', 'ServiceUnavailableException',
+    'ServiceFailureException', 'LimitExceededException', 'InternalServerError'
+}
+
+def is_chime_capability_error(error):
+    """Returns True if error means Chime (or botocore) rejected the optional feature parameters."""
+    if isinstance(error, ParamValidationError):
+        # An older botocore that does not know the parameter at all
+        return True
+    if not isinstance(error, ClientError):
+        return False
+    code = error.response.get('Error', {}).get('Code', '')
+    status = error.response.get('ResponseMetadata', {}).get('HTTPStatusCode', 400)
+    if code in CHIME_TRANSIENT_ERRORS or status >= 500:
+        return False
+    return code in ('BadRequestException', 'ValidationException')
+
+def chime_feature_supported(api):
+    """Returns the cached feature support for a Chime API: True, False or None if unknown."""
+    entry = _chime_feature_support.get(api)
+    if entry is None or entry[1] <= time.time():
+        return None
+    return entry[0]
+
+def remember_chime_feature_support(api, supported):
+    _chime_feature_support[api] = (supported, time.time() + CHIME_FEATURE_CACHE_TTL_SECONDS)
+
+def call_with_chime_features(api, with_features, without_features):
+    """Calls a Chime API with optional features, falling back to the plain call when they are rejected.
+
+    Once an API is known to reject the features the doomed first attempt is
+    skipped until the cache entry expires. Transient errors are raised as-is.
+    """
+    if chime_feature_supported(api) is not False:
+        try:
+            result = with_features()
+            remember_chime_feature_support(api, True)
+            return result
+        except (ClientError, ParamValidationError) as e:
+            if not is_chime_capability_error(e):
+                raise
+            log_warn("Chime rejected optional features, retrying without them", api=api, error=str(e))
+
+        # Only cache the rejection if the plain call works; otherwise the
+        # request itself was bad and the features were not the problem
+        result = without_features()
+        remember_chime_feature_support(api, False)
+        return result
+
+    return without_features()
+
+def ensure_chime_meeting(session, sessions_table, create_attendees=False):
+    """Returns (meeting, created) for a session item, reusing its active Chime meeting if there is one.
+
+    A newly created meeting is stored on the session item (and on the session
+    dict passed in) so later calls can find it. With create_attendees, the
+    teacher's and student's join tokens are created in one batch call and
+    stored alongside it.
+    """
+    chime_client = get_chime_client()
+    session_id = session['session_id']
+
+    # Check if a meeting already exists for this session
+    if session.get('chime_meeting_id'):
         try:
             # Try to get an existing meeting
             existing_meeting = chime_client.get_meeting(
-                MeetingId=session.get('chime_meeting_id', '')
+                MeetingId=session['chime_meeting_id']
             )
 
             # If we got here, the meeting exists and is active
-            return response_with_cors(200, {
-                "meeting": existing_meeting['Meeting'],
-                "session_id": session_id
-            })
+            return existing_meeting['Meeting'], False
         except (chime_client.exceptions.NotFoundException, chime_client.exceptions.BadRequestException, chime_client.exceptions.ForbiddenException):
             # Meeting doesn't exist or invalid ID, create a new one
-            print(f"Meeting not found or not valid, creating a new one")
-            pass
+            log_info("Meeting not found or not valid, creating a new one", session_id=session_id)
         except Exception as e:
             # Some other error occurred, likely the meeting_id is invalid
             # We'll create a new meeting
-            print(f"Error getting existing meeting: {str(e)}")
+            log_warn("Error getting existing meeting", error=str(e))
+
+    # Create a unique meeting ID based on the session
+    external_meeting_id = f"session-meeting-{session_id}"
+
+    # Create a new Chime meeting, with meeting features where Chime accepts them
+    meeting_response = call_with_chime_features(
+        'create_meeting',
+        lambda: chime_client.create_meeting(
+            ClientRequestToken=str(uuid.uuid4()),
+            ExternalMeetingId=external_meeting_id,
+            MediaRegion='us-east-1',  # Specify your preferred region
+            MeetingFeatures={
+                'Audio': {
+                    'EchoReduction': 'AVAILABLE'
+                },
+                'Video': {
+                    'MaxResolution': 'HD'
+                },
+                'Content': {
+                    'MaxResolution': 'FHD'
+                }
+            }
+        ),
+        lambda: chime_client.create_meeting(
+            ClientRequestToken=str(uuid.uuid4()),
+            ExternalMeetingId=external_meeting_id,
+            MediaRegion='us-east-1'  # Specify your preferred region
+        )
+    )
+    log_debug("Created meeting", meeting=meeting_response)
+
+    meeting = meeting_response['Meeting']
 
-        # Create a new Chime meeting with meeting features
+    attendees = {}
+    if create_attendees:
         try:
-            meeting_response = chime_client.create_meeting(
-                ClientRequestToken=str(uuid.uuid4()),
-                ExternalMeetingId=external_meeting_id,
-                MediaRegion='us-east-1',  # Specify your preferred region
-                MeetingFeatures={
-                    'Audio': {
-                        'EchoReduction': 'AVAILABLE'
-                    },
-                    'Video': {
-                        'MaxResolution': 'HD'
-                    },
-                    'Content': {
-                        'MaxResolution': 'FHD'
-                    }
-                }
-            )
-            print(f"Successfully created meeting with features: {json.dumps(meeting_response, default=str)}")
-        except Exception as e:
-            print(f"Error creating meeting with features: {str(e)}")
-            # Fallback to basic meeting if features are not supported
-            meeting_response = chime_client.create_meeting(
-                ClientRequestToken=str(uuid.uuid4()),
-                ExternalMeetingId=external_meeting_id,
-                MediaRegion='us-east-1'  # Specify your preferred region
+            attendees = create_meeting_attendees(
+                meeting['MeetingId'], [session['teacher_id'], session['student_id']]
             )
-            print(f"Created basic meeting without features: {json.dumps(meeting_response, default=str)}")
+        except ClientError as e:
+            # Participants can still get a token one at a time when they join
+            log_warn("Error creating session attendees", session_id=session_id, error=str(e))
+
+    # Update the session with the Chime meeting ID; tokens from any previous
+    # meeting are replaced since they cannot join this one
+    expires_at = int(time.time()) + MEETING_MAX_LIFETIME_SECONDS
+    sessions_table.update_item(
+        Key={'session_id': session_id},
+        UpdateExpression=(
+            "SET chime_meeting_id = :meeting_id, chime_meeting_data = :meeting_data, "
+            "chime_attendees = :attendees, chime_attendees_expire_at = :expires_at"
+        ),
+        ExpressionAttributeValues={
+            ':meeting_id': meeting['MeetingId'],
+            ':meeting_data': json.dumps(meeting),
+            ':attendees': attendees,
+            ':expires_at': expires_at
+        }
+    )
+    session['chime_meeting_id'] = meeting['MeetingId']
+    session['chime_meeting_data'] = json.dumps(meeting)
+    session['chime_attendees'] = attendees
+    session['chime_attendees_expire_at'] = expires_at
+
+    return meeting, True
+
+def create_meeting_attendees(meeting_id, user_ids):
+    """Creates attendees for several users in one BatchCreateAttendee call.
+
+    Returns a dict of user_id to Attendee; users Chime reported errors for are left out.
+    """
+    chime_client = get_chime_client()
+    capabilities = {
+        'Audio': 'SendReceive',
+        'Video': 'SendReceive',
+        'Content': 'SendReceive'
+    }
 
-        # Update the session with the Chime meeting ID
-        sessions_table.update_item(
-            Key={'session_id': session_id},
-            UpdateExpression="SET chime_meeting_id = :meeting_id, chime_meeting_data = :meeting_data",
-            ExpressionAttributeValues={
-                ':meeting_id': meeting_response['Meeting']['MeetingId'],
-                ':meeting_data': json.dumps(meeting_response['Meeting'])
+    response = call_with_chime_features(
+        'batch_create_attendee',
+        lambda: chime_client.batch_create_attendee(
+            MeetingId=meeting_id,
+            Attendees=[{'ExternalUserId': user_id, 'Capabilities': capabilities} for user_id in user_ids]
+        ),
+        lambda: chime_client.batch_create_attendee(
+            MeetingId=meeting_id,
+            Attendees=[{'ExternalUserId': user_id} for user_id in user_ids]
+        )
+    )
+
+    for error in response.get('Errors', []):
+        log_warn("Chime rejected attendee", user_id=error.get('ExternalUserId'), error=error.get('ErrorMessage'))
+
+    return {attendee['ExternalUserId']: attendee for attendee in response.get('Attendees', [])}
+
+def stored_attendee(session, user_id):
+    """Returns the join token stored on a session for user_id, or None if there is none or it has expired."""
+    attendee = (session.get('chime_attendees') or {}).get(user_id)
+    if attendee is None or int(session.get('chime_attendees_expire_at', 0)) <= time.time():
+        return None
+    return attendee
+
+def store_attendee(session, user_id, attendee, sessions_table):
+    """Saves a join token on the session, as long as it still belongs to the session's current meeting."""
+    update_kwargs = {
+        'Key': {'session_id': session['session_id']},
+        'ConditionExpression': "chime_meeting_id = :meeting_id",
+        'ExpressionAttributeValues': {':meeting_id': session['chime_meeting_id']}
+    }
+    if 'chime_attendees' in session:
+        update_kwargs['UpdateExpression'] = "SET chime_attendees.#user_id = :attendee"
+        update_kwargs['ExpressionAttributeNames'] = {'#user_id': user_id}
+        update_kwargs['ExpressionAttributeValues'][':attendee'] = attendee
+    else:
+        # Meetings created before tokens were stored have no map to add to yet
+        update_kwargs['UpdateExpression'] = "SET chime_attendees = :attendees, chime_attendees_expire_at = :expires_at"
+        update_kwargs['ExpressionAttributeValues'][':attendees'] = {user_id: attendee}
+        update_kwargs['ExpressionAttributeValues'][':expires_at'] = int(time.time()) + MEETING_MAX_LIFETIME_SECONDS
+
+    try:
+        sessions_table.update_item(**update_kwargs)
+    except ClientError as e:
+        # The meeting was replaced in the meantime; the token is useless now
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+
+def join_meeting_as(session, user_id, sessions_table, refresh=False, reconnect=False):
+    """Returns (meeting, attendee) for a participant joining a session.
+
+    A join first checks with Chime that the stored meeting is still live (an
+    unjoined meeting ends after about five minutes), recreating it if not, and
+    then serves the stored join token for it. Only a reconnect to a meeting the
+    participant was just in is served from storage without calling Chime.
+    refresh (for a token Chime rejected) always creates and stores a new token.
+    """
+    if reconnect and not refresh:
+        attendee = stored_attendee(session, user_id)
+        if attendee is not None and session.get('chime_meeting_data'):
+            return json.loads(session['chime_meeting_data']), attendee
+
+    meeting, created = ensure_chime_meeting(session, sessions_table, create_attendees=True)
+
+    # Stored tokens belong to the meeting just verified or created
+    attendee = None if refresh and not created else stored_attendee(session, user_id)
+    if attendee is None:
+        attendee = create_meeting_attendee(meeting['MeetingId'], user_id)
+        store_attendee(session, user_id, attendee, sessions_table)
+
+    return meeting, attendee
+
+def create_meeting_attendee(meeting_id, user_id):
+    """Creates a Chime attendee for user_id in an existing meeting and returns the Attendee."""
+    chime_client = get_chime_client()
+
+    # Create an attendee, with capabilities where Chime accepts them
+    attendee_response = call_with_chime_features(
+        'create_attendee',
+        lambda: chime_client.create_attendee(
+            MeetingId=meeting_id,
+            ExternalUserId=user_id,
+            Capabilities={
+                'Audio': 'SendReceive',
+                'Video': 'SendReceive',
+                'Content': 'SendReceive'
             }
+        ),
+        lambda: chime_client.create_attendee(
+            MeetingId=meeting_id,
+            ExternalUserId=user_id
         )
+    )
 
-        return response_with_cors(201, {
-            "meeting": meeting_response['Meeting'],
+    return attendee_response['Attendee']
+
+def get_display_name(user_id):
+    """Returns the profile name shown for a meeting participant."""
+    profiles_table = get_table(PROFILE_TABLE)
+    profile_response = profiles_table.get_item(
+        Key={'user_id': user_id},
+        ProjectionExpression='#name',
+        ExpressionAttributeNames={'#name': 'name'}
+    )
+    return profile_response.get('Item', {}).get('name', 'Participant')
+
+@route('POST', '/meetings')
+def create_chime_meeting(event):
+    """Creates a new Amazon Chime meeting for a session."""
+    try:
+        body = json.loads(event['body'])
+        session_id = body.get('session_id')
+
+        if not session_id:
+            return response_with_cors(400, {"message": "session_id is required"})
+
+        # Get the session to verify it exists
+        sessions_table = get_table(SESSION_TABLE)
+        session_response = sessions_table.get_item(Key={'session_id': session_id})
+
+        if 'Item' not in session_response:
+            return response_with_cors(404, {"message": "Session not found"})
+
+        meeting, created = ensure_chime_meeting(
+            session_response['Item'], sessions_table, create_attendees=bool(body.get('create_attendees'))
+        )
+
+        return response_with_cors(201 if created else 200, {
+            "meeting": meeting,
             "session_id": session_id
         })
     except (ClientError, json.JSONDecodeError) as e:
-        print(f"Error creating Chime meeting: {str(e)}")
+        log_error("Error creating Chime meeting", error=str(e))
         return response_with_cors(500, {"message": "Error creating video meeting.", "error": str(e)})
 
+@route('POST', '/attendees')
 def create_chime_attendee(event):
     """Creates a new attendee for an existing Chime meeting."""
     try:
@@ -805,7 +2494,7 @@ def create_chime_attendee(event):
             return response_with_cors(400, {"message": "session_id and user_id are required"})
 
         # Get the session to verify it exists and get the meeting ID
-        sessions_table = dynamodb.Table(SESSION_TABLE)
+        sessions_table = get_table(SESSION_TABLE)
         session_response = sessions_table.get_item(Key={'session_id': session_id})
 
         if 'Item' not in session_response:
@@ -821,45 +2510,78 @@ def create_chime_attendee(event):
         if user_id != session['teacher_id'] and user_id != session['student_id']:
             return response_with_cors(403, {"message": "User is not authorized to join this session"})
 
-        # Get user profile to include name
-        profiles_table = dynamodb.Table(PROFILE_TABLE)
-        profile_response = profiles_table.get_item(Key={'user_id': user_id})
+        def get_attendee():
+            # Serve the stored join token unless the client asks for a fresh one
+            attendee = None if body.get('refresh') else stored_attendee(session, user_id)
+            if attendee is None:
+                attendee = create_meeting_attendee(meeting_id, user_id)
+                store_attendee(session, user_id, attendee, sessions_table)
+            return attendee
 
-        if 'Item' in profile_response:
-            user_name = profile_response['Item'].get('name', 'Participant')
-        else:
-            user_name = 'Participant'
-
-        # Create an attendee with the new SDK
-        try:
-            attendee_response = chime_client.create_attendee(
-                MeetingId=meeting_id,
-                ExternalUserId=user_id,
-                Capabilities={
-                    'Audio': 'SendReceive',
-                    'Video': 'SendReceive',
-                    'Content': 'SendReceive'
-                }
-            )
-        except Exception as e:
-            print(f"Error creating attendee with capabilities: {str(e)}")
-            # Fallback to basic attendee creation without capabilities if needed
-            attendee_response = chime_client.create_attendee(
-                MeetingId=meeting_id,
-                ExternalUserId=user_id
-            )
+        # Get the attendee and look up the display name at the same time
+        attendee, user_name = run_concurrently(get_attendee, lambda: get_display_name(user_id))
 
         return response_with_cors(201, {
-            "attendee": attendee_response['Attendee'],
+            "attendee": attendee,
             "meeting_id": meeting_id,
             "user_name": user_name
         })
     except (ClientError, json.JSONDecodeError) as e:
-        print(f"Error creating Chime attendee: {str(e)}")
+        log_error("Error creating Chime attendee", error=str(e))
         return response_with_cors(500, {"message": "Error joining video meeting.", "error": str(e)})
 
+@route('POST', '/sessions/{id}/join')
+def join_session(event):
+    """Joins a virtual session in a single request.
+
+    Reads the session once and, alongside the display-name lookup, serves the
+    participant's stored join token or ensures the meeting and creates one.
+    Replaces the GET /sessions/{id}, POST /meetings, POST /attendees sequence
+    on class start. Pass "refresh": true when Chime rejected the token, and
+    "reconnect": true to rejoin a meeting the participant was just connected to.
+    """
+    try:
+        session_id = (event.get('pathParameters') or {}).get('id')
+        if not session_id:
+            return response_with_cors(400, {"message": "Missing session ID"})
+
+        body = json.loads(event.get('body') or '{}')
+        user_id = body.get('user_id')
+        if not user_id:
+            return response_with_cors(400, {"message": "user_id is required"})
+
+        sessions_table = get_table(SESSION_TABLE)
+        session_response = sessions_table.get_item(Key={'session_id': session_id})
+
+        if 'Item' not in session_response:
+            return response_with_cors(404, {"message": "Session not found"})
+
+        session = session_response['Item']
+
+        # Verify the user is either the teacher or student for this session
+        if user_id != session['teacher_id'] and user_id != session['student_id']:
+            return response_with_cors(403, {"message": "User is not authorized to join this session"})
+
+        (meeting, attendee), user_name = run_concurrently(
+            lambda: join_meeting_as(session, user_id, sessions_table, refresh=bool(body.get('refresh')),
+                                    reconnect=bool(body.get('reconnect'))),
+            lambda: get_display_name(user_id)
+        )
+
+        return response_with_cors(200, {
+            "session": public_session(session),
+            "meeting": meeting,
+            "attendee": attendee,
+            "user_name": user_name
+        })
+    except (ClientError, json.JSONDecodeError) as e:
+        log_error("Error joining session", error=str(e))
+        return response_with_cors(500, {"message": "Error joining virtual session.", "error": str(e)})
+
+@route('GET', '/meetings/{session_id}')
 def get_chime_meeting(event):
     """Gets the details of a Chime meeting for a session."""
+    chime_client = get_chime_client()
     try:
         session_id = event.get('pathParameters', {}).get('session_id')
 
@@ -871,7 +2593,7 @@ def get_chime_meeting(event):
             return response_with_cors(400, {"message": "session_id is required"})
 
         # Get the session to verify it exists
-        sessions_table = dynamodb.Table(SESSION_TABLE)
+        sessions_table = get_table(SESSION_TABLE)
         session_response = sessions_table.get_item(Key={'session_id': session_id})
 
         if 'Item' not in session_response:
@@ -921,7 +2643,7 @@ def get_chime_meeting(event):
                     "message": "No active meeting found for this session"
                 })
             except Exception as e:
-                print(f"Error getting Chime meeting: {str(e)}")
+                log_error("Error getting Chime meeting", error=str(e))
                 # We'll return a response indicating no active meeting
                 return response_with_cors(200, {
                     "session_id": session_id,
@@ -936,9 +2658,38 @@ def get_chime_meeting(event):
             "message": "No meeting has been created for this session yet"
         })
     except Exception as e:
-        print(f"Error in get_chime_meeting: {str(e)}")
+        log_error("Error in get_chime_meeting", error=str(e))
         return response_with_cors(500, {"message": "Error getting meeting information.", "error": str(e)})
 
+def release_chime_meeting(session_id, meeting_id, sessions_table):
+    """Deletes a session's Chime meeting and clears it from the session.
+
+    Returns False if Chime had already ended the meeting. The session is only
+    cleared while it still points at meeting_id, so a meeting that was
+    recreated in the meantime is left alone.
+    """
+    chime_client = get_chime_client()
+    try:
+        chime_client.delete_meeting(MeetingId=meeting_id)
+        deleted = True
+    except (chime_client.exceptions.NotFoundException, chime_client.exceptions.BadRequestException, chime_client.exceptions.ForbiddenException):
+        # Meeting doesn't exist anymore or is invalid, just update the session
+        log_info("Meeting not found or already ended, cleaning up session data", session_id=session_id)
+        deleted = False
+
+    try:
+        sessions_table.update_item(
+            Key={'session_id': session_id},
+            UpdateExpression="REMOVE chime_meeting_id, chime_meeting_data, chime_attendees, chime_attendees_expire_at",
+            ConditionExpression=Attr('chime_meeting_id').eq(meeting_id)
+        )
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+
+    return deleted
+
+@route('DELETE', '/meetings')
 def end_chime_meeting(event):
     """Ends an active Chime meeting for a session."""
     try:
@@ -949,7 +2700,7 @@ def end_chime_meeting(event):
             return response_with_cors(400, {"message": "session_id is required"})
 
         # Get the session to verify it exists
-        sessions_table = dynamodb.Table(SESSION_TABLE)
+        sessions_table = get_table(SESSION_TABLE)
         session_response = sessions_table.get_item(Key={'session_id': session_id})
 
         if 'Item' not in session_response:
@@ -965,135 +2716,390 @@ def end_chime_meeting(event):
 
         # End the meeting with the new SDK
         try:
-            chime_client.delete_meeting(
-                MeetingId=meeting_id
-            )
-
-            # Update the session to remove meeting data
-            sessions_table.update_item(
-                Key={'session_id': session_id},
-                UpdateExpression="REMOVE chime_meeting_id, chime_meeting_data"
-            )
-
-            return response_with_cors(200, {
-                "message": "Meeting ended successfully",
-                "session_id": session_id
-            })
-        except (chime_client.exceptions.NotFoundException, chime_client.exceptions.BadRequestException, chime_client.exceptions.ForbiddenException):
-            # Meeting doesn't exist anymore or is invalid, just update the session
-            print(f"Meeting not found or already ended, cleaning up session data")
-            sessions_table.update_item(
-                Key={'session_id': session_id},
-                UpdateExpression="REMOVE chime_meeting_id, chime_meeting_data"
-            )
+            if release_chime_meeting(session_id, meeting_id, sessions_table):
+                return response_with_cors(200, {
+                    "message": "Meeting ended successfully",
+                    "session_id": session_id
+                })
 
             return response_with_cors(200, {
                 "message": "Meeting was already ended",
                 "session_id": session_id
             })
         except Exception as e:
-            print(f"Error ending Chime meeting: {str(e)}")
+            log_error("Error ending Chime meeting", error=str(e))
             return response_with_cors(500, {"message": "Error ending meeting.", "error": str(e)})
     except (ClientError, json.JSONDecodeError) as e:
-        print(f"Error in end_chime_meeting: {str(e)}")
+        log_error("Error in end_chime_meeting", error=str(e))
         return response_with_cors(500, {"message": "Error processing request.", "error": str(e)})
 
+def query_booked_between(start, end):
+    """Returns every booked booking whose start_time falls in [start, end], via UpcomingBookingsIndex."""
+    bookings_table = get_table(BOOKINGS_TABLE)
+    items, _ = fetch_page(
+        bookings_table.query,
+        IndexName='UpcomingBookingsIndex',
+        KeyConditionExpression=Key('status').eq('booked') & Key('start_time').between(start, end)
+    )
+    return items
+
+def latest_booking_session(booking_id):
+    """Returns the newest session for a booking, or None."""
+    sessions_table = get_table(SESSION_TABLE)
+    response = sessions_table.query(
+        IndexName='BookingSessionsIndex',
+        KeyConditionExpression=Key('booking_id').eq(booking_id),
+        ScanIndexForward=False,
+        Limit=1
+    )
+    return response['Items'][0] if response['Items'] else None
+
+def warm_upcoming_meetings(event, context):
+    """Scheduled entry point that provisions sessions and Chime meetings for bookings about to start.
+
+    Bookings starting within MEETING_WARM_AHEAD_MINUTES get a session (written
+    in one batch) and a Chime meeting stored on it, so the class-start join
+    only has to read them.
+    """
+    now = datetime.utcnow()
+    bookings = query_booked_between(
+        format_slot_time(now), format_slot_time(now + timedelta(minutes=MEETING_WARM_AHEAD_MINUTES))
+    )
+    sessions_table = get_table(SESSION_TABLE)
+
+    existing = run_concurrently(*[
+        (lambda booking_id=booking['booking_id']: latest_booking_session(booking_id))
+        for booking in bookings
+    ])
+
+    sessions = []
+    new_sessions = []
+    for booking, session in zip(bookings, existing):
+        if session is None:
+            session = build_session_item(
+                booking['booking_id'], booking['teacher_id'], booking['student_id'], booking['start_time']
+            )
+            new_sessions.append(session)
+        sessions.append(session)
+
+    if new_sessions:
+        with sessions_table.batch_writer() as batch:
+            for session in new_sessions:
+                batch.put_item(Item=session)
+
+    def warm(session):
+        try:
+            _, created = ensure_chime_meeting(session, sessions_table, create_attendees=True)
+            return created
+        except Exception as e:
+            log_error("Error warming meeting", session_id=session['session_id'], error=str(e))
+            return False
+
+    created = run_concurrently(*[(lambda session=session: warm(session)) for session in sessions])
+
+    log_info(
+        "Warmed upcoming meetings",
+        bookings=len(bookings), sessions_created=len(new_sessions), meetings_created=sum(created)
+    )
+    return {"bookings": len(bookings), "sessions_created": len(new_sessions), "meetings_created": sum(created)}
+
+def sweep_ended_meetings(event, context):
+    """Scheduled entry point that deletes the Chime meetings of sessions that have ended.
+
+    Does the same cleanup as DELETE /meetings for bookings that ended more than
+    MEETING_SWEEP_GRACE_MINUTES ago (looking back MEETING_SWEEP_LOOKBACK_HOURS).
+    """
+    now = datetime.utcnow()
+    cutoff = format_slot_time(now - timedelta(minutes=MEETING_SWEEP_GRACE_MINUTES))
+    bookings = [
+        booking for booking in query_booked_between(
+            format_slot_time(now - timedelta(hours=MEETING_SWEEP_LOOKBACK_HOURS)), cutoff
+        )
+        if booking.get('end_time') and booking['end_time'] < cutoff
+    ]
+    sessions_table = get_table(SESSION_TABLE)
+
+    def sweep(booking):
+        try:
+            session = latest_booking_session(booking['booking_id'])
+            if session and session.get('chime_meeting_id'):
+                release_chime_meeting(session['session_id'], session['chime_meeting_id'], sessions_table)
+                return True
+        except Exception as e:
+            log_error("Error sweeping meeting", booking_id=booking['booking_id'], error=str(e))
+        return False
+
+    swept = sum(run_concurrently(*[(lambda booking=booking: sweep(booking)) for booking in bookings]))
+
+    log_info("Swept ended meetings", bookings=len(bookings), meetings_ended=swept)
+    return {"bookings": len(bookings), "meetings_ended": swept}
+
 # ========== Search ==========
+def is_teacher_profile(profile):
+    """Returns True if a profile has the teacher role (roles array or legacy role field)."""
+    if not profile:
+        return False
+    return 'teacher' in (profile.get('roles') or []) or profile.get('role') == 'teacher'
+
+def search_tokens(text):
+    """Splits text into lowercase search words."""
+    if not isinstance(text, str):
+        return []
+    # Split on whitespace and punctuation only, so Devanagari words stay intact
+    words = re.split(r"[\s.,;:!?/\\()\[\]{}'\"&+\-|]+", text.lower())
+    return [word for word in words if word]
+
+def search_words(profile):
+    """Returns the indexed words of a teacher profile as {'name': [...], 'topic': [...]}."""
+    topics = profile.get('topics') or []
+    if isinstance(topics, str):
+        topics = [topics]
+
+    words = {}
+    for field, values in (('name', [profile.get('name', '')]), ('topic', topics)):
+        field_words = (word[:SEARCH_MAX_PREFIX] for value in values for word in search_tokens(value))
+        words[field] = list(dict.fromkeys(field_words))
+    return words
+
+def build_search_entries(profile):
+    """Builds the TeacherSearchIndex entries for a teacher profile.
+
+    Returns a dict mapping (token, entry) to a score, where token is a word
+    prefix, entry is '<field>#<teacher_id>' and the score is 2 for a whole-word
+    match and 1 for a prefix match.
+    """
+    teacher_id = profile['user_id']
+    entries = {}
+    for field, words in search_words(profile).items():
+        for word in words:
+            for length in range(SEARCH_MIN_PREFIX, len(word) + 1):
+                key = (word[:length], f"{field}#{teacher_id}")
+                score = 2 if length == len(word) else 1
+                entries[key] = max(entries.get(key, 0), score)
+    return entries
+
+def search_word_score(words, fields, token):
+    """Scores token against a teacher's indexed words: 2 for a whole word, 1 for a prefix, 0 for no match."""
+    score = 0
+    for field in fields:
+        for word in words.get(field, []):
+            if word == token:
+                return 2
+            if word.startswith(token):
+                score = 1
+    return score
+
+def update_teacher_search_index(user_id, old_profile, new_profile):
+    """Brings the TeacherSearchIndex entries for a user in line with their saved profile.
+
+    Every entry carries all of the teacher's indexed words, so a search can
+    check its other query words without reading their entries. Only entries
+    that changed are written or deleted, which is all of them when the words
+    changed. Errors are logged rather than raised because the index can always
+    be rebuilt from UserProfiles with rebuild_teacher_search_index.
+    """
+    try:
+        old_teacher = is_teacher_profile(old_profile)
+        new_teacher = is_teacher_profile(new_profile)
+        old_entries = build_search_entries(old_profile) if old_teacher else {}
+        new_entries = build_search_entries(new_profile) if new_teacher else {}
+        new_words = search_words(new_profile) if new_teacher else {}
+        words_changed = (search_words(old_profile) if old_teacher else {}) != new_words
+
+        stale_keys = [key for key in old_entries if key not in new_entries]
+        changed_keys = [key for key, score in new_entries.items()
+                        if words_changed or old_entries.get(key) != score]
+        if not stale_keys and not changed_keys:
+            return
+
+        search_table = get_table(SEARCH_INDEX_TABLE)
+        with search_table.batch_writer() as batch:
+            for token, entry in stale_keys:
+                batch.delete_item(Key={'token': token, 'entry': entry})
+            for token, entry in changed_keys:
+                batch.put_item(Item={
+                    'token': token,
+                    'entry': entry,
+                    'teacher_id': user_id,
+                    'score': new_entries[(token, entry)],
+                    'words': new_words
+                })
+
+        log_info("Search index updated", user_id=user_id, written=len(changed_keys), removed=len(stale_keys))
+    except Exception as e:
+        log_error("Error updating search index", user_id=user_id, error=str(e))
+
+def batch_get_profiles(user_ids):
+    """Fetches UserProfiles items for user_ids with BatchGetItem, keyed by user_id."""
+    profiles = {}
+    for start in range(0, len(user_ids), 100):
+        request_items = {
+            PROFILE_TABLE: {'Keys': [{'user_id': user_id} for user_id in user_ids[start:start + 100]]}
+        }
+        while request_items:
+            response = get_dynamodb().batch_get_item(RequestItems=request_items)
+            for profile in response['Responses'].get(PROFILE_TABLE, []):
+                profiles[profile['user_id']] = profile
+            request_items = response.get('UnprocessedKeys')
+    return profiles
+
+@route('GET', '/search/teachers')
 def search_teachers(event):
-    """Searches for teachers based on topic/subject or teacher name."""
+    """Searches for teachers based on topic/subject or teacher name.
+
+    TeacherSearchIndex maps word prefixes to teacher_ids. Only the entries for
+    the longest query word are read, at most SEARCH_MAX_ENTRIES_READ per
+    request; the other words are checked against the teacher words stored on
+    each entry. Teachers must match every word. The cursor is the index key to
+    continue from, and each page is ranked by score (whole-word matches above
+    prefix matches). Only the returned page of profiles is fetched.
+    """
     try:
-        query_params = event.get('queryStringParameters', {})
+        query_params = event.get('queryStringParameters', {}) or {}
         search_query = query_params.get('topic', '').lower()  # Keeping parameter name as 'topic' for backward compatibility
         search_type = query_params.get('type', 'both').lower()  # 'topic', 'name', or 'both'
 
         if not search_query:
             return response_with_cors(400, {"message": "Missing search query"})
 
-        # Log search parameters
-        print(f"Searching for teachers with query: '{search_query}', type: '{search_type}'")
-        
-        # Search for teachers who offer this topic or match the name
-        profile_table = dynamodb.Table(PROFILE_TABLE)
-        
-        # First try to search using the new roles array field
-        try:
-            # Build a filter expression that checks if 'teacher' is in the roles array
-            response = profile_table.scan(
-                FilterExpression=Attr('roles').contains('teacher')
-            )
-            
-            # If nothing found, fall back to the legacy 'role' field
-            if not response['Items']:
-                print("No profiles found with roles array containing 'teacher', falling back to role field")
-                response = profile_table.scan(
-                    FilterExpression=Attr('role').eq('teacher')
-                )
-        except ClientError as e:
-            # If the roles attribute doesn't exist or there's another issue, fall back to the legacy approach
-            print(f"Error searching by roles array: {str(e)}, falling back to role field")
-            response = profile_table.scan(
-                FilterExpression=Attr('role').eq('teacher')
-            )
+        limit = parse_page_limit(query_params)
+        cursor = query_params.get('cursor')
 
-        teachers = []
-        for teacher in response['Items']:
-            match_found = False
-            
-            # For debugging
-            teacher_name = teacher.get('name', '').lower()
-            teacher_topics = [t.lower() for t in teacher.get('topics', [])]
-            
-            # Search by topic
-            if search_type in ['topic', 'both'] and 'topics' in teacher:
-                if any(search_query in topic.lower() for topic in teacher['topics']):
-                    match_found = True
-                    print(f"Teacher matched by topic: {teacher.get('name', 'Unknown')}, topics: {teacher_topics}")
-            
-            # Search by name
-            if search_type in ['name', 'both'] and 'name' in teacher:
-                if search_query in teacher['name'].lower():
-                    match_found = True
-                    print(f"Teacher matched by name: {teacher_name}")
-            
-            if match_found:
-                teachers.append(teacher)
+        tokens = list(dict.fromkeys(word[:SEARCH_MAX_PREFIX] for word in search_tokens(search_query)))
+        tokens = [token for token in tokens if len(token) >= SEARCH_MIN_PREFIX]
+        if not tokens:
+            return response_with_cors(400, {"message": f"Search query must contain a word of at least {SEARCH_MIN_PREFIX} characters"})
+
+        # The longest word has the fewest entries
+        lookup_token = max(tokens, key=len)
+        fields = [search_type] if search_type in ['topic', 'name'] else ['name', 'topic']
 
-        print(f"Found {len(teachers)} matching teachers")
-        return response_with_cors(200, convert_decimal(teachers))
+        # Log search parameters
+        log_debug("Searching for teachers", tokens=tokens, search_type=search_type)
+
+        key_condition = Key('token').eq(lookup_token)
+        if search_type in ['topic', 'name']:
+            key_condition = key_condition & Key('entry').begins_with(f"{search_type}#")
+
+        search_table = get_table(SEARCH_INDEX_TABLE)
+        wanted = limit or MAX_UNPAGED_ITEMS
+        scores = {}
+        entries_read = 0
+        next_cursor = cursor
+        while True:
+            # Never read more entries than matches still wanted, so the cursor
+            # never skips a match that did not fit on this page
+            entries, next_cursor = fetch_page(
+                search_table.query,
+                min(wanted - len(scores), SEARCH_MAX_ENTRIES_READ - entries_read),
+                next_cursor,
+                KeyConditionExpression=key_condition
+            )
+            entries_read += len(entries)
+
+            for entry in entries:
+                words = entry.get('words')
+                if words is None:
+                    # Written before entries carried words; rebuild_teacher_search_index adds them
+                    if len(tokens) == 1:
+                        scores[entry['teacher_id']] = max(scores.get(entry['teacher_id'], 0), int(entry['score']))
+                    continue
+                # A teacher matching by name was already returned with its name# entry
+                if entry['entry'].startswith('topic#') and 'name' in fields \
+                        and search_word_score(words, ['name'], lookup_token):
+                    continue
+                token_scores = [search_word_score(words, fields, token) for token in tokens]
+                if all(token_scores):
+                    scores[entry['teacher_id']] = sum(token_scores)
+
+            if not next_cursor or len(scores) >= wanted or entries_read >= SEARCH_MAX_ENTRIES_READ:
+                break
+
+        page_ids = sorted(scores, key=lambda teacher_id: (-scores[teacher_id], teacher_id))
+        profiles = batch_get_profiles(page_ids)
+        # Skip index entries whose profile has since been deleted or lost the teacher role
+        teachers = [profiles[teacher_id] for teacher_id in page_ids
+                    if is_teacher_profile(profiles.get(teacher_id))]
+
+        log_info("Teacher search complete", entries_read=entries_read, returned=len(teachers))
+        return list_response(teachers, next_cursor, limit is not None or cursor is not None)
+    except ValueError as e:
+        return response_with_cors(400, {"message": str(e)})
     except ClientError as e:
-        print(f"Error in search_teachers: {str(e)}")
+        log_error("Error in search_teachers", error=str(e))
         return response_with_cors(500, {"message": "Error searching for teachers.", "error": str(e)})
 
+def rebuild_teacher_search_index(event, context):
+    """Direct-invocation entry point that (re)indexes every teacher profile.
+
+    Run once per stage after TeacherSearchIndex is created, and whenever the
+    index is suspected to have drifted from UserProfiles.
+    """
+    profile_table = get_table(PROFILE_TABLE)
+    teachers, _ = fetch_page(
+        profile_table.scan,
+        FilterExpression=Attr('roles').contains('teacher') | Attr('role').eq('teacher')
+    )
+    for teacher in teachers:
+        update_teacher_search_index(teacher['user_id'], None, teacher)
+
+    log_info("Rebuilt search index", teachers=len(teachers))
+    return {"indexed": len(teachers)}
+
 # ========== Payment Management System ==========
+# Module-level cache so warm Lambda containers reuse the RazorPay config and client
+# across invocations. save_razorpay_config invalidates it; other containers pick up
+# new keys once RAZORPAY_CACHE_TTL_SECONDS has passed.
+_razorpay_cache = {'config': None, 'client': None, 'expires_at': 0}
+
+def invalidate_razorpay_cache():
+    """Drops the cached RazorPay config record and client."""
+    _razorpay_cache.update(config=None, client=None, expires_at=0)
+
+def get_razorpay_config_record():
+    """Returns the stored razorpay_api_keys config item, or None if it is missing."""
+    now = time.time()
+    if _razorpay_cache['expires_at'] > now:
+        return _razorpay_cache['config']
+
+    config_table = get_table(RAZORPAY_CONFIG_TABLE)
+    response = config_table.get_item(
+        Key={'config_id': 'razorpay_api_keys'}
+    )
+    config = response.get('Item')
+
+    # A missing record is cached too, so unconfigured stages don't read on every call
+    _razorpay_cache.update(config=config, client=None, expires_at=now + RAZORPAY_CACHE_TTL_SECONDS)
+    return config
+
 def get_razorpay_client():
     """Initialize and return a RazorPay client using stored credentials."""
+    # Deferred import: only payment routes need the RazorPay SDK
+    import razorpay
     try:
-        # Fetch RazorPay API credentials from the config table
-        config_table = dynamodb.Table(RAZORPAY_CONFIG_TABLE)
-        response = config_table.get_item(
-            Key={'config_id': 'razorpay_api_keys'}
-        )
-        
+        # Fetch RazorPay API credentials from the config table (cached per container)
+        config = get_razorpay_config_record()
+
         # Check if credentials exist
-        if 'Item' not in response:
-            print("RazorPay API credentials not found")
+        if not config:
+            log_warn("RazorPay API credentials not found")
             # Return a default client for development (will fail in production)
             return razorpay.Client(auth=("rzp_test_default", "default_secret"))
-        
-        # Get the API keys
-        config = response['Item']
-        key_id = config.get('key_id')
-        key_secret = config.get('key_secret')
-        
-        # Create and return the client
-        return razorpay.Client(auth=(key_id, key_secret))
+
+        if _razorpay_cache['client'] is None:
+            # Create the client once per config record
+            _razorpay_cache['client'] = razorpay.Client(auth=(config.get('key_id'), config.get('key_secret')))
+        return _razorpay_cache['client']
     except Exception as e:
-        print(f"Error getting RazorPay client: {str(e)}")
+        log_error("Error getting RazorPay client", error=str(e))
         # Return a default client as fallback
         return razorpay.Client(auth=("rzp_test_default", "default_secret"))
 
+@route('POST', '/payments/initialize')
 def initialize_payment(event):
     """Initialize a payment with RazorPay."""
+    # Deferred import: only payment routes need the RazorPay SDK
+    import razorpay
     try:
         # Parse request body
         body = json.loads(event['body'])
@@ -1132,18 +3138,15 @@ def initialize_payment(event):
             
             order = client.order.create(data=order_data)
             
-            # Get config for key_id to return to frontend
-            config_table = dynamodb.Table(RAZORPAY_CONFIG_TABLE)
-            response = config_table.get_item(
-                Key={'config_id': 'razorpay_api_keys'}
-            )
+            # Get config for key_id to return to frontend (already cached by get_razorpay_client)
+            config = get_razorpay_config_record()
             
             key_id = "rzp_test_default"
-            if 'Item' in response:
-                key_id = response['Item'].get('key_id', "rzp_test_default")
+            if config:
+                key_id = config.get('key_id', "rzp_test_default")
             
             # Store payment record in the database
-            payment_id = f"payment-{uuid.uuid4()}"
+            payment_id = order_payment_id(order['id'])
             timestamp = datetime.utcnow().isoformat()
             
             payment_record = {
@@ -1158,8 +3161,9 @@ def initialize_payment(event):
                 'status': 'initiated',
                 'created_at': timestamp
             }
+            with_archive_expiry(PAYMENTS_TABLE, with_time_keys(payment_record))
             
-            payments_table = dynamodb.Table(PAYMENTS_TABLE)
+            payments_table = get_table(PAYMENTS_TABLE)
             payments_table.put_item(Item=payment_record)
             
             # Return the order details to the frontend
@@ -1173,19 +3177,50 @@ def initialize_payment(event):
             })
             
         except razorpay.errors.BadRequestError as e:
-            print(f"RazorPay BadRequestError: {str(e)}")
+            log_warn("RazorPay BadRequestError", error=str(e))
             return response_with_cors(400, {
                 'message': 'Error initializing payment',
                 'error': str(e)
             })
     
     except Exception as e:
-        print(f"Error initializing payment: {str(e)}")
+        log_error("Error initializing payment", error=str(e))
         return response_with_cors(500, {
             'message': 'Error initializing payment',
             'error': str(e)
         })
 
+def payment_rollup_updates(payment):
+    """Builds TransactWriteItems entries adding a completed payment to the PaymentRollups table.
+
+    Rollups live in a single 'daily' partition with sort keys '<day>#total' and
+    '<day>#teacher#<teacher_id>', so a date range is one Query over small rows.
+    The day is taken from the payment's created_at, matching the report's date filter.
+    """
+    day = (payment.get('created_at') or datetime.utcnow().isoformat())[:10]
+    amount = Decimal(str(payment.get('amount', 0)))
+    teacher_id = payment.get('teacher_id')
+
+    rollup_rows = [(f"{day}#total", None)]
+    if teacher_id:
+        rollup_rows.append((f"{day}#teacher#{teacher_id}", teacher_id))
+
+    updates = []
+    for rollup_key, row_teacher_id in rollup_rows:
+        update = {
+            'TableName': PAYMENT_ROLLUPS_TABLE,
+            'Key': {'rollup_type': 'daily', 'rollup_key': rollup_key},
+            'UpdateExpression': "SET #day = :day ADD total_amount :amount, payment_count :one",
+            'ExpressionAttributeNames': {'#day': 'day'},
+            'ExpressionAttributeValues': {':day': day, ':amount': amount, ':one': 1}
+        }
+        if row_teacher_id:
+            update['UpdateExpression'] = "SET #day = :day, teacher_id = :teacher ADD total_amount :amount, payment_count :one"
+            update['ExpressionAttributeValues'][':teacher'] = row_teacher_id
+        updates.append({'Update': update})
+    return updates
+
+@route('POST', '/payments/verify')
 def verify_payment(event):
     """Verify a RazorPay payment signature."""
     try:
@@ -1199,15 +3234,12 @@ def verify_payment(event):
             if field not in body:
                 return response_with_cors(400, {"message": f"Missing required field: {field}"})
         
-        # Get RazorPay client and config
-        config_table = dynamodb.Table(RAZORPAY_CONFIG_TABLE)
-        response = config_table.get_item(
-            Key={'config_id': 'razorpay_api_keys'}
-        )
+        # Get RazorPay config (cached per container)
+        config = get_razorpay_config_record()
         
         key_secret = None
-        if 'Item' in response:
-            key_secret = response['Item'].get('key_secret')
+        if config:
+            key_secret = config.get('key_secret')
         
         if not key_secret:
             return response_with_cors(500, {"message": "RazorPay configuration not found"})
@@ -1229,18 +3261,15 @@ def verify_payment(event):
                 return response_with_cors(400, {"message": "Invalid payment signature"})
             
             # Update payment status in database
-            timestamp = datetime.utcnow().isoformat()
+            now = datetime.utcnow()
+            timestamp = format_slot_time(now)
             
-            # Query payment by order_id using GSI
-            payments_table = dynamodb.Table(PAYMENTS_TABLE)
-            response = payments_table.query(
-                IndexName='OrderIdIndex',
-                KeyConditionExpression=Key('order_id').eq(body['razorpay_order_id'])
-            )
+            payment = find_order_payment(body['razorpay_order_id'])
             
-            if not response.get('Items'):
-                # Create a new payment record if not found
-                payment_id = f"payment-{uuid.uuid4()}"
+            if payment is None:
+                # Create the order's payment record if not found. Its ID comes
+                # from the order, so a repeated verify finds it or hits the condition.
+                payment_id = order_payment_id(body['razorpay_order_id'])
                 
                 payment_record = {
                     'payment_id': payment_id,
@@ -1254,8 +3283,25 @@ def verify_payment(event):
                     'created_at': timestamp,
                     'updated_at': timestamp
                 }
+                if 'amount' in body:
+                    payment_record['amount'] = Decimal(str(body['amount']))
+                with_time_keys(payment_record)
                 
-                payments_table.put_item(Item=payment_record)
+                # Write the payment and its rollup increments in one transaction
+                try:
+                    get_dynamodb().meta.client.transact_write_items(TransactItems=[
+                        {
+                            'Put': {
+                                'TableName': PAYMENTS_TABLE,
+                                'Item': payment_record,
+                                'ConditionExpression': 'attribute_not_exists(payment_id)'
+                            }
+                        }
+                    ] + payment_rollup_updates(payment_record))
+                except ClientError as e:
+                    if not is_condition_conflict(e):
+                        raise
+                    log_info("Payment already recorded, skipping rollup update", payment_id=payment_id)
                 
                 return response_with_cors(200, {
                     'message': 'Payment verified successfully',
@@ -1264,22 +3310,36 @@ def verify_payment(event):
                 })
             else:
                 # Update existing payment record
-                payment = response['Items'][0]
                 payment_id = payment['payment_id']
                 
-                payments_table.update_item(
-                    Key={'payment_id': payment_id},
-                    UpdateExpression="SET #status = :status, payment_id_razorpay = :rpid, signature = :sig, updated_at = :upd",
-                    ExpressionAttributeNames={
-                        '#status': 'status'
-                    },
-                    ExpressionAttributeValues={
-                        ':status': 'completed',
-                        ':rpid': body['razorpay_payment_id'],
-                        ':sig': body['razorpay_signature'],
-                        ':upd': timestamp
-                    }
-                )
+                # Mark the payment completed and add it to the rollups in one transaction.
+                # The status condition makes repeated verify calls count the payment only once.
+                try:
+                    get_dynamodb().meta.client.transact_write_items(TransactItems=[
+                        {
+                            'Update': {
+                                'TableName': PAYMENTS_TABLE,
+                                'Key': {'payment_id': payment_id},
+                                # Completed payments are kept, so drop the TTL set at initiation
+                                'UpdateExpression': "SET #status = :status, payment_id_razorpay = :rpid, signature = :sig, updated_at = :upd, updated_epoch = :upd_epoch REMOVE expires_at",
+                                'ConditionExpression': "#status <> :status",
+                                'ExpressionAttributeNames': {
+                                    '#status': 'status'
+                                },
+                                'ExpressionAttributeValues': {
+                                    ':status': 'completed',
+                                    ':rpid': body['razorpay_payment_id'],
+                                    ':sig': body['razorpay_signature'],
+                                    ':upd': timestamp,
+                                    ':upd_epoch': epoch_seconds(now)
+                                }
+                            }
+                        }
+                    ] + payment_rollup_updates(payment))
+                except ClientError as e:
+                    if not is_condition_conflict(e):
+                        raise
+                    log_info("Payment already completed, skipping rollup update", payment_id=payment_id)
                 
                 return response_with_cors(200, {
                     'message': 'Payment verified successfully',
@@ -1288,133 +3348,143 @@ def verify_payment(event):
                 })
                 
         except Exception as e:
-            print(f"Error verifying payment signature: {str(e)}")
+            log_warn("Error verifying payment signature", error=str(e))
             return response_with_cors(400, {
                 'message': 'Error verifying payment',
                 'error': str(e)
             })
     
     except Exception as e:
-        print(f"Error verifying payment: {str(e)}")
+        log_error("Error verifying payment", error=str(e))
         return response_with_cors(500, {
             'message': 'Error verifying payment',
             'error': str(e)
         })
 
+def order_payment_id(order_id):
+    """Returns the payment_id of the payment record for a RazorPay order."""
+    return f"payment-{order_id}"
+
+def find_order_payment(order_id):
+    """Returns the payment record for a RazorPay order, or None.
+
+    Records are read by their order-derived ID; records written before IDs
+    were derived from the order are found through OrderIdIndex.
+    """
+    payments_table = get_table(PAYMENTS_TABLE)
+    response = payments_table.get_item(Key={'payment_id': order_payment_id(order_id)}, ConsistentRead=True)
+    if 'Item' in response:
+        return response['Item']
+    response = payments_table.query(
+        IndexName='OrderIdIndex',
+        KeyConditionExpression=Key('order_id').eq(order_id)
+    )
+    return response['Items'][0] if response.get('Items') else None
+
+@route('GET', '/payments')
 def get_payments(event):
-    """Get payment history based on filters."""
+    """Get payment history based on filters, with optional limit/cursor pagination."""
     try:
         # Get query parameters
-        params = event.get('queryStringParameters', {})
+        params = event.get('queryStringParameters', {}) or {}
         student_id = params.get('student_id')
         teacher_id = params.get('teacher_id')
+        projection = parse_fields(params)
+        limit = parse_page_limit(params)
+        cursor = params.get('cursor')
         
-        payments_table = dynamodb.Table(PAYMENTS_TABLE)
+        payments_table = get_table(PAYMENTS_TABLE)
         
         # Different queries based on parameters
         if student_id:
             # Get student's payment history
-            response = payments_table.query(
+            payments, next_cursor = fetch_page(
+                payments_table.query, limit, cursor, MAX_UNPAGED_ITEMS,
                 IndexName='StudentPaymentsIndex',
-                KeyConditionExpression=Key('student_id').eq(student_id)
+                KeyConditionExpression=Key('student_id').eq(student_id),
+                **projection
             )
-            payments = response['Items']
-            
-            # Paginate if needed
-            while 'LastEvaluatedKey' in response:
-                response = payments_table.query(
-                    IndexName='StudentPaymentsIndex',
-                    KeyConditionExpression=Key('student_id').eq(student_id),
-                    ExclusiveStartKey=response['LastEvaluatedKey']
-                )
-                payments.extend(response['Items'])
-                
         elif teacher_id:
             # Get teacher's payment history
-            response = payments_table.query(
+            payments, next_cursor = fetch_page(
+                payments_table.query, limit, cursor, MAX_UNPAGED_ITEMS,
                 IndexName='TeacherPaymentsIndex',
-                KeyConditionExpression=Key('teacher_id').eq(teacher_id)
+                KeyConditionExpression=Key('teacher_id').eq(teacher_id),
+                **projection
             )
-            payments = response['Items']
-            
-            # Paginate if needed
-            while 'LastEvaluatedKey' in response:
-                response = payments_table.query(
-                    IndexName='TeacherPaymentsIndex',
-                    KeyConditionExpression=Key('teacher_id').eq(teacher_id),
-                    ExclusiveStartKey=response['LastEvaluatedKey']
-                )
-                payments.extend(response['Items'])
-                
         else:
             # If no specific ID, return 400 - require filter
             return response_with_cors(400, {"message": "Either student_id or teacher_id parameter is required"})
         
-        # Convert Decimal to float for serialization
-        payments = convert_decimal(payments)
-        
-        return response_with_cors(200, payments)
+        return list_response(payments, next_cursor, limit is not None or cursor is not None)
         
+    except ValueError as e:
+        return response_with_cors(400, {"message": str(e)})
     except Exception as e:
-        print(f"Error getting payments: {str(e)}")
+        log_error("Error getting payments", error=str(e))
         return response_with_cors(500, {
             'message': 'Error getting payment history',
             'error': str(e)
         })
 
+def report_days(params):
+    """Returns the (first, last) UTC days, as YYYY-MM-DD or None, of a report's start_date/end_date.
+
+    Both financial report endpoints cover whole days: the rollups behind the
+    summary are per day, so the payment rows use the same bounds.
+    """
+    return tuple(
+        parse_slot_time(params[field], field).strftime('%Y-%m-%d') if params.get(field) else None
+        for field in ('start_date', 'end_date')
+    )
+
+@route('GET', '/admin/financial-reports')
 def get_financial_reports(event):
-    """Get financial reports for admin users."""
+    """Get financial reports for admin users.
+
+    Totals come from the pre-aggregated PaymentRollups rows for the requested
+    date range. Raw payment rows are served separately and paginated by
+    get_financial_report_payments.
+    """
     try:
         # TODO: Add proper admin authentication checks here
-        params = event.get('queryStringParameters', {})
-        start_date = params.get('start_date')
-        end_date = params.get('end_date')
-        
-        # Scan all payments for reporting
-        payments_table = dynamodb.Table(PAYMENTS_TABLE)
+        params = event.get('queryStringParameters', {}) or {}
+        first_day, last_day = report_days(params)
         
-        # Basic filter for completed payments
-        filter_expression = Attr('status').eq('completed')
-        
-        # Add date filters if provided
-        if start_date:
-            filter_expression = filter_expression & Attr('created_at').gte(start_date)
-        if end_date:
-            filter_expression = filter_expression & Attr('created_at').lte(end_date)
-        
-        response = payments_table.scan(
-            FilterExpression=filter_expression
+        # Rollup sort keys start with the day, so whole days bound the range
+        key_condition = Key('rollup_type').eq('daily')
+        range_condition = time_range_condition(
+            'rollup_key',
+            f"{first_day}#" if first_day else None,
+            f"{last_day}#~" if last_day else None
         )
+        if range_condition is not None:
+            key_condition = key_condition & range_condition
         
-        payments = response['Items']
+        rollups_table = get_table(PAYMENT_ROLLUPS_TABLE)
+        rollups, _ = fetch_page(rollups_table.query, KeyConditionExpression=key_condition)
         
-        # Paginate if needed
-        while 'LastEvaluatedKey' in response:
-            response = payments_table.scan(
-                FilterExpression=filter_expression,
-                ExclusiveStartKey=response['LastEvaluatedKey']
-            )
-            payments.extend(response['Items'])
-        
-        # Calculate summary statistics
-        total_amount = sum(float(payment.get('amount', 0)) for payment in payments)
-        payment_count = len(payments)
-        
-        # Group by teacher for teacher-wise summary
+        total_amount = 0
+        payment_count = 0
         teacher_summary = {}
-        for payment in payments:
-            teacher_id = payment.get('teacher_id')
+        daily_summary = {}
+        for rollup in rollups:
+            total = float(rollup.get('total_amount', 0))
+            count = int(rollup.get('payment_count', 0))
+            teacher_id = rollup.get('teacher_id')
             if teacher_id:
+                # Group by teacher for teacher-wise summary
                 if teacher_id not in teacher_summary:
                     teacher_summary[teacher_id] = {
                         'total': 0,
                         'count': 0
                     }
-                teacher_summary[teacher_id]['total'] += float(payment.get('amount', 0))
-                teacher_summary[teacher_id]['count'] += 1
-        
-        # Convert Decimal to float for serialization
-        payments = convert_decimal(payments)
+                teacher_summary[teacher_id]['total'] += total
+                teacher_summary[teacher_id]['count'] += count
+            else:
+                total_amount += total
+                payment_count += count
+                daily_summary[rollup['day']] = {'total': total, 'count': count}
         
         return response_with_cors(200, {
             'summary': {
@@ -1422,16 +3492,99 @@ def get_financial_reports(event):
                 'payment_count': payment_count
             },
             'teacher_summary': teacher_summary,
-            'payments': payments
+            'daily_summary': daily_summary
         })
         
+    except ValueError as e:
+        return response_with_cors(400, {"message": str(e)})
     except Exception as e:
-        print(f"Error generating financial report: {str(e)}")
+        log_error("Error generating financial report", error=str(e))
         return response_with_cors(500, {
             'message': 'Error generating financial report',
             'error': str(e)
         })
 
+@route('GET', '/admin/financial-reports/payments')
+def get_financial_report_payments(event):
+    """Get the completed payment rows behind a financial report, one page at a time.
+
+    Queries StatusCreatedIndex, so the start_date/end_date window is a key
+    range over created_epoch rather than a string filter over a scan. The
+    window covers the same whole days as get_financial_reports.
+    """
+    try:
+        params = event.get('queryStringParameters', {}) or {}
+        first_day, last_day = report_days(params)
+        limit = parse_page_limit(params) or MAX_PAGE_SIZE
+        cursor = params.get('cursor')
+        projection = parse_fields(params)
+        
+        payments_table = get_table(PAYMENTS_TABLE)
+        
+        # Completed payments created from the start of the first day to the end of the last
+        key_condition = Key('status').eq('completed')
+        range_condition = time_range_condition(
+            'created_epoch',
+            epoch_seconds(parse_slot_time(first_day, 'start_date')) if first_day else None,
+            epoch_seconds(parse_slot_time(last_day, 'end_date')) + 86399 if last_day else None
+        )
+        if range_condition is not None:
+            key_condition = key_condition & range_condition
+        
+        payments, next_cursor = fetch_page(
+            payments_table.query, limit, cursor,
+            IndexName='StatusCreatedIndex',
+            KeyConditionExpression=key_condition,
+            **projection
+        )
+        
+        return list_response(payments, next_cursor, True)
+        
+    except ValueError as e:
+        return response_with_cors(400, {"message": str(e)})
+    except Exception as e:
+        log_error("Error fetching financial report payments", error=str(e))
+        return response_with_cors(500, {
+            'message': 'Error fetching payments for financial report',
+            'error': str(e)
+        })
+
+def rebuild_payment_rollups(event, context):
+    """Direct-invocation entry point that rebuilds PaymentRollups from the Payments table.
+
+    Run once per stage after the rollup table is created. It replaces existing
+    rollup rows, so it should not run concurrently with payment verification.
+    """
+    payments_table = get_table(PAYMENTS_TABLE)
+    payments, _ = fetch_page(payments_table.scan, FilterExpression=Attr('status').eq('completed'))
+    
+    rollups = {}
+    for payment in payments:
+        for update in payment_rollup_updates(payment):
+            update = update['Update']
+            rollup_key = update['Key']['rollup_key']
+            values = update['ExpressionAttributeValues']
+            row = rollups.setdefault(rollup_key, {
+                'rollup_type': 'daily',
+                'rollup_key': rollup_key,
+                'day': values[':day'],
+                'total_amount': Decimal(0),
+                'payment_count': 0
+            })
+            if ':teacher' in values:
+                row['teacher_id'] = values[':teacher']
+            row['total_amount'] += values[':amount']
+            row['payment_count'] += 1
+    
+    rollups_table = get_table(PAYMENT_ROLLUPS_TABLE)
+    with rollups_table.batch_writer() as batch:
+        for row in rollups.values():
+            batch.put_item(Item=row)
+    
+    log_info("Rebuilt payment rollups", rollups=len(rollups), payments=len(payments))
+    return {"rollups": len(rollups), "payments": len(payments)}
+
+@route('POST', '/admin/razorpay-config')
 def save_razorpay_config(event):
     """Save RazorPay API key configuration."""
     try:
@@ -1442,7 +3595,7 @@ def save_razorpay_config(event):
             return response_with_cors(400, {"message": "RazorPay key_id and key_secret are required"})
         
         # Store in the config table
-        config_table = dynamodb.Table(RAZORPAY_CONFIG_TABLE)
+        config_table = get_table(RAZORPAY_CONFIG_TABLE)
         
         timestamp = datetime.utcnow().isoformat()
         
@@ -1454,23 +3607,25 @@ def save_razorpay_config(event):
         }
         
         config_table.put_item(Item=config_record)
+        invalidate_razorpay_cache()
         
         return response_with_cors(200, {
             'message': 'RazorPay configuration saved successfully'
         })
         
     except Exception as e:
-        print(f"Error saving RazorPay config: {str(e)}")
+        log_error("Error saving RazorPay config", error=str(e))
         return response_with_cors(500, {
             'message': 'Error saving RazorPay configuration',
             'error': str(e)
         })
 
+@route('GET', '/admin/razorpay-config')
 def get_razorpay_config(event):
     """Get RazorPay API key configuration."""
     try:
         # This would normally include admin auth checks
-        config_table = dynamodb.Table(RAZORPAY_CONFIG_TABLE)
+        config_table = get_table(RAZORPAY_CONFIG_TABLE)
         
         response = config_table.get_item(
             Key={'config_id': 'razorpay_api_keys'}
@@ -1489,71 +3644,117 @@ def get_razorpay_config(event):
         return response_with_cors(200, config)
         
     except Exception as e:
-        print(f"Error getting RazorPay config: {str(e)}")
+        log_error("Error getting RazorPay config", error=str(e))
         return response_with_cors(500, {
             'message': 'Error getting RazorPay configuration',
             'error': str(e)
         })
 
+# ========== Data Migrations ==========
+# One-off jobs that bring data written before a feature existed up to date, in
+# the order they must run: time keys first, since open slots, search and the
+# payment rollups all read the normalized times. Each is safe to re-run.
+DATA_MIGRATIONS = {
+    'backfill_time_keys': backfill_time_keys,
+    'backfill_open_slots': backfill_open_slots,
+    'migrate_session_items': migrate_session_items,
+    'rebuild_teacher_search_index': rebuild_teacher_search_index,
+    'rebuild_payment_rollups': rebuild_payment_rollups,
+}
+
+def run_data_migrations(event, context):
+    """Entry point of the maintenance function that deploy-stack.sh invokes after an upgrade.
+
+    Runs every migration in DATA_MIGRATIONS order, or only the names listed in
+    event['migrations']; the event is passed on, so options such as
+    'segments' still reach the migration that reads them.
+    """
+    names = (event or {}).get('migrations') or list(DATA_MIGRATIONS)
+    unknown = [name for name in names if name not in DATA_MIGRATIONS]
+    if unknown:
+        raise ValueError(f"Unknown migrations: {', '.join(unknown)}")
+
+    results = {}
+    for name in DATA_MIGRATIONS:
+        if name in names:
+            log_info("Running data migration", migration=name)
+            results[name] = DATA_MIGRATIONS[name](event, context)
+    return results
+
 # ========== Lambda Handler ==========
+@route('GET', '/bookings/{booking_id}/session', '/bookings/{booking-id}/session')
 def get_booking_session(event):
-    """Retrieves the session associated with a booking."""
+    """Retrieves the session associated with a booking.
+
+    The booking read and the BookingSessionsIndex query run concurrently; the
+    index is sorted by created_at so the newest session is a single-item Query.
+    """
     try:
         # Log the full event for debugging
-        print(f"get_booking_session called with event: {json.dumps(event, default=str)}")
+        log_debug("get_booking_session called", event=event)
 
         # First try to get booking_id from path parameters (check both formats)
         path_params = event.get('pathParameters', {}) or {}
         booking_id = path_params.get('booking_id')
         if not booking_id:
             booking_id = path_params.get('booking-id')
-        print(f"Initial booking_id from pathParameters: {booking_id}")
+        log_debug("Initial booking_id from pathParameters", booking_id=booking_id)
 
         if not booking_id:
             # Try to extract from the path as a fallback
             path = event.get('path', '')
-            print(f"Extracting booking_id from path: {path}")
+            log_debug("Extracting booking_id from path", path=path)
 
             path_parts = path.split('/')
             for i, part in enumerate(path_parts):
                 if part == 'bookings' and i + 1 < len(path_parts):
                     booking_id = path_parts[i + 1]
-                    print(f"Extracted booking_id from path: {booking_id}")
+                    log_debug("Extracted booking_id from path", booking_id=booking_id)
                     break
 
         if not booking_id:
-            print("Failed to extract booking_id from request")
+            log_warn("Failed to extract booking_id from request")
             return response_with_cors(400, {"message": "Missing booking ID"})
 
         # Remove any additional path parts or query parameters from booking_id
         if '/' in booking_id:
             booking_id_parts = booking_id.split('/')
             booking_id = booking_id_parts[0]
-            print(f"Stripped path from booking_id: {booking_id}")
+            log_debug("Stripped path from booking_id", booking_id=booking_id)
 
         if '?' in booking_id:
             booking_id_parts = booking_id.split('?')
             booking_id = booking_id_parts[0]
-            print(f"Stripped query from booking_id: {booking_id}")
-
-        print(f"Final booking_id for lookup: {booking_id}")
-
-        # First verify the booking exists
-        bookings_table = dynamodb.Table(BOOKINGS_TABLE)
-        booking_response = bookings_table.get_item(Key={'booking_id': booking_id})
+            log_debug("Stripped query from booking_id", booking_id=booking_id)
+
+        log_debug("Final booking_id for lookup", booking_id=booking_id)
+
+        # Verify the booking exists and look up its newest session at the same time
+        bookings_table = get_table(BOOKINGS_TABLE)
+        sessions_table = get_table(SESSION_TABLE)
+        booking_response, session_response = run_concurrently(
+            lambda: bookings_table.get_item(Key={'booking_id': booking_id}),
+            lambda: sessions_table.query(
+                IndexName='BookingSessionsIndex',
+                KeyConditionExpression=Key('booking_id').eq(booking_id),
+                ScanIndexForward=False,
+                Limit=1
+            )
+        )
 
         if 'Item' not in booking_response:
             return response_with_cors(404, {"message": "Booking not found"})
 
         booking = booking_response['Item']
-
-        # Then look for sessions associated with this booking
-        sessions_table = dynamodb.Table(SESSION_TABLE)
-        session_response = sessions_table.scan(
-            FilterExpression=Attr('booking_id').eq(booking_id)
-        )
-
         if not session_response['Items']:
+            # Sessions of long-past bookings may have expired into the archive
+            archived = read_archived_booking_session(booking_id) if session_may_be_archived(booking) else None
+            if archived:
+                session = public_session(archived)
+                session["session_exists"] = True
+                session["archived"] = True
+                return response_with_cors(200, session)
+
             # No session exists yet, but return a structured response instead of 404
             # This way frontend knows it's a valid booking but without a session
             return response_with_cors(200, {
@@ -1562,189 +3763,95 @@ def get_booking_session(event):
                 "message": "No session exists for this booking yet"
             })
 
-        # Return the first (and hopefully only) session
-        session = convert_decimal(session_response['Items'][0])
+        # Return the most recently created session for the booking
+        session = public_session(session_response['Items'][0])
         session["session_exists"] = True
 
         return response_with_cors(200, session)
     except ClientError as e:
-        print(f"Database error in get_booking_session: {str(e)}")
+        log_error("Database error in get_booking_session", error=str(e))
         return response_with_cors(500, {"message": "Error fetching booking session.", "error": str(e)})
     except Exception as e:
-        print(f"Unexpected error in get_booking_session: {str(e)}")
+        log_error("Unexpected error in get_booking_session", error=str(e))
         return response_with_cors(500, {"message": "Error processing request", "error": str(e)})
 
 def lambda_handler(event, context):
     """Main Lambda entry point to handle incoming requests."""
+    set_log_context(request_id=getattr(context, 'aws_request_id', None))
+    _request_context.update(
+        gzip=accepts_gzip(get_header(event, 'Accept-Encoding')), retries=0, throttles=0, throttle_failures=0
+    )
+
     # Log request info and environment details for debugging
-    print(f"Your Sanskrit Teacher API request: {event.get('path', '')} [{event.get('httpMethod', 'DIRECT')}]")
-    print(f"Lambda v{context.function_version} [{os.environ.get('BUILD_VERSION', 'undefined')}], alias: {os.environ.get('AWS_LAMBDA_FUNCTION_ALIAS', 'undefined')}")
+    log_debug(
+        "Lambda environment",
+        function_version=getattr(context, 'function_version', None),
+        build_version=os.environ.get('BUILD_VERSION', 'undefined'),
+        alias=os.environ.get('AWS_LAMBDA_FUNCTION_ALIAS', 'undefined')
+    )
 
     # Only log table names during cold start to reduce noise
-    # Check if this is likely a cold start by using environment variable timestamp
     if not hasattr(lambda_handler, 'initialized'):
-        try:
-            # List only the tables we expect to use, no need to list all tables
-            expected_tables = [PROFILE_TABLE, BOOKINGS_TABLE, SERVICE_TABLE, AVAILABILITY_TABLE, SESSION_TABLE]
-            print(f"Using tables: {expected_tables}")
-            lambda_handler.initialized = True
-        except Exception as e:
-            print(f"Error during initialization: {str(e)}")
+        # List only the tables we expect to use, no need to list all tables
+        log_info("Cold start", tables=[PROFILE_TABLE, BOOKINGS_TABLE, SERVICE_TABLE, AVAILABILITY_TABLE, SESSION_TABLE])
+        lambda_handler.initialized = True
 
     try:
         # Handle direct invocations or API Gateway proxied requests
         if 'httpMethod' not in event:
             # This is likely a direct Lambda invocation, handle accordingly
-            print("Direct Lambda invocation detected")
+            log_warn("Direct Lambda invocation detected")
             return response_with_cors(400, {"message": "API Gateway proxy request expected."})
 
         method = event['httpMethod']
-        resource = event.get('resource')
         path = event.get('path', '')
 
-        # Handle case when resource is not present but path is (older API Gateway config)
-        if not resource and path:
-            print(f"Resource not found, using path: {path}")
-            # Map path to resource pattern
-            if path.startswith('/profiles'):
-                resource = "/profiles"
-            elif path.startswith('/services'):
-                resource = "/services"
-            elif '/bookings/' in path and '/session' in path:
-                resource = "/bookings/{booking_id}/session"
-                # Extract booking_id from path and add to pathParameters
-                path_parts = path.split('/')
-                booking_index = -1
-
-                # Find the index of 'bookings' in the path
-                for i, part in enumerate(path_parts):
-                    if part == 'bookings':
-                        booking_index = i
-                        break
-
-                if booking_index >= 0 and booking_index + 1 < len(path_parts):
-                    booking_id = path_parts[booking_index + 1]
-                    print(f"Extracted booking_id: {booking_id} for session lookup")
-
-                    if 'pathParameters' not in event:
-                        event['pathParameters'] = {}
-                    event['pathParameters']['booking_id'] = booking_id
-            elif path.startswith('/bookings'):
-                resource = "/bookings"
-            elif path.startswith('/availability') and len(path.split('/')) > 2:
-                resource = "/availability/{id}"
-            elif path.startswith('/availability'):
-                resource = "/availability"
-            elif path.startswith('/sessions') and len(path.split('/')) > 2:
-                resource = "/sessions/{id}"
-            elif path.startswith('/sessions'):
-                resource = "/sessions"
-            elif path.startswith('/search/teachers'):
-                resource = "/search/teachers"
-            elif path.startswith('/presigned-url'):
-                resource = "/presigned-url"
-            elif path.startswith('/meetings/') and len(path.split('/')) > 2:
-                resource = "/meetings/{session_id}"
-                session_id = path.split('/meetings/')[1]
-                if 'pathParameters' not in event:
-                    event['pathParameters'] = {}
-                event['pathParameters']['session_id'] = session_id
-            elif path.startswith('/meetings'):
-                resource = "/meetings"
-            elif path.startswith('/attendees'):
-                resource = "/attendees"
-
-        # Log the resource and method being handled
-        print(f"Handling request: {resource} [{method}]")
+        # With BinaryMediaTypes '*/*' API Gateway base64-encodes request bodies
+        if event.get('isBase64Encoded') and event.get('body'):
+            event['body'] = base64.b64decode(event['body']).decode('utf-8')
+            event['isBase64Encoded'] = False
 
         # CORS Preflight Handling
         if method == "OPTIONS":
             return response_with_cors(200, {"message": "CORS preflight successful"})
 
-        # Log request details for debugging
-        print(f"Headers: {json.dumps(event.get('headers', {}), default=str)}")
-        print(f"Query parameters: {json.dumps(event.get('queryStringParameters', {}), default=str)}")
+        # Resolve the handler from the route table (see @route)
+        handler, resource = resolve_route(event)
 
-        # Log additional debug information for bookings/session path
-        if '/bookings/' in path and '/session' in path:
-            print(f"Debug - Path contains booking/session pattern")
-            print(f"Debug - Resource resolved to: {resource}")
-            print(f"Debug - pathParameters: {event.get('pathParameters')}")
+        # Sampling decisions are made per route, so refresh the context now it is known
+        set_log_context(request_id=getattr(context, 'aws_request_id', None), route=resource)
+        log_info("Handling request", method=method, path=path)
 
-            # Ensure we have consistent parameter naming
-            if 'pathParameters' in event and event['pathParameters'] is not None:
-                if 'booking-id' in event['pathParameters'] and 'booking_id' not in event['pathParameters']:
-                    event['pathParameters']['booking_id'] = event['pathParameters']['booking-id']
-                    print(f"Debug - Copied booking-id to booking_id: {event['pathParameters']['booking_id']}")
+        # Log request details for debugging
+        log_debug(
+            "Request details",
+            headers=event.get('headers'),
+            query_parameters=event.get('queryStringParameters')
+        )
 
         try:
-            # Routing based on resource and method
-            print(f"[TRACE] Request routing: resource={resource}, method={method}, path={path}")
-            if resource == "/profiles" and method == "GET":
-                return get_user_profile(event)
-            elif resource == "/profiles" and method == "POST":
-                return create_user_profile(event)
-            elif resource == "/services" and method == "POST":
-                return create_service(event)
-            elif resource == "/services" and method == "GET":
-                return get_services(event)
-            elif resource == "/bookings" and method == "POST":
-                return create_booking(event)
-            elif resource == "/bookings" and method == "GET":
-                return get_bookings(event)
-            elif (resource == "/bookings/{booking_id}/session" or resource == "/bookings/{booking-id}/session") and method == "GET":
-                print(f"Debug - Calling get_booking_session with booking_id: {event.get('pathParameters', {}).get('booking_id')}")
-                return get_booking_session(event)
-            elif resource == "/availability" and method == "POST":
-                print(f"[TRACE] Routing /availability POST request to create_availability")
-                return create_availability(event)
-            elif resource == "/availability" and method == "GET":
-                print(f"[TRACE] Routing /availability GET request to get_availabilities")
-                return get_availabilities(event)
-            elif resource == "/availability/{id}" and method == "DELETE":
-                return delete_availability(event)
-            elif resource == "/sessions" and method == "POST":
-                return create_session(event)
-            elif resource == "/sessions/{id}" and method == "GET":
-                return get_session(event)
-            elif resource == "/sessions/{id}" and method == "PUT":
-                return update_session(event)
-            elif resource == "/search/teachers" and method == "GET":
-                return search_teachers(event)
-            # Payment routes
-            elif resource == "/payments/initialize" and method == "POST":
-                return initialize_payment(event)
-            elif resource == "/payments/verify" and method == "POST":
-                return verify_payment(event)
-            elif resource == "/payments" and method == "GET":
-                return get_payments(event)
-            elif resource == "/admin/financial-reports" and method == "GET":
-                return get_financial_reports(event)
-            elif resource == "/admin/razorpay-config" and method == "POST":
-                return save_razorpay_config(event)
-            elif resource == "/admin/razorpay-config" and method == "GET":
-                return get_razorpay_config(event)
-            elif resource == "/presigned-url" and method == "POST":
-                return generate_presigned_url(event)
-            elif resource == "/meetings" and method == "POST":
-                return create_chime_meeting(event)
-            elif resource == "/meetings/{session_id}" and method == "GET":
-                return get_chime_meeting(event)
-            elif resource == "/meetings" and method == "DELETE":
-                return end_chime_meeting(event)
-            elif resource == "/attendees" and method == "POST":
-                return create_chime_attendee(event)
-            else:
-                print(f"[ERROR] Unknown route: {resource}:{method}, path: {path}")
+            if handler is None:
+                log_warn("Unknown route", method=method, path=path)
                 return response_with_cors(404, {"message": "Endpoint not found", "resource": resource, "method": method, "path": path})
+            response = handler(event)
         except Exception as route_error:
-            print(f"[ERROR] Exception in route handling: {str(route_error)}")
-            import traceback
-            print(f"[ERROR] Traceback: {traceback.format_exc()}")
-            return response_with_cors(500, {"message": "Error processing request", "error": str(route_error)})
+            log_error("Exception in route handling", error=str(route_error), traceback=traceback.format_exc)
+            response = response_with_cors(500, {"message": "Error processing request", "error": str(route_error)})
+
+        if _request_context['retries'] or _request_context['throttles']:
+            log_warn(
+                "AWS calls were retried",
+                retries=_request_context['retries'],
+                throttles=_request_context['throttles'],
+                throttle_failures=_request_context['throttle_failures']
+            )
+
+        # A request that failed because AWS kept throttling after every retry is
+        # reported as a retryable 503 rather than a server error
+        if response['statusCode'] == 500 and _request_context['throttle_failures']:
+            return response_with_cors(503, {"message": "Service is busy, please retry shortly."}, {"Retry-After": "1"})
+        return response
 
     except Exception as e:
-        print(f"[ERROR] Unhandled exception in lambda_handler: {str(e)}")
-        import traceback
-        print(f"[ERROR] Traceback: {traceback.format_exc()}")
-        return response_with_cors(500, {"message": "Internal server error", "error": str(e)})
\ No newline at end of file
+        log_error("Unhandled exception in lambda_handler", error=str(e), traceback=traceback.format_exc)
+        return response_with_cors(500, {"message": "Internal server error", "error": str(e)})
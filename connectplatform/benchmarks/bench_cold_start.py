@@ -0,0 +1,111 @@
+"""Cold-start benchmark: app.py import time and first-request time per route.
+
+Run from the repository root (needs requirements-dev.txt for moto):
+
+    python connectplatform/benchmarks/bench_cold_start.py > bench_output.txt
+
+Each sample runs in a fresh interpreter, so nothing is cached between runs. The
+child times `import app`, creates the template's tables and the archive bucket
+in moto with a separate boto3 session, then times the first lambda_handler call
+for one route. That call pays for building whichever AWS clients the route needs.
+The routes chosen never leave moto (no Chime or RazorPay API calls).
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_DIR = os.path.dirname(BENCH_DIR)
+
+# (label, method, path, path parameters, query, body): one route per route family
+ROUTES = [
+    ("GET /profiles", "GET", "/profiles", None, {"user_id": "u-1"}, None),
+    ("GET /services", "GET", "/services", None, None, None),
+    ("GET /bookings", "GET", "/bookings", None, {"student_id": "u-1"}, None),
+    ("GET /availability", "GET", "/availability", None, {"teacher_id": "t-1"}, None),
+    ("GET /sessions/{id}", "GET", "/sessions/{id}", {"id": "s-1"}, None, None),
+    ("GET /search/teachers", "GET", "/search/teachers", None, {"topic": "sanskrit"}, None),
+    ("GET /payments", "GET", "/payments", None, {"student_id": "u-1"}, None),
+    ("POST /presigned-url", "POST", "/presigned-url", None, None,
+     {"fileName": "notes.pdf", "fileType": "application/pdf", "sessionId": "s-1"}),
+    ("GET /meetings/{session_id}", "GET", "/meetings/{session_id}", {"session_id": "s-1"}, None, None),
+]
+
+def child(index):
+    """Runs one cold start and prints its timings as JSON."""
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+    os.environ.setdefault('STAGE', 'bench')
+    os.environ.setdefault('CURSOR_SIGNING_KEY', 'bench-cursor-key')
+    os.environ.setdefault('LOG_LEVEL', 'ERROR')
+    sys.path.insert(0, PACKAGE_DIR)
+
+    start = time.perf_counter()
+    import app
+    import_ms = (time.perf_counter() - start) * 1000
+
+    import boto3
+    from moto import mock_aws
+    sys.path.insert(0, os.path.join(PACKAGE_DIR, 'tests'))
+    from conftest import template_tables
+
+    label, method, path, path_parameters, query, body = ROUTES[index]
+    event = {
+        'httpMethod': method,
+        'path': path,
+        'resource': path,
+        'headers': {},
+        'queryStringParameters': query,
+        'pathParameters': path_parameters,
+        'body': json.dumps(body) if body is not None else None,
+        'isBase64Encoded': False,
+    }
+    with mock_aws():
+        # A separate session, so the app's own clients are still built cold
+        session = boto3.session.Session()
+        dynamodb = session.resource('dynamodb')
+        for table in template_tables(app.stage):
+            dynamodb.create_table(**table)
+        session.client('s3').create_bucket(Bucket=app.ARCHIVE_BUCKET)
+
+        start = time.perf_counter()
+        response = app.lambda_handler(event, None)
+        first_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        app.lambda_handler(dict(event), None)
+        warm_ms = (time.perf_counter() - start) * 1000
+
+    print(json.dumps({'import_ms': import_ms, 'first_ms': first_ms, 'warm_ms': warm_ms,
+                      'status': response['statusCode']}))
+
+def run_sample(index):
+    """Starts a fresh interpreter for one cold start of ROUTES[index]."""
+    with open(os.devnull, 'w') as devnull:
+        output = subprocess.check_output(
+            [sys.executable, os.path.abspath(__file__), '--child', str(index)],
+            stderr=devnull, text=True)
+    # The handler may print; the timings are the last line
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    runs = int(os.environ.get('BENCH_RUNS', '5'))
+    print(f"Cold start per route, median of {runs} fresh interpreters (ms)")
+    print(f"{'route':<28}{'import':>10}{'first req':>12}{'warm req':>11}{'status':>8}")
+    for index, route in enumerate(ROUTES):
+        samples = [run_sample(index) for _ in range(runs)]
+        print(f"{route[0]:<28}"
+              f"{statistics.median(s['import_ms'] for s in samples):>10.1f}"
+              f"{statistics.median(s['first_ms'] for s in samples):>12.1f}"
+              f"{statistics.median(s['warm_ms'] for s in samples):>11.1f}"
+              f"{samples[-1]['status']:>8}")
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3 and sys.argv[1] == '--child':
+        child(int(sys.argv[2]))
+    else:
+        main()
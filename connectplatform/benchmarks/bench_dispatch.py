@@ -0,0 +1,188 @@
+"""Micro-benchmark: route dispatch via the route table vs the old if/elif chain.
+
+Run from the repository root:
+
+    python connectplatform/benchmarks/bench_dispatch.py > bench_output.txt
+
+The legacy chain below is the routing half of the old lambda_handler (the
+path-to-resource mapping followed by the resource/method comparisons), with its
+print() calls dropped so both sides time routing alone. It returns handler
+names; resolve_route returns the handler functions themselves.
+"""
+import os
+import sys
+import timeit
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('STAGE', 'bench')
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import app  # noqa: E402
+
+LEGACY_CHAIN = [
+    ("/profiles", "GET", "get_user_profile"),
+    ("/profiles", "POST", "create_user_profile"),
+    ("/services", "POST", "create_service"),
+    ("/services", "GET", "get_services"),
+    ("/bookings", "POST", "create_booking"),
+    ("/bookings", "GET", "get_bookings"),
+    ("/bookings/{booking_id}/session", "GET", "get_booking_session"),
+    ("/bookings/{booking-id}/session", "GET", "get_booking_session"),
+    ("/availability", "POST", "create_availability"),
+    ("/availability", "GET", "get_availabilities"),
+    ("/availability/{id}", "DELETE", "delete_availability"),
+    ("/sessions", "POST", "create_session"),
+    ("/sessions/{id}", "GET", "get_session"),
+    ("/sessions/{id}", "PUT", "update_session"),
+    ("/search/teachers", "GET", "search_teachers"),
+    ("/payments/initialize", "POST", "initialize_payment"),
+    ("/payments/verify", "POST", "verify_payment"),
+    ("/payments", "GET", "get_payments"),
+    ("/admin/financial-reports", "GET", "get_financial_reports"),
+    ("/admin/razorpay-config", "POST", "save_razorpay_config"),
+    ("/admin/razorpay-config", "GET", "get_razorpay_config"),
+    ("/presigned-url", "POST", "generate_presigned_url"),
+    ("/meetings", "POST", "create_chime_meeting"),
+    ("/meetings/{session_id}", "GET", "get_chime_meeting"),
+    ("/meetings", "DELETE", "end_chime_meeting"),
+    ("/attendees", "POST", "create_chime_attendee"),
+]
+
+def legacy_resolve(event):
+    """The old routing: map the raw path to a resource, then walk the chain."""
+    method = event['httpMethod']
+    resource = event.get('resource')
+    path = event.get('path', '')
+
+    if not resource and path:
+        if path.startswith('/profiles'):
+            resource = "/profiles"
+        elif path.startswith('/services'):
+            resource = "/services"
+        elif '/bookings/' in path and '/session' in path:
+            resource = "/bookings/{booking_id}/session"
+            path_parts = path.split('/')
+            booking_index = -1
+            for i, part in enumerate(path_parts):
+                if part == 'bookings':
+                    booking_index = i
+                    break
+            if booking_index >= 0 and booking_index + 1 < len(path_parts):
+                if 'pathParameters' not in event:
+                    event['pathParameters'] = {}
+                event['pathParameters']['booking_id'] = path_parts[booking_index + 1]
+        elif path.startswith('/bookings'):
+            resource = "/bookings"
+        elif path.startswith('/availability') and len(path.split('/')) > 2:
+            resource = "/availability/{id}"
+        elif path.startswith('/availability'):
+            resource = "/availability"
+        elif path.startswith('/sessions') and len(path.split('/')) > 2:
+            resource = "/sessions/{id}"
+        elif path.startswith('/sessions'):
+            resource = "/sessions"
+        elif path.startswith('/search/teachers'):
+            resource = "/search/teachers"
+        elif path.startswith('/presigned-url'):
+            resource = "/presigned-url"
+        elif path.startswith('/meetings/') and len(path.split('/')) > 2:
+            resource = "/meetings/{session_id}"
+            if 'pathParameters' not in event:
+                event['pathParameters'] = {}
+            event['pathParameters']['session_id'] = path.split('/meetings/')[1]
+        elif path.startswith('/meetings'):
+            resource = "/meetings"
+        elif path.startswith('/attendees'):
+            resource = "/attendees"
+
+    # The chain compares each route in turn, exactly as the elif ladder did
+    for route_resource, route_method, handler_name in LEGACY_CHAIN:
+        if resource == route_resource and method == route_method:
+            return handler_name
+    return None
+
+# (method, resource, path) for every route the old chain knew, in chain order
+REQUESTS = [
+    ("GET", "/profiles", "/profiles"),
+    ("POST", "/profiles", "/profiles"),
+    ("POST", "/services", "/services"),
+    ("GET", "/services", "/services"),
+    ("POST", "/bookings", "/bookings"),
+    ("GET", "/bookings", "/bookings"),
+    ("GET", "/bookings/{booking_id}/session", "/bookings/b-123/session"),
+    ("POST", "/availability", "/availability"),
+    ("GET", "/availability", "/availability"),
+    ("DELETE", "/availability/{id}", "/availability/a-123"),
+    ("POST", "/sessions", "/sessions"),
+    ("GET", "/sessions/{id}", "/sessions/s-123"),
+    ("PUT", "/sessions/{id}", "/sessions/s-123"),
+    ("GET", "/search/teachers", "/search/teachers"),
+    ("POST", "/payments/initialize", "/payments/initialize"),
+    ("POST", "/payments/verify", "/payments/verify"),
+    ("GET", "/payments", "/payments"),
+    ("GET", "/admin/financial-reports", "/admin/financial-reports"),
+    ("POST", "/admin/razorpay-config", "/admin/razorpay-config"),
+    ("GET", "/admin/razorpay-config", "/admin/razorpay-config"),
+    ("POST", "/presigned-url", "/presigned-url"),
+    ("POST", "/meetings", "/meetings"),
+    ("GET", "/meetings/{session_id}", "/meetings/s-123"),
+    ("DELETE", "/meetings", "/meetings"),
+    ("POST", "/attendees", "/attendees"),
+]
+
+def make_events(with_resource):
+    """Builds one event per route, with or without the API Gateway resource field."""
+    events = []
+    for method, resource, path in REQUESTS:
+        event = {'httpMethod': method, 'path': path}
+        if with_resource:
+            event['resource'] = resource
+        events.append(event)
+    return events
+
+def check_equivalent(events):
+    """Checks both dispatchers pick the same handler wherever the old chain found one.
+
+    Returns how many events the old chain could not route (its path mapping had
+    no /payments or /admin entries, so those 404ed without a resource).
+    """
+    missed = 0
+    for event in events:
+        handler, _ = app.resolve_route(dict(event))
+        legacy = legacy_resolve(dict(event))
+        if legacy is None:
+            missed += 1
+        elif handler is None or handler.__name__ != legacy:
+            raise SystemExit(f"Dispatch mismatch for {event['httpMethod']} {event['path']}: "
+                             f"{handler and handler.__name__} vs {legacy}")
+    return missed
+
+def time_per_call(resolve, events, number):
+    """Best-of-five time per dispatch in nanoseconds over the whole event mix."""
+    def run():
+        for event in events:
+            resolve(dict(event))
+    best = min(timeit.repeat(run, number=number, repeat=5))
+    return best / (number * len(events)) * 1e9
+
+def main():
+    number = 2000
+    print(f"Route dispatch, {len(REQUESTS)} routes, best of 5 x {number} passes (ns per request)")
+    print(f"{'event shape':<28}{'if/elif chain':>16}{'route table':>16}{'speedup':>10}")
+    for label, with_resource in (("resource set", True), ("path only (proxy)", False)):
+        events = make_events(with_resource)
+        missed = check_equivalent(events)
+        legacy = time_per_call(legacy_resolve, events, number)
+        table = time_per_call(app.resolve_route, events, number)
+        note = f"  (old chain 404s {missed} of these)" if missed else ""
+        print(f"{label:<28}{legacy:>16.0f}{table:>16.0f}{legacy / table:>9.1f}x{note}")
+
+    # The last route in the chain pays for every comparison before it
+    last = [e for e in make_events(True) if e['path'] == '/attendees']
+    legacy = time_per_call(legacy_resolve, last, number * 10)
+    table = time_per_call(app.resolve_route, last, number * 10)
+    print(f"{'last chain entry only':<28}{legacy:>16.0f}{table:>16.0f}{legacy / table:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
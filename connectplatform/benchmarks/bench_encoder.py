@@ -0,0 +1,95 @@
+"""Benchmark: one-pass DynamoJSONEncoder vs the old convert_decimal + json.dumps.
+
+Run from the repository root:
+
+    python connectplatform/benchmarks/bench_encoder.py > bench_output.txt
+
+Payloads are lists of 1k-50k booking-shaped items as boto3 returns them (numbers
+as Decimal). The old path is the removed convert_decimal, copied below, followed
+by a plain json.dumps. Peak memory is measured with tracemalloc in a separate
+run, since tracing slows both encoders down.
+"""
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+from decimal import Decimal
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('STAGE', 'bench')
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app import DynamoJSONEncoder  # noqa: E402
+
+SIZES = (1000, 5000, 10000, 50000)
+
+def convert_decimal(obj):
+    """Recursively converts DynamoDB decimal types to Python floats."""
+    if isinstance(obj, list):
+        return [convert_decimal(i) for i in obj]
+    elif isinstance(obj, dict):
+        return {k: convert_decimal(v) for k, v in obj.items()}
+    elif isinstance(obj, Decimal):
+        return float(obj)
+    return obj
+
+def make_items(count):
+    """Builds count booking items shaped like get_bookings results."""
+    items = []
+    for i in range(count):
+        day = 1 + i % 28
+        items.append({
+            'booking_id': f"b-{i:08d}",
+            'student_id': f"student-{i % 500}",
+            'teacher_id': f"teacher-{i % 40}",
+            'service_id': f"service-{i % 12}",
+            'availability_id': f"slot-{i:08d}",
+            'status': 'confirmed' if i % 3 else 'pending',
+            'start_time': f"2030-01-{day:02d}T10:00:00Z",
+            'end_time': f"2030-01-{day:02d}T11:00:00Z",
+            'start_epoch': Decimal(1893492000 + i * 3600),
+            'created_at': f"2029-12-{day:02d}T08:30:00Z",
+            'price': Decimal('1499.50') if i % 2 else Decimal(1500),
+            'duration_minutes': Decimal(60),
+            'notes': "Focus on sandhi rules and the first chapter of the Gita.",
+            'topics': ['grammar', 'recitation'],
+            'payment': {'amount': Decimal(150000), 'currency': 'INR', 'fee_rate': Decimal('0.02')},
+        })
+    return items
+
+def encode_legacy(items):
+    return json.dumps(convert_decimal(items))
+
+def encode_single_pass(items):
+    return json.dumps(items, cls=DynamoJSONEncoder)
+
+def best_ms(encode, items, number):
+    """Best-of-five time for one encode in milliseconds."""
+    return min(timeit.repeat(lambda: encode(items), number=number, repeat=5)) / number * 1000
+
+def peak_kib(encode, items):
+    """Peak traced allocation while encoding once, in KiB."""
+    tracemalloc.start()
+    encode(items)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+def main():
+    print("Response encoding, best of 5 (ms per payload) and peak traced memory (KiB)")
+    print(f"{'items':>7}{'old ms':>10}{'new ms':>10}{'speedup':>9}{'old KiB':>11}{'new KiB':>11}{'body KiB':>10}")
+    for size in SIZES:
+        items = make_items(size)
+        number = max(1, 20000 // size)
+        legacy = best_ms(encode_legacy, items, number)
+        single = best_ms(encode_single_pass, items, number)
+        legacy_peak = peak_kib(encode_legacy, items)
+        single_peak = peak_kib(encode_single_pass, items)
+        body_kib = len(encode_single_pass(items)) / 1024
+        print(f"{size:>7}{legacy:>10.1f}{single:>10.1f}{legacy / single:>8.2f}x"
+              f"{legacy_peak:>11.0f}{single_peak:>11.0f}{body_kib:>10.0f}")
+
+if __name__ == '__main__':
+    main()
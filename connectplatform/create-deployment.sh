@@ -64,6 +64,8 @@ if [[ "$OSTYPE" == "darwin"* ]]; then
   # Also update the deployment timestamp and version in environment variables to force Lambda update
   sed -i '' "s|DEPLOY_TIMESTAMP: !Ref AWS::StackName|DEPLOY_TIMESTAMP: '${TIMESTAMP_VERSION}'|g" deployment-template.yml
   sed -i '' "s|BUILD_VERSION: 'will-be-replaced-during-deployment'|BUILD_VERSION: '${TIMESTAMP_VERSION}'|g" deployment-template.yml
+  # Rename the API Gateway deployment so every build redeploys the stage
+  sed -i '' "s|^  ApiGatewayDeployment:|  ApiGatewayDeployment${TIMESTAMP_VERSION}:|" deployment-template.yml
 else
   # Linux version
   sed -i "s|S3Key: lambda-deployment.zip|S3Key: ${S3_KEY}|g" deployment-template.yml
@@ -79,6 +81,8 @@ else
   # Also update the deployment timestamp and version in environment variables to force Lambda update
   sed -i "s|DEPLOY_TIMESTAMP: !Ref AWS::StackName|DEPLOY_TIMESTAMP: '${TIMESTAMP_VERSION}'|g" deployment-template.yml
   sed -i "s|BUILD_VERSION: 'will-be-replaced-during-deployment'|BUILD_VERSION: '${TIMESTAMP_VERSION}'|g" deployment-template.yml
+  # Rename the API Gateway deployment so every build redeploys the stage
+  sed -i "s|^  ApiGatewayDeployment:|  ApiGatewayDeployment${TIMESTAMP_VERSION}:|" deployment-template.yml
 fi
 echo "Template updated with version identifier v${TIMESTAMP_VERSION}"
 
@@ -0,0 +1,71 @@
+#!/bin/bash
+# Creates or updates the API stack.
+#
+# CloudFormation rejects a stack update that adds more than one GSI to a
+# table, so new indexes are gated on the IndexRolloutStep parameter (see the
+# template's Conditions). A new stack is created with every index at once; an
+# existing one is advanced one step per update, starting after the step it is
+# on (stacks from before the parameter existed start at step 1).
+#
+# After a stack is created or upgraded this way, the maintenance function runs
+# the data migrations (app.DATA_MIGRATIONS) so items written before the new
+# indexes and tables existed show up in them. Set RUN_DATA_MIGRATIONS=1 to run
+# them on any other deploy too; they are safe to re-run.
+#
+# Usage: ./deploy-stack.sh <template-file> [Key=Value parameter overrides...]
+set -e
+
+TEMPLATE_FILE=$1
+shift
+STACK_NAME=${STACK_NAME:-yoursanskritteacher-api}
+REGION=${AWS_REGION:-us-east-1}
+FINAL_STEP=3
+
+deploy() {
+  echo "Deploying ${STACK_NAME} ($1)"
+  aws cloudformation deploy \
+    --template-file "$TEMPLATE_FILE" \
+    --stack-name "$STACK_NAME" \
+    --parameter-overrides "$@" \
+    --capabilities CAPABILITY_IAM CAPABILITY_NAMED_IAM CAPABILITY_AUTO_EXPAND \
+    --no-fail-on-empty-changeset \
+    --region "$REGION"
+}
+
+if ! aws cloudformation describe-stacks --stack-name "$STACK_NAME" --region "$REGION" >/dev/null 2>&1; then
+  NEXT_STEP=$FINAL_STEP
+else
+  CURRENT_STEP=$(aws cloudformation describe-stacks --stack-name "$STACK_NAME" --region "$REGION" \
+    --query "Stacks[0].Parameters[?ParameterKey=='IndexRolloutStep'].ParameterValue" --output text)
+  if [[ "$CURRENT_STEP" =~ ^[0-9]+$ ]]; then
+    NEXT_STEP=$((CURRENT_STEP + 1))
+  else
+    NEXT_STEP=1
+  fi
+fi
+
+# Each step waits for the previous update (and its index backfills) to finish
+for ((STEP = NEXT_STEP; STEP < FINAL_STEP; STEP++)); do
+  deploy "IndexRolloutStep=$STEP" "$@"
+done
+deploy "IndexRolloutStep=$FINAL_STEP" "$@"
+
+if [[ $NEXT_STEP -le $FINAL_STEP || "${RUN_DATA_MIGRATIONS:-0}" == "1" ]]; then
+  FUNCTION_NAME=$(aws cloudformation describe-stacks --stack-name "$STACK_NAME" --region "$REGION" \
+    --query "Stacks[0].Outputs[?OutputKey=='MaintenanceFunctionName'].OutputValue" --output text)
+  echo "Running data migrations (${FUNCTION_NAME})"
+  OUTPUT_FILE=$(mktemp)
+  FUNCTION_ERROR=$(aws lambda invoke \
+    --function-name "$FUNCTION_NAME" \
+    --cli-read-timeout 900 \
+    --region "$REGION" \
+    --query FunctionError --output text \
+    "$OUTPUT_FILE")
+  cat "$OUTPUT_FILE"
+  echo
+  rm -f "$OUTPUT_FILE"
+  if [[ -n "$FUNCTION_ERROR" && "$FUNCTION_ERROR" != "None" ]]; then
+    echo "Data migrations failed: ${FUNCTION_ERROR}"
+    exit 1
+  fi
+fi
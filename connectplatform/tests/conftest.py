@@ -0,0 +1,110 @@
+"""Shared fixtures: app.py against moto's in-memory AWS.
+
+Tables are created from template.yml, so the tests use the same keys and
+indexes as the deployed stack.
+"""
+import os
+import sys
+
+import pytest
+import yaml
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+os.environ.setdefault('STAGE', 'test')
+os.environ.setdefault('CURSOR_SIGNING_KEY', 'test-cursor-key')
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_DIR = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, PACKAGE_DIR)
+
+from moto import mock_aws  # noqa: E402
+
+import app as app_module  # noqa: E402
+
+
+class _TemplateLoader(yaml.SafeLoader):
+    """Loads CloudFormation short-form tags (!Sub, !If, ...) as {'Fn::Name': value} dicts."""
+
+
+def _construct_tag(loader, tag_suffix, node):
+    if isinstance(node, yaml.ScalarNode):
+        value = loader.construct_scalar(node)
+    elif isinstance(node, yaml.SequenceNode):
+        value = loader.construct_sequence(node, deep=True)
+    else:
+        value = loader.construct_mapping(node, deep=True)
+    name = 'Ref' if tag_suffix == 'Ref' else f'Fn::{tag_suffix}'
+    return {name: value}
+
+
+_TemplateLoader.add_multi_constructor('!', _construct_tag)
+
+_NO_VALUE = object()
+
+
+def _resolve(value, stage, conditions):
+    """Resolves the template functions table definitions use.
+
+    An !If takes its true branch unless conditions maps its condition to False.
+    """
+    if isinstance(value, list):
+        resolved = [_resolve(entry, stage, conditions) for entry in value]
+        return [entry for entry in resolved if entry is not _NO_VALUE]
+    if not isinstance(value, dict):
+        return value
+    if value == {'Ref': 'AWS::NoValue'}:
+        return _NO_VALUE
+    if 'Fn::Sub' in value:
+        return value['Fn::Sub'].replace('${Stage}', stage)
+    if 'Fn::If' in value:
+        condition, if_true, if_false = value['Fn::If']
+        return _resolve(if_true if conditions.get(condition, True) else if_false, stage, conditions)
+    resolved = {key: _resolve(entry, stage, conditions) for key, entry in value.items()}
+    return {key: entry for key, entry in resolved.items() if entry is not _NO_VALUE}
+
+
+def template_tables(stage, conditions=None):
+    """Returns create_table arguments for every DynamoDB table in template.yml.
+
+    conditions optionally maps template condition names to False (all default to True).
+    """
+    with open(os.path.join(PACKAGE_DIR, 'template.yml')) as template_file:
+        template = yaml.load(template_file, Loader=_TemplateLoader)
+    tables = []
+    for resource in template['Resources'].values():
+        if resource['Type'] != 'AWS::DynamoDB::Table':
+            continue
+        properties = _resolve(resource['Properties'], stage, conditions or {})
+        tables.append({
+            key: properties[key]
+            for key in ('TableName', 'BillingMode', 'AttributeDefinitions', 'KeySchema', 'GlobalSecondaryIndexes')
+            if key in properties
+        })
+    return tables
+
+
+@pytest.fixture
+def app():
+    """The app module with its memoized AWS clients and archive state cleared (a cold container)."""
+    app_module._aws_clients.clear()
+    app_module._archive_bucket_missing = False
+    yield app_module
+    app_module._aws_clients.clear()
+    app_module._archive_bucket_missing = False
+
+
+@pytest.fixture
+def aws(app):
+    """moto-backed AWS with every table from template.yml and the archive bucket created."""
+    with mock_aws():
+        app._aws_clients.clear()
+        dynamodb = app.get_dynamodb()
+        for table in template_tables(app.stage):
+            dynamodb.create_table(**table)
+        app.get_s3_client().create_bucket(Bucket=app.ARCHIVE_BUCKET)
+        yield dynamodb
+        app._aws_clients.clear()
+
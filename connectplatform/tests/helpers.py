@@ -0,0 +1,16 @@
+"""Helpers shared by the test modules."""
+import json
+
+
+def api_event(method, path, body=None, query=None, path_parameters=None, headers=None):
+    """Builds an API Gateway proxy event for lambda_handler."""
+    return {
+        'httpMethod': method,
+        'path': path,
+        'resource': path,
+        'headers': headers or {},
+        'queryStringParameters': query,
+        'pathParameters': path_parameters,
+        'body': json.dumps(body) if body is not None else None,
+        'isBase64Encoded': False,
+    }
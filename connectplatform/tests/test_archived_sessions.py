@@ -0,0 +1,54 @@
+import gzip
+import json
+
+import pytest
+
+from helpers import api_event
+
+OLD_SESSION_ID = 'session-20200101-0f6c'
+RECENT_SESSION_ID = 'session-20991231-0f6c'
+
+
+def get_session(app, session_id):
+    return app.lambda_handler(api_event('GET', '/sessions/{id}', path_parameters={'id': session_id}), None)
+
+
+def test_archived_session_is_served(aws, app):
+    app.get_s3_client().put_object(Bucket=app.ARCHIVE_BUCKET, Key=f"sessions/by-id/{OLD_SESSION_ID}.json.gz",
+                                   Body=gzip.compress(json.dumps({'session_id': OLD_SESSION_ID}).encode()))
+
+    response = get_session(app, OLD_SESSION_ID)
+
+    assert response['statusCode'] == 200
+    assert json.loads(response['body'])['archived'] is True
+
+
+@pytest.mark.parametrize('session_id', [OLD_SESSION_ID, 'session-legacy-uuid'])
+def test_unknown_session_is_not_found(aws, app, session_id):
+    assert get_session(app, session_id)['statusCode'] == 404
+
+
+def test_recent_session_is_not_looked_up_in_the_archive(aws, app, monkeypatch):
+    monkeypatch.setattr(app, 'read_archive_object', lambda key: pytest.fail(f"read {key}"))
+
+    assert get_session(app, RECENT_SESSION_ID)['statusCode'] == 404
+
+
+def test_missing_archive_bucket_is_not_found(aws, app):
+    app.get_s3_client().delete_bucket(Bucket=app.ARCHIVE_BUCKET)
+
+    assert get_session(app, OLD_SESSION_ID)['statusCode'] == 404
+    assert app.archive_available() is False
+
+
+def test_unset_archive_bucket_skips_the_lookup(aws, app, monkeypatch):
+    monkeypatch.setattr(app, 'ARCHIVE_BUCKET', '')
+    monkeypatch.setattr(app, 'get_s3_client', lambda: pytest.fail("archive read"))
+
+    assert get_session(app, OLD_SESSION_ID)['statusCode'] == 404
+
+
+def test_new_session_ids_carry_the_start_date(app):
+    assert app.new_session_id('2030-01-10T10:00:00.000Z').startswith('session-20300110-')
+    assert app.session_id_may_be_archived(app.new_session_id('2020-01-10T10:00:00Z')) is True
+    assert app.session_id_may_be_archived(app.new_session_id('2099-01-10T10:00:00Z')) is False
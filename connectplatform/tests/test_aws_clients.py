@@ -0,0 +1,19 @@
+import importlib
+import threading
+
+
+def test_get_table_on_cold_module_returns(aws, app):
+    importlib.reload(app)
+    result = {}
+    worker = threading.Thread(target=lambda: result.update(table=app.get_table(app.PROFILE_TABLE)), daemon=True)
+    worker.start()
+    worker.join(timeout=10)
+
+    assert not worker.is_alive(), "get_table deadlocked"
+    assert result['table'].name == app.PROFILE_TABLE
+    assert result['table'].table_status == 'ACTIVE'
+
+
+def test_get_table_is_memoized(aws, app):
+    assert app.get_table(app.PROFILE_TABLE) is app.get_table(app.PROFILE_TABLE)
+    assert app.get_table(app.PROFILE_TABLE) is not app.get_table(app.BOOKINGS_TABLE)
@@ -0,0 +1,46 @@
+import json
+
+from helpers import api_event
+
+# More than one 1 MB scan page of sessions: ~1.2 KB each
+SESSION_COUNT = 1200
+PADDING = 'x' * 1024
+
+
+def test_newest_session_is_returned_among_many(aws, app):
+    app.get_table(app.BOOKINGS_TABLE).put_item(Item={
+        'booking_id': 'booking-target', 'student_id': 'student-1', 'teacher_id': 'teacher-1', 'status': 'confirmed',
+    })
+    table = app.get_table(app.SESSION_TABLE)
+    with table.batch_writer() as batch:
+        for i in range(SESSION_COUNT):
+            # Every 100th session belongs to the target booking, the rest to other bookings
+            booking_id = 'booking-target' if i % 100 == 0 else f"booking-{i}"
+            batch.put_item(Item={
+                'session_id': f"session-{i:05d}",
+                'booking_id': booking_id,
+                'created_at': f"2030-01-01T00:{i // 60:02d}:{i % 60:02d}",
+                'status': 'active',
+                'padding': PADDING,
+            })
+    assert 'LastEvaluatedKey' in table.scan()
+
+    response = app.lambda_handler(
+        api_event('GET', '/bookings/{booking_id}/session', path_parameters={'booking_id': 'booking-target'}), None)
+
+    assert response['statusCode'] == 200
+    session = json.loads(response['body'])
+    assert session['session_exists'] is True
+    assert session['session_id'] == 'session-01100'
+
+
+def test_booking_without_sessions_reports_none(aws, app):
+    app.get_table(app.BOOKINGS_TABLE).put_item(Item={
+        'booking_id': 'booking-empty', 'student_id': 'student-1', 'teacher_id': 'teacher-1', 'status': 'confirmed',
+    })
+
+    response = app.lambda_handler(
+        api_event('GET', '/bookings/{booking_id}/session', path_parameters={'booking_id': 'booking-empty'}), None)
+
+    assert response['statusCode'] == 200
+    assert json.loads(response['body'])['session_exists'] is False
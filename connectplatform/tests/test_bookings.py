@@ -0,0 +1,52 @@
+import json
+import threading
+from collections import Counter
+
+from helpers import api_event
+
+PARALLEL_REQUESTS = 12
+
+
+def put_open_slot(app, availability_id):
+    app.get_table(app.AVAILABILITY_TABLE).put_item(Item=app.with_time_keys({
+        'availability_id': availability_id,
+        'teacher_id': 'teacher-1',
+        'start_time': '2030-01-10T10:00:00Z',
+        'end_time': '2030-01-10T11:00:00Z',
+        'topic': 'Sanskrit grammar',
+        'status': 'available',
+        'open_status': 'available',
+    }))
+
+
+def test_parallel_bookings_of_one_slot_succeed_exactly_once(aws, app):
+    put_open_slot(app, 'slot-1')
+    barrier = threading.Barrier(PARALLEL_REQUESTS)
+    responses = [None] * PARALLEL_REQUESTS
+
+    def book(index):
+        event = api_event('POST', '/bookings', body={'student_id': f"student-{index}", 'availability_id': 'slot-1'})
+        barrier.wait()
+        responses[index] = app.lambda_handler(event, None)
+
+    threads = [threading.Thread(target=book, args=(index,)) for index in range(PARALLEL_REQUESTS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+
+    assert Counter(response['statusCode'] for response in responses) == {201: 1, 409: PARALLEL_REQUESTS - 1}
+    bookings = app.get_table(app.BOOKINGS_TABLE).scan()['Items']
+    winner = json.loads(next(r['body'] for r in responses if r['statusCode'] == 201))
+    assert [booking['booking_id'] for booking in bookings] == [winner['booking_id']]
+    slot = app.get_table(app.AVAILABILITY_TABLE).get_item(Key={'availability_id': 'slot-1'})['Item']
+    assert slot['status'] == 'booked'
+    assert 'open_status' not in slot
+
+
+def test_booking_a_taken_slot_conflicts(aws, app):
+    put_open_slot(app, 'slot-2')
+    event = api_event('POST', '/bookings', body={'student_id': 'student-1', 'availability_id': 'slot-2'})
+
+    assert app.lambda_handler(event, None)['statusCode'] == 201
+    assert app.lambda_handler(event, None)['statusCode'] == 409
@@ -0,0 +1,107 @@
+import pytest
+from botocore.exceptions import ClientError
+
+FEATURES = {'Audio': {'EchoReduction': 'AVAILABLE'}}
+
+
+def chime_error(code, status=400):
+    return ClientError({'Error': {'Code': code, 'Message': code},
+                        'ResponseMetadata': {'HTTPStatusCode': status}}, 'CreateMeeting')
+
+
+class FakeChime:
+    """Stands in for the Chime SDK Meetings client, recording every create_meeting call.
+
+    feature_error is raised for calls that pass MeetingFeatures, plain_error for calls without.
+    """
+
+    def __init__(self, feature_error=None, plain_error=None):
+        self.feature_error = feature_error
+        self.plain_error = plain_error
+        self.calls = []
+
+    def create_meeting(self, **kwargs):
+        self.calls.append('features' if 'MeetingFeatures' in kwargs else 'plain')
+        error = self.feature_error if 'MeetingFeatures' in kwargs else self.plain_error
+        if error:
+            raise error
+        return {'Meeting': {'MeetingId': f"meeting-{len(self.calls)}"}}
+
+
+def create_meeting(app, chime):
+    return app.call_with_chime_features(
+        'create_meeting',
+        lambda: chime.create_meeting(ExternalMeetingId='session-1', MeetingFeatures=FEATURES),
+        lambda: chime.create_meeting(ExternalMeetingId='session-1'),
+    )
+
+
+@pytest.fixture
+def chime_cache(app):
+    app._chime_feature_support.clear()
+    yield app._chime_feature_support
+    app._chime_feature_support.clear()
+
+
+def test_cached_rejection_skips_the_feature_attempt(app, chime_cache):
+    chime = FakeChime(feature_error=chime_error('BadRequestException'))
+
+    create_meeting(app, chime)
+    create_meeting(app, chime)
+    create_meeting(app, chime)
+
+    assert chime.calls == ['features', 'plain', 'plain', 'plain']
+    assert app.chime_feature_supported('create_meeting') is False
+
+
+def test_accepted_features_are_used_on_every_call(app, chime_cache):
+    chime = FakeChime()
+
+    create_meeting(app, chime)
+    create_meeting(app, chime)
+
+    assert chime.calls == ['features', 'features']
+    assert app.chime_feature_supported('create_meeting') is True
+
+
+@pytest.mark.parametrize('error', [
+    chime_error('ThrottlingException'),
+    chime_error('ServiceUnavailableException', 503),
+    chime_error('BadRequestException', 500),
+])
+def test_transient_error_is_raised_without_fallback(app, chime_cache, error):
+    chime = FakeChime(feature_error=error)
+
+    with pytest.raises(ClientError) as raised:
+        create_meeting(app, chime)
+
+    assert raised.value is error
+    assert chime.calls == ['features']
+    assert app.chime_feature_supported('create_meeting') is None
+
+
+def test_failed_plain_call_is_not_cached(app, chime_cache):
+    chime = FakeChime(feature_error=chime_error('BadRequestException'),
+                      plain_error=chime_error('BadRequestException'))
+
+    with pytest.raises(ClientError):
+        create_meeting(app, chime)
+
+    assert chime.calls == ['features', 'plain']
+    assert app.chime_feature_supported('create_meeting') is None
+
+    # The next call still tries the features first
+    chime.feature_error = chime.plain_error = None
+    create_meeting(app, chime)
+    assert chime.calls == ['features', 'plain', 'features']
+
+
+def test_expired_rejection_is_retried(app, chime_cache, monkeypatch):
+    chime = FakeChime(feature_error=chime_error('ValidationException'))
+    create_meeting(app, chime)
+
+    now = app.time.time()
+    monkeypatch.setattr(app.time, 'time', lambda: now + app.CHIME_FEATURE_CACHE_TTL_SECONDS + 1)
+    create_meeting(app, chime)
+
+    assert chime.calls == ['features', 'plain', 'features', 'plain']
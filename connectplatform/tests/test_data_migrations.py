@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+from helpers import api_event
+
+
+def test_migrations_bring_existing_items_into_the_new_tables(aws, app):
+    # Written before the search index and SessionItems existed
+    app.get_table(app.PROFILE_TABLE).put_item(Item={
+        'user_id': 'teacher-1', 'name': 'Kalidasa', 'roles': ['teacher'], 'topics': ['Poetry'],
+    })
+    app.get_table(app.SESSION_TABLE).put_item(Item={
+        'session_id': 'session-1', 'booking_id': 'booking-1', 'created_at': '2030-01-01T10:00:00',
+        'notes': [{'text': 'Read canto one', 'author_id': 'teacher-1', 'timestamp': '2030-01-01T10:05:00'}],
+    })
+
+    results = app.run_data_migrations({}, None)
+
+    assert list(results) == list(app.DATA_MIGRATIONS)
+    search = app.lambda_handler(api_event('GET', '/search/teachers', query={'topic': 'poetry'}), None)
+    assert [teacher['user_id'] for teacher in json.loads(search['body'])] == ['teacher-1']
+    items = app.lambda_handler(api_event('GET', '/sessions/{id}/items', path_parameters={'id': 'session-1'}), None)
+    assert [item['text'] for item in json.loads(items['body'])] == ['Read canto one']
+
+
+def test_selected_migrations_run_alone(aws, app):
+    assert list(app.run_data_migrations({'migrations': ['rebuild_payment_rollups']}, None)) == ['rebuild_payment_rollups']
+
+    with pytest.raises(ValueError):
+        app.run_data_migrations({'migrations': ['drop_everything']}, None)
@@ -0,0 +1,40 @@
+import json
+from decimal import Decimal
+
+from helpers import api_event
+
+
+def put_completed_payment(app, payment_id, created_at, amount=500):
+    app.get_table(app.PAYMENTS_TABLE).put_item(Item=app.with_time_keys({
+        'payment_id': payment_id,
+        'order_id': f"order-{payment_id}",
+        'student_id': 'student-1',
+        'teacher_id': 'teacher-1',
+        'amount': Decimal(amount),
+        'status': 'completed',
+        'created_at': created_at,
+    }))
+
+
+def test_summary_and_rows_cover_the_same_days(aws, app):
+    put_completed_payment(app, 'inside-last-day', '2030-01-31T10:00:00Z')
+    put_completed_payment(app, 'first-day', '2030-01-01T00:00:00Z')
+    put_completed_payment(app, 'after-window', '2030-02-01T00:00:00Z')
+    put_completed_payment(app, 'before-window', '2029-12-31T23:59:59Z')
+    app.rebuild_payment_rollups({}, None)
+    query = {'start_date': '2030-01-01', 'end_date': '2030-01-31'}
+
+    summary = app.lambda_handler(api_event('GET', '/admin/financial-reports', query=query), None)
+    rows = app.lambda_handler(api_event('GET', '/admin/financial-reports/payments', query=query), None)
+
+    assert summary['statusCode'] == 200
+    assert rows['statusCode'] == 200
+    payment_ids = sorted(payment['payment_id'] for payment in json.loads(rows['body'])['items'])
+    assert payment_ids == ['first-day', 'inside-last-day']
+    assert json.loads(summary['body'])['summary']['payment_count'] == len(payment_ids)
+
+
+def test_invalid_report_dates_are_rejected(aws, app):
+    for path in ('/admin/financial-reports', '/admin/financial-reports/payments'):
+        response = app.lambda_handler(api_event('GET', path, query={'end_date': 'January'}), None)
+        assert response['statusCode'] == 400
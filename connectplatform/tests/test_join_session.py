@@ -0,0 +1,105 @@
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+from botocore.exceptions import ClientError
+
+from helpers import api_event
+
+
+class NotFoundException(ClientError):
+    def __init__(self):
+        super().__init__({'Error': {'Code': 'NotFoundException', 'Message': 'Meeting ended'}}, 'GetMeeting')
+
+
+class FakeChime:
+    """Stands in for the Chime SDK Meetings client; live_meetings holds the meetings Chime still knows."""
+
+    exceptions = SimpleNamespace(NotFoundException=NotFoundException, BadRequestException=NotFoundException,
+                                 ForbiddenException=NotFoundException)
+
+    def __init__(self, live_meetings=()):
+        self.live_meetings = set(live_meetings)
+        self.calls = []
+
+    def get_meeting(self, MeetingId):
+        self.calls.append('get_meeting')
+        if MeetingId not in self.live_meetings:
+            raise NotFoundException()
+        return {'Meeting': {'MeetingId': MeetingId}}
+
+    def create_meeting(self, **kwargs):
+        self.calls.append('create_meeting')
+        meeting_id = f"meeting-{len(self.calls)}"
+        self.live_meetings.add(meeting_id)
+        return {'Meeting': {'MeetingId': meeting_id}}
+
+    def batch_create_attendee(self, MeetingId, Attendees):
+        self.calls.append('batch_create_attendee')
+        return {'Attendees': [{'ExternalUserId': attendee['ExternalUserId'], 'AttendeeId': f"{MeetingId}-new",
+                               'JoinToken': 'new-token'} for attendee in Attendees]}
+
+    def create_attendee(self, MeetingId, ExternalUserId, **kwargs):
+        self.calls.append('create_attendee')
+        return {'Attendee': {'ExternalUserId': ExternalUserId, 'AttendeeId': f"{MeetingId}-single",
+                             'JoinToken': 'single-token'}}
+
+
+@pytest.fixture
+def chime(aws, app):
+    app._chime_feature_support.clear()
+    fake = FakeChime(live_meetings={'meeting-stored'})
+    app._aws_clients['chime-sdk-meetings'] = fake
+    app.get_table(app.SESSION_TABLE).put_item(Item={
+        'session_id': 'session-1',
+        'teacher_id': 'teacher-1',
+        'student_id': 'student-1',
+        'chime_meeting_id': 'meeting-stored',
+        'chime_meeting_data': json.dumps({'MeetingId': 'meeting-stored'}),
+        'chime_attendees': {'student-1': {'AttendeeId': 'stored-attendee', 'JoinToken': 'stored-token'}},
+        'chime_attendees_expire_at': int(time.time()) + 3600,
+    })
+    yield fake
+    app._chime_feature_support.clear()
+
+
+def join(app, **body):
+    response = app.lambda_handler(api_event('POST', '/sessions/{id}/join', path_parameters={'id': 'session-1'},
+                                            body={'user_id': 'student-1', **body}), None)
+    assert response['statusCode'] == 200
+    return json.loads(response['body'])
+
+
+def test_join_serves_the_stored_token_once_the_meeting_is_verified(app, chime):
+    joined = join(app)
+
+    assert chime.calls == ['get_meeting']
+    assert joined['meeting']['MeetingId'] == 'meeting-stored'
+    assert joined['attendee']['AttendeeId'] == 'stored-attendee'
+
+
+def test_join_recreates_an_ended_meeting_instead_of_serving_stale_tokens(app, chime):
+    chime.live_meetings.clear()
+
+    joined = join(app)
+
+    assert chime.calls == ['get_meeting', 'create_meeting', 'batch_create_attendee']
+    assert joined['meeting']['MeetingId'] != 'meeting-stored'
+    assert joined['attendee']['JoinToken'] == 'new-token'
+    session = app.get_table(app.SESSION_TABLE).get_item(Key={'session_id': 'session-1'})['Item']
+    assert session['chime_meeting_id'] == joined['meeting']['MeetingId']
+
+
+def test_reconnect_is_served_from_storage(app, chime):
+    joined = join(app, reconnect=True)
+
+    assert chime.calls == []
+    assert joined['attendee']['AttendeeId'] == 'stored-attendee'
+
+
+def test_refresh_creates_a_new_token_for_the_live_meeting(app, chime):
+    joined = join(app, refresh=True, reconnect=True)
+
+    assert chime.calls == ['get_meeting', 'create_attendee']
+    assert joined['attendee']['AttendeeId'] == 'meeting-stored-single'
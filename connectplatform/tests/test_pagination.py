@@ -0,0 +1,68 @@
+from decimal import Decimal
+
+import pytest
+
+
+def test_cursor_round_trip(app):
+    key = {'booking_id': 'booking-1', 'start_epoch': Decimal(1767225600)}
+    assert app.decode_cursor(app.encode_cursor(key)) == key
+
+
+def test_tampered_cursor_is_rejected(app):
+    signature = app.encode_cursor({'booking_id': 'booking-1'}).partition('.')[2]
+    forged = app.encode_cursor({'booking_id': 'booking-2'}).partition('.')[0]
+    with pytest.raises(ValueError):
+        app.decode_cursor(f"{forged}.{signature}")
+
+
+def test_cursors_fail_closed_without_signing_key(app, monkeypatch):
+    cursor = app.encode_cursor({'booking_id': 'booking-1'})
+    monkeypatch.setattr(app, 'CURSOR_SIGNING_KEY', b'')
+    with pytest.raises(RuntimeError):
+        app.encode_cursor({'booking_id': 'booking-1'})
+    with pytest.raises(RuntimeError):
+        app.decode_cursor(cursor)
+
+
+class FakeScan:
+    """A scan over ids 0..count-1 that evaluates Limit items per call, like DynamoDB."""
+
+    def __init__(self, count, predicate):
+        self.rows = [{'id': f"{index:06d}"} for index in range(count)]
+        self.predicate = predicate
+        self.calls = 0
+
+    def __call__(self, Limit=None, ExclusiveStartKey=None):
+        self.calls += 1
+        start = 0
+        if ExclusiveStartKey:
+            start = next(i for i, row in enumerate(self.rows) if row['id'] == ExclusiveStartKey['id']) + 1
+        end = len(self.rows) if Limit is None else min(start + Limit, len(self.rows))
+        response = {'Items': [dict(row) for row in self.rows[start:end] if self.predicate(row)]}
+        if end < len(self.rows) or Limit is not None and end - start == Limit:
+            response['LastEvaluatedKey'] = {'id': self.rows[end - 1]['id']}
+        return response
+
+
+def test_unpaged_fetch_uses_fixed_pages_for_sparse_filters(app):
+    scan = FakeScan(20000, lambda row: int(row['id']) % 10 == 0)
+
+    items, next_cursor = app.fetch_page(scan, max_items=100)
+
+    assert len(items) == 100
+    assert next_cursor is not None
+    # 100 matches need ~1000 rows evaluated: a handful of fixed-size pages
+    assert scan.calls <= 11
+
+
+def test_unpaged_fetch_is_capped_and_resumes_after_last_item(app):
+    scan = FakeScan(1000, lambda row: int(row['id']) % 3 != 0)
+    expected = [row['id'] for row in scan.rows if scan.predicate(row)]
+
+    first_page, next_cursor = app.fetch_page(scan, max_items=250)
+    rest, last_cursor = app.fetch_page(scan, cursor=next_cursor)
+
+    # The cap falls mid-page; the cursor resumes right after the last item returned
+    assert len(first_page) == 250
+    assert last_cursor is None
+    assert [item['id'] for item in first_page + rest] == expected
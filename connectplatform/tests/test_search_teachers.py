@@ -0,0 +1,65 @@
+import json
+
+from helpers import api_event
+
+
+def put_teacher(app, user_id, name, topics, old_profile=None):
+    profile = {'user_id': user_id, 'name': name, 'roles': ['teacher'], 'topics': topics}
+    app.get_table(app.PROFILE_TABLE).put_item(Item=profile)
+    app.update_teacher_search_index(user_id, old_profile, profile)
+    return profile
+
+
+def search(app, text, **query):
+    response = app.lambda_handler(api_event('GET', '/search/teachers', query={'topic': text, **query}), None)
+    assert response['statusCode'] == 200
+    return json.loads(response['body'])
+
+
+def test_every_word_must_match_name_or_topics(aws, app):
+    put_teacher(app, 'teacher-1', 'Kalidasa', ['Poetry', 'Grammar'])
+    put_teacher(app, 'teacher-2', 'Kalidasa Rao', ['Vedanta'])
+    put_teacher(app, 'teacher-3', 'Panini', ['Grammar'])
+
+    assert [t['user_id'] for t in search(app, 'gram kalidasa')] == ['teacher-1']
+    assert [t['user_id'] for t in search(app, 'kalidasa')] == ['teacher-1', 'teacher-2']
+    assert search(app, 'kalidasa grammar', type='name') == []
+
+
+def test_pages_continue_from_the_index_key(aws, app):
+    for index in range(5):
+        put_teacher(app, f"teacher-{index}", f"Guru {index}", ['Grammar'])
+    # Matches by name and by topic, but must be returned once
+    put_teacher(app, 'teacher-9', 'Grammarian', ['Grammar'])
+
+    seen, cursor = [], None
+    while True:
+        page = search(app, 'gram', limit='2', **({'cursor': cursor} if cursor else {}))
+        assert len(page['items']) <= 2
+        seen.extend(t['user_id'] for t in page['items'])
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+
+    assert sorted(seen) == ['teacher-0', 'teacher-1', 'teacher-2', 'teacher-3', 'teacher-4', 'teacher-9']
+
+
+def test_read_is_capped_per_request(aws, app, monkeypatch):
+    monkeypatch.setattr(app, 'SEARCH_MAX_ENTRIES_READ', 2)
+    for index in range(3):
+        put_teacher(app, f"teacher-{index}", 'Guru', ['Nyaya'])
+
+    page = search(app, 'guru nyaya', limit='10')
+
+    assert len(page['items']) == 2
+    assert page['next_cursor']
+    rest = search(app, 'guru nyaya', limit='10', cursor=page['next_cursor'])
+    assert [t['user_id'] for t in rest['items']] == ['teacher-2']
+
+
+def test_renamed_teacher_is_found_by_the_new_words_only(aws, app):
+    old = put_teacher(app, 'teacher-1', 'Kalidasa', ['Poetry'])
+    put_teacher(app, 'teacher-1', 'Kalidasa', ['Drama'], old_profile=old)
+
+    assert [t['user_id'] for t in search(app, 'kalidasa drama')] == ['teacher-1']
+    assert search(app, 'kalidasa poetry') == []
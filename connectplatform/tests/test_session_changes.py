@@ -0,0 +1,59 @@
+import json
+
+from helpers import api_event
+
+
+def put_session_item(app, timestamp, text):
+    item = app.build_session_child_item('session-1', 'note', {'text': text, 'author_id': 'teacher-1'}, timestamp)
+    app.get_table(app.SESSION_ITEMS_TABLE).put_item(Item=item)
+    return item['item_key']
+
+
+def poll_changes(app, since=None):
+    event = api_event('GET', '/sessions/{id}/changes', path_parameters={'id': 'session-1'},
+                      query={'since': since} if since else None)
+    return app.lambda_handler(event, None)
+
+
+def test_late_committed_item_behind_the_cursor_is_returned(aws, app):
+    app.get_table(app.SESSION_TABLE).put_item(Item={'session_id': 'session-1', 'version': 1})
+    put_session_item(app, '2030-01-01T09:00:00.000000', 'long before the cursor')
+    cursor = put_session_item(app, '2030-01-01T10:00:10.000000', 'seen by the first poll')
+
+    first = json.loads(poll_changes(app)['body'])
+    assert first['cursor'] == cursor
+
+    # Another container stamped its write earlier but committed it after the poll
+    late_key = put_session_item(app, '2030-01-01T10:00:05.000000', 'committed late')
+    response = poll_changes(app, first['cursor'])
+
+    assert response['statusCode'] == 200
+    body = json.loads(response['body'])
+    assert [item['item_key'] for item in body['items']] == [late_key, cursor]
+    assert body['cursor'] == cursor
+
+
+def test_invalid_since_is_rejected(aws, app):
+    app.get_table(app.SESSION_TABLE).put_item(Item={'session_id': 'session-1', 'version': 1})
+
+    assert poll_changes(app, 'yesterday')['statusCode'] == 400
+
+
+def test_large_backlog_is_returned_in_pages(aws, app, monkeypatch):
+    monkeypatch.setattr(app, 'MAX_UNPAGED_ITEMS', 2)
+    app.get_table(app.SESSION_TABLE).put_item(Item={'session_id': 'session-1', 'version': 1})
+    keys = [put_session_item(app, f"2030-01-01T10:00:0{second}.000000", f"note {second}") for second in range(5)]
+
+    seen, page_cursor = [], None
+    while True:
+        query = {'cursor': page_cursor} if page_cursor else None
+        event = api_event('GET', '/sessions/{id}/changes', path_parameters={'id': 'session-1'}, query=query)
+        body = json.loads(app.lambda_handler(event, None)['body'])
+        assert len(body['items']) <= 2
+        seen.extend(item['item_key'] for item in body['items'])
+        page_cursor = body['next_cursor']
+        if not page_cursor:
+            break
+
+    assert seen == keys
+    assert body['cursor'] == keys[-1]
@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+from conftest import PACKAGE_DIR, template_tables
+
+# Template conditions in effect at each IndexRolloutStep
+ROLLOUT_STEPS = {
+    1: {'IndexStep2': False, 'IndexStep3': False},
+    2: {'IndexStep2': True, 'IndexStep3': False},
+    3: {'IndexStep2': True, 'IndexStep3': True},
+}
+
+
+def indexes_by_table(step):
+    return {
+        table['TableName']: {index['IndexName'] for index in table.get('GlobalSecondaryIndexes', [])}
+        for table in template_tables('test', ROLLOUT_STEPS[step])
+    }
+
+
+@pytest.mark.parametrize('step', [2, 3])
+def test_each_rollout_step_adds_at_most_one_index_per_table(step):
+    before, after = indexes_by_table(step - 1), indexes_by_table(step)
+    for table_name, indexes in after.items():
+        assert before[table_name] <= indexes
+        assert len(indexes - before[table_name]) <= 1, table_name
+
+
+@pytest.mark.parametrize('step', [1, 2, 3])
+def test_every_attribute_definition_is_a_key(step):
+    # CloudFormation rejects attribute definitions no key schema uses
+    for table in template_tables('test', ROLLOUT_STEPS[step]):
+        key_schemas = [table['KeySchema']] + [index['KeySchema'] for index in table.get('GlobalSecondaryIndexes', [])]
+        keys = {key['AttributeName'] for schema in key_schemas for key in schema}
+        defined = {definition['AttributeName'] for definition in table['AttributeDefinitions']}
+        assert defined == keys, table['TableName']
+
+
+# Indexes the stack's existing tables had before the rollout began
+PRE_ROLLOUT_INDEXES = {
+    'TeacherAvailability-test': set(),
+    'Bookings-test': set(),
+    'Sessions-test': set(),
+    'Payments-test': {'OrderIdIndex', 'StudentPaymentsIndex', 'TeacherPaymentsIndex'},
+}
+
+
+def test_first_rollout_step_adds_at_most_one_index_per_existing_table():
+    after = indexes_by_table(1)
+    for table_name, indexes in PRE_ROLLOUT_INDEXES.items():
+        assert indexes <= after[table_name]
+        assert len(after[table_name] - indexes) <= 1, table_name
+
+
+@pytest.mark.parametrize('template_name', ['template.yml', 'deployment-template.yml'])
+def test_api_deployment_can_be_renamed_per_build(template_name):
+    # create-deployment.sh renames the resource; nothing may refer to it by name
+    with open(os.path.join(PACKAGE_DIR, template_name)) as template_file:
+        lines = template_file.read().splitlines()
+    mentions = [line for line in lines if 'ApiGatewayDeployment' in line and not line.lstrip().startswith('#')]
+    assert mentions == ['  ApiGatewayDeployment:']
+
+
+@pytest.mark.parametrize('template_name', ['template.yml', 'deployment-template.yml'])
+def test_every_function_handler_exists(template_name, app):
+    with open(os.path.join(PACKAGE_DIR, template_name)) as template_file:
+        handlers = [line.split('Handler:', 1)[1].strip() for line in template_file if line.strip().startswith('Handler:')]
+    assert 'app.run_data_migrations' in handlers
+    for handler in handlers:
+        module, _, function = handler.partition('.')
+        assert module == 'app' and callable(getattr(app, function, None)), handler
@@ -0,0 +1,58 @@
+import hashlib
+import hmac
+import json
+
+import pytest
+
+from helpers import api_event
+
+KEY_SECRET = 'test-secret'
+
+
+@pytest.fixture
+def razorpay(aws, app):
+    app.invalidate_razorpay_cache()
+    app.get_table(app.RAZORPAY_CONFIG_TABLE).put_item(Item={
+        'config_id': 'razorpay_api_keys', 'key_id': 'rzp_test', 'key_secret': KEY_SECRET,
+    })
+    yield
+    app.invalidate_razorpay_cache()
+
+
+def verify(app, order_id):
+    signature = hmac.new(KEY_SECRET.encode(), f"{order_id}|pay-1".encode(), hashlib.sha256).hexdigest()
+    response = app.lambda_handler(api_event('POST', '/payments/verify', body={
+        'razorpay_payment_id': 'pay-1', 'razorpay_order_id': order_id, 'razorpay_signature': signature,
+        'student_id': 'student-1', 'teacher_id': 'teacher-1', 'availability_id': 'slot-1', 'amount': 500,
+    }), None)
+    assert response['statusCode'] == 200
+    return json.loads(response['body'])
+
+
+def total_rollup(app):
+    rows = app.get_table(app.PAYMENT_ROLLUPS_TABLE).scan()['Items']
+    return next(row for row in rows if row['rollup_key'].endswith('#total'))
+
+
+def test_repeated_verify_without_a_payment_record_counts_once(app, razorpay, monkeypatch):
+    # OrderIdIndex is eventually consistent, so the second call may not see the first record
+    monkeypatch.setattr(app, 'find_order_payment', lambda order_id: None)
+
+    first = verify(app, 'order-1')
+    second = verify(app, 'order-1')
+
+    assert first['payment_id'] == second['payment_id'] == app.order_payment_id('order-1')
+    assert len(app.get_table(app.PAYMENTS_TABLE).scan()['Items']) == 1
+    assert total_rollup(app)['payment_count'] == 1
+
+
+def test_verify_completes_an_initiated_payment_once(app, razorpay):
+    app.get_table(app.PAYMENTS_TABLE).put_item(Item=app.with_time_keys({
+        'payment_id': 'payment-legacy', 'order_id': 'order-2', 'teacher_id': 'teacher-1',
+        'amount': 500, 'status': 'initiated', 'created_at': '2030-01-01T10:00:00Z',
+    }))
+
+    assert verify(app, 'order-2')['payment_id'] == 'payment-legacy'
+    assert verify(app, 'order-2')['payment_id'] == 'payment-legacy'
+
+    assert total_rollup(app)['payment_count'] == 1
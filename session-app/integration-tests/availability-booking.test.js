@@ -86,20 +86,32 @@ describe('Availability and Booking API Integration Tests', () => {
     }
   }, 30000);
 
+  // Remove the slot if a failed run left it unbooked; booked slots stay with their booking
+  afterAll(async () => {
+    if (!createdAvailabilityId || createdBookingId) return;
+    
+    try {
+      await teacherClient.delete(`/availability/${createdAvailabilityId}`);
+    } catch (error) {
+      console.error('Error deleting test availability:', error.response?.data || error.message);
+    }
+  });
+
   // Teacher creates an availability slot
   test('POST /availability - Teacher creates availability slot', async () => {
-    // Create a slot for tomorrow
-    const tomorrow = new Date();
-    tomorrow.setDate(tomorrow.getDate() + 1);
-    tomorrow.setHours(10, 0, 0, 0); // 10:00 AM
+    // Create a one-minute slot exactly a day from now. Overlapping slots are
+    // rejected and a booked slot cannot be deleted, so each run needs its own
+    // time; runs started at least a minute apart never collide.
+    const slotStart = new Date(Date.now() + 24 * 60 * 60 * 1000);
+    slotStart.setSeconds(0, 0);
+    slotStart.setMinutes(slotStart.getMinutes() + 1);
     
-    const tomorrowEnd = new Date(tomorrow);
-    tomorrowEnd.setHours(11, 0, 0, 0); // 11:00 AM
+    const slotEnd = new Date(slotStart.getTime() + 60 * 1000);
     
     const availabilityData = {
       teacher_id: teacherId,
-      start_time: tomorrow.toISOString(),
-      end_time: tomorrowEnd.toISOString(),
+      start_time: slotStart.toISOString(),
+      end_time: slotEnd.toISOString(),
       topic: 'Integration Test Lesson',
       description: 'This is a test availability slot created by integration tests',
       price: 1000,
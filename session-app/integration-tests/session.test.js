@@ -4,7 +4,7 @@
  * These tests verify:
  * 1. Creating a session for a booking
  * 2. Retrieving session details
- * 3. Updating session notes/documents
+ * 3. Updating session notes/documents and listing them as session items
  * 4. Creating and retrieving Chime meeting information
  */
 
@@ -34,6 +34,7 @@ describe('Session API Integration Tests', () => {
   let authenticatedClient;
   let userId;
   let createdSessionId;
+  let addedNoteKey;
 
   // Before all tests, authenticate
   beforeAll(async () => {
@@ -143,17 +144,44 @@ describe('Session API Integration Tests', () => {
     
     expect(response.status).toBe(200);
     expect(response.data).toHaveProperty('message', 'Session updated successfully');
-    expect(response.data).toHaveProperty('session');
-    
-    // Verify notes array has our new note
-    expect(response.data.session).toHaveProperty('notes');
-    expect(Array.isArray(response.data.session.notes)).toBe(true);
-    
-    const foundNote = response.data.session.notes.find(note => 
-      note.text === updateData.note && note.author_id === updateData.author_id
+    expect(response.data).toHaveProperty('session_id', createdSessionId);
+
+    // Notes are stored as session items; the update returns the ones it added
+    expect(Array.isArray(response.data.items)).toBe(true);
+    const addedNote = response.data.items.find(item => 
+      item.item_type === 'note' && item.text === updateData.note && item.author_id === updateData.author_id
     );
-    
-    expect(foundNote).toBeTruthy();
+
+    expect(addedNote).toBeTruthy();
+    expect(addedNote).toHaveProperty('item_key');
+    addedNoteKey = addedNote.item_key;
+  });
+
+  test('GET /sessions/{id}/items - List session notes and documents', async () => {
+    // Skip if the note update did not run
+    if (!createdSessionId || !addedNoteKey) {
+      console.log('Skipping session items test - no note was added');
+      return;
+    }
+
+    const response = await authenticatedClient.get(`/sessions/${createdSessionId}/items`);
+
+    expect(response.status).toBe(200);
+    expect(Array.isArray(response.data)).toBe(true);
+    expect(response.data.some(item => item.item_key === addedNoteKey)).toBe(true);
+
+    // Items come back oldest first
+    const keys = response.data.map(item => item.item_key);
+    expect([...keys].sort()).toEqual(keys);
+
+    // type filters, and a page with limit is wrapped in an envelope
+    const notesPage = await authenticatedClient.get(`/sessions/${createdSessionId}/items?type=note&limit=1`);
+
+    expect(notesPage.status).toBe(200);
+    expect(notesPage.data).toHaveProperty('items');
+    expect(notesPage.data).toHaveProperty('next_cursor');
+    expect(notesPage.data.items.length).toBeLessThanOrEqual(1);
+    notesPage.data.items.forEach(item => expect(item.item_type).toBe('note'));
   });
 
   test('POST /meetings - Create a Chime meeting for the session', async () => {
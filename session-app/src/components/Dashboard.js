@@ -94,28 +94,25 @@ const Dashboard = ({ profile, onTabChange, onJoinSession, upcomingSession }) =>
       
       // For teachers, also fetch availability slots
       if (profile.role === "teacher") {
-        const availabilityResponse = await axios.get(
-          `${API_BASE_URL}/availability?teacher_id=${profile.user_id}`,
+        // Free/busy merges the teacher's slots and bookings on the server
+        const freeBusyResponse = await axios.get(
+          `${API_BASE_URL}/availability/freebusy?teacher_ids=${profile.user_id}`,
           {
             headers: {
               Authorization: `Bearer ${auth.user.access_token}`,
             },
           }
         );
-        
-        // Show only available slots and sort by date (future only)
-        const availableSlots = availabilityResponse.data
-          .filter(slot => slot.status === "available" && new Date(slot.start_time) > now)
-          .sort((a, b) => new Date(a.start_time) - new Date(b.start_time));
+        const teacherFreeBusy = freeBusyResponse.data.teachers[profile.user_id] || { free: [], open_slots: 0 };
         
         // Update the openSlots count in stats
         setStats(prevStats => ({
           ...prevStats,
-          openSlots: availableSlots.length
+          openSlots: teacherFreeBusy.open_slots
         }));
         
-        // Display only the first 3 slots in the UI
-        setAvailabilitySlots(availableSlots.slice(0, 3));
+        // Display only the first 3 free blocks in the UI
+        setAvailabilitySlots(teacherFreeBusy.free.slice(0, 3));
       }
     } catch (err) {
       console.error("Error fetching dashboard data:", err);
@@ -471,16 +468,14 @@ const Dashboard = ({ profile, onTabChange, onJoinSession, upcomingSession }) =>
               {availabilitySlots.length > 0 ? (
                 <div className="slots-container">
                   {availabilitySlots.map((slot) => (
-                    <div key={slot.availability_id} className="slot-card available">
+                    <div key={slot.start} className="slot-card available">
                       <div className="slot-header">
-                        <h4>{slot.topic}</h4>
+                        <h4>{formatDate(slot.start)}</h4>
                         <span className="status-badge available">Available</span>
                       </div>
                       
                       <div className="slot-details">
-                        <p><strong>Date:</strong> {formatDate(slot.start_time)}</p>
-                        <p><strong>Time:</strong> {formatTime(slot.start_time)} - {formatTime(slot.end_time)}</p>
-                        {slot.description && <p><strong>Description:</strong> {slot.description}</p>}
+                        <p><strong>Time:</strong> {formatTime(slot.start)} - {formatTime(slot.end)}</p>
                       </div>
                     </div>
                   ))}
@@ -255,48 +255,6 @@ const TeacherCalendarSchedule = () => {
     }
   };
 
-  // Save a single availability slot
-  const saveAvailabilitySlot = async (date, timeSlot) => {
-    try {
-      // Create start and end times (30 minutes apart)
-      const startDateTime = new Date(date);
-      startDateTime.setHours(timeSlot.hour, timeSlot.minute, 0, 0);
-
-      const endDateTime = new Date(startDateTime);
-      endDateTime.setMinutes(startDateTime.getMinutes() + 30);
-
-      // Note: The API no longer requires topic or description
-      // since availabilities are general and not topic-specific
-      // Get price for this slot (either custom or default)
-      const slotKey = `${date.toDateString()}-${timeSlot.hour}-${
-        timeSlot.minute
-      }`;
-      const price = slotPrices[slotKey] || defaultPrice;
-
-      const slotData = {
-        teacher_id: auth.user.profile.sub,
-        start_time: startDateTime.toISOString(),
-        end_time: endDateTime.toISOString(),
-        status: "available",
-        price: price, // Add price to slot data
-        currency: "INR", // Default currency
-      };
-
-      await axios.post(`${API_BASE_URL}/availability`, slotData, {
-        headers: {
-          Authorization: `Bearer ${auth.user.access_token}`,
-          "Content-Type": "application/json",
-        },
-      });
-
-      // Refresh availabilities
-      fetchAvailabilities();
-    } catch (err) {
-      console.error("Error adding availability:", err);
-      setError("Failed to add availability slot. Please try again.");
-    }
-  };
-
   // Save multiple slots at once
   const saveSelectedSlots = async () => {
     if (selectedSlots.length === 0) {
@@ -307,16 +265,40 @@ const TeacherCalendarSchedule = () => {
     try {
       setLoading(true);
 
-      // Process each selected slot
-      for (const slotKey of selectedSlots) {
+      // Build every selected slot and save them in one bulk request
+      const slots = selectedSlots.map((slotKey) => {
         // Parse date and time from slot key
         const [dateStr, hour, minute] = slotKey.split("-");
-        const date = new Date(dateStr);
-        const timeSlot = { hour: parseInt(hour), minute: parseInt(minute) };
+        const startDateTime = new Date(dateStr);
+        startDateTime.setHours(parseInt(hour), parseInt(minute), 0, 0);
 
-        // Create and save each slot
-        await saveAvailabilitySlot(date, timeSlot);
-      }
+        const endDateTime = new Date(startDateTime);
+        endDateTime.setMinutes(startDateTime.getMinutes() + 30);
+
+        return {
+          start_time: startDateTime.toISOString(),
+          end_time: endDateTime.toISOString(),
+          price: slotPrices[slotKey] || defaultPrice,
+        };
+      });
+
+      await axios.post(
+        `${API_BASE_URL}/availability`,
+        {
+          teacher_id: auth.user.profile.sub,
+          currency: "INR",
+          slots,
+        },
+        {
+          headers: {
+            Authorization: `Bearer ${auth.user.access_token}`,
+            "Content-Type": "application/json",
+          },
+        }
+      );
+
+      // Refresh availabilities
+      fetchAvailabilities();
 
       // Clear slot prices for the saved slots
       const updatedSlotPrices = { ...slotPrices };
@@ -330,7 +312,11 @@ const TeacherCalendarSchedule = () => {
       setError("");
     } catch (err) {
       console.error("Error saving slots:", err);
-      setError("There was a problem saving your availability slots.");
+      if (err.response && err.response.status === 409) {
+        setError("Some selected slots overlap your existing availability or bookings.");
+      } else {
+        setError("There was a problem saving your availability slots.");
+      }
     } finally {
       setLoading(false);
     }
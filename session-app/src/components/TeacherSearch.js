@@ -274,7 +274,13 @@ const TeacherSearch = () => {
       alert("Session booked successfully! Check 'My Classes' to view your booking.");
     } catch (err) {
       console.error("Error completing booking:", err);
-      setError("Payment was processed but booking failed. Please contact support.");
+      if (err.response && err.response.status === 409) {
+        // Another student booked this slot first
+        setAvailabilities(availabilities.filter(slot => slot.availability_id !== availabilityId));
+        setError("Payment was processed but this time slot was just booked by someone else. Please contact support.");
+      } else {
+        setError("Payment was processed but booking failed. Please contact support.");
+      }
     } finally {
       setLoading(false);
       setPaymentProcessing(false);
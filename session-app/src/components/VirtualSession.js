@@ -21,7 +21,7 @@ const VirtualSession = ({ sessionId, onEndSession }) => {
   const [error, setError] = useState("");
   const [session, setSession] = useState(null);
   const [isRecording, setIsRecording] = useState(false);
-  const [notes, setNotes] = useState("");
+  const [notes, setNotes] = useState([]);
   const [sharedFiles, setSharedFiles] = useState([]);
   const [newNote, setNewNote] = useState("");
   const [fileUpload, setFileUpload] = useState(null);
@@ -56,6 +56,18 @@ const VirtualSession = ({ sessionId, onEndSession }) => {
   const logger = useRef(new ConsoleLogger('ChimeMeetingLogs', LogLevel.INFO));
   const deviceController = useRef(null);
   
+  // Incremental notes/files sync: last item cursor and ETag from /sessions/{id}/changes,
+  // plus the running sync and the one queued behind it, so syncs never overlap
+  const syncCursorRef = useRef(null);
+  const syncEtagRef = useRef(null);
+  const syncInFlightRef = useRef(null);
+  const syncQueuedRef = useRef(null);
+  
+  // Whether the current Chime session has connected, and whether a join that
+  // found its meeting already ended has been retried with a fresh meeting
+  const meetingConnectedRef = useRef(false);
+  const endedJoinRetriedRef = useRef(false);
+  
   // Refs for video elements
   const localVideoRef = useRef(null);
   const remoteVideoRef = useRef(null);
@@ -537,75 +549,134 @@ const VirtualSession = ({ sessionId, onEndSession }) => {
     }
   }, [remoteVideoRef.current, selectedAudioOutputDevice]);
   
+  // Fetch notes and files added since the last sync. Unchanged sessions answer
+  // with a bodyless 304, so polling during a live class stays cheap. Large
+  // backlogs come in pages; the sync position and ETag are only saved once the
+  // last page has arrived, so an interrupted sync starts over on the next poll.
+  const fetchSessionChanges = async () => {
+    const since = syncCursorRef.current;
+    let pageCursor = null;
+    
+    do {
+      const response = await axios.get(
+        `${API_BASE_URL}/sessions/${sessionId}/changes`,
+        {
+          params: {
+            ...(since ? { since } : {}),
+            ...(pageCursor ? { cursor: pageCursor } : {}),
+          },
+          headers: {
+            Authorization: `Bearer ${auth.user.access_token}`,
+            ...(syncEtagRef.current && !pageCursor ? { "If-None-Match": syncEtagRef.current } : {}),
+          },
+          validateStatus: (status) => status === 200 || status === 304,
+        }
+      );
+      
+      if (response.status === 304) return;
+      
+      appendSessionItems(response.data.items || []);
+      
+      pageCursor = response.data.next_cursor || null;
+      if (!pageCursor) {
+        syncEtagRef.current = response.headers.etag || null;
+        syncCursorRef.current = response.data.cursor;
+      }
+    } while (pageCursor);
+  };
+  
+  // The backend re-sends items from a short window before the cursor (another
+  // server may commit an item stamped earlier than one we already have), so
+  // keep only item_keys we have not seen
+  const appendSessionItems = (items) => {
+    const appendUnseen = (prev, added) => {
+      const seen = new Set(prev.map(item => item.item_key));
+      const unseen = added.filter(item => !seen.has(item.item_key));
+      if (!unseen.length) return prev;
+      return [...prev, ...unseen].sort((a, b) => (a.item_key < b.item_key ? -1 : a.item_key > b.item_key ? 1 : 0));
+    };
+    const newNotes = items.filter(item => item.item_type === 'note');
+    const newFiles = items.filter(item => item.item_type === 'document');
+    if (newNotes.length) setNotes(prev => appendUnseen(prev, newNotes));
+    if (newFiles.length) setSharedFiles(prev => appendUnseen(prev, newFiles));
+  };
+  
+  // Run one sync at a time. A call made while a sync is running waits for it and
+  // then syncs once more, so a caller that just wrote still sees its own item.
+  const syncSessionItems = () => {
+    if (syncInFlightRef.current) {
+      if (!syncQueuedRef.current) {
+        syncQueuedRef.current = syncInFlightRef.current
+          .catch(() => {})
+          .then(() => {
+            syncQueuedRef.current = null;
+            return syncSessionItems();
+          });
+      }
+      return syncQueuedRef.current;
+    }
+    
+    syncInFlightRef.current = fetchSessionChanges().finally(() => {
+      syncInFlightRef.current = null;
+    });
+    return syncInFlightRef.current;
+  };
+  
+  // Join the session; refresh asks the backend for a new join token instead of the stored one
+  const requestJoin = (refresh = false) => {
+    console.log('Joining session, user ID:', auth.user.profile.sub);
+    return axios.post(
+      `${API_BASE_URL}/sessions/${sessionId}/join`,
+      { user_id: auth.user.profile.sub, refresh },
+      {
+        headers: {
+          Authorization: `Bearer ${auth.user.access_token}`,
+          "Content-Type": "application/json",
+        },
+      }
+    );
+  };
+  
+  // Rejoin with a fresh join token after Chime rejected the stored one
+  const rejoinWithFreshToken = async () => {
+    try {
+      const joinResponse = await requestJoin(true);
+      const meetingData = joinResponse.data.meeting;
+      const attendeeData = joinResponse.data.attendee;
+      setMeetingId(meetingData.MeetingId);
+      setAttendeeId(attendeeData.AttendeeId);
+      await setupChimeMeeting(meetingData, attendeeData);
+    } catch (err) {
+      console.error("Error refreshing join token:", err);
+      setError("Failed to rejoin the virtual session. Please try again.");
+    }
+  };
+  
   useEffect(() => {
     // Fetch session details and set up the meeting
     const initializeSession = async () => {
       try {
         setLoading(true);
         
-        // 1. Fetch the session details
-        const sessionResponse = await axios.get(
-          `${API_BASE_URL}/sessions/${sessionId}`,
-          {
-            headers: {
-              Authorization: `Bearer ${auth.user.access_token}`,
-            },
-          }
-        );
+        // 1. Join the session: the backend loads the session, creates or reuses
+        // its Chime meeting and registers us as an attendee in one call
+        const joinResponse = await requestJoin();
         
-        setSession(sessionResponse.data);
+        const sessionData = joinResponse.data.session;
+        setSession(sessionData);
         
-        // Extract notes and shared files from session data
-        if (sessionResponse.data.notes && Array.isArray(sessionResponse.data.notes)) {
-          setNotes(sessionResponse.data.notes);
-        }
+        // Notes and shared files are stored separately from the session summary
+        await syncSessionItems();
         
-        if (sessionResponse.data.shared_documents && Array.isArray(sessionResponse.data.shared_documents)) {
-          setSharedFiles(sessionResponse.data.shared_documents);
-        }
-        
-        // 2. Create or get a Chime meeting for this session
-        console.log('Creating/getting Chime meeting for session:', sessionId);
-        const meetingResponse = await axios.post(
-          `${API_BASE_URL}/meetings`,
-          { session_id: sessionId },
-          {
-            headers: {
-              Authorization: `Bearer ${auth.user.access_token}`,
-              "Content-Type": "application/json",
-            },
-          }
-        );
-        
-        console.log('Meeting response:', meetingResponse.data);
-        
-        // Store the meeting details
-        const meetingData = meetingResponse.data.meeting;
+        // Store the meeting and attendee details
+        const meetingData = joinResponse.data.meeting;
+        const attendeeData = joinResponse.data.attendee;
         console.log('Meeting data:', meetingData);
-        setMeetingId(meetingData.MeetingId);
-        
-        // 3. Join the meeting as an attendee
-        console.log('Joining meeting as attendee, user ID:', auth.user.profile.sub);
-        const attendeeResponse = await axios.post(
-          `${API_BASE_URL}/attendees`,
-          { 
-            session_id: sessionId,
-            user_id: auth.user.profile.sub 
-          },
-          {
-            headers: {
-              Authorization: `Bearer ${auth.user.access_token}`,
-              "Content-Type": "application/json",
-            },
-          }
-        );
-        
-        console.log('Attendee response:', attendeeResponse.data);
-        const attendeeData = attendeeResponse.data.attendee;
         console.log('Attendee data:', attendeeData);
+        setMeetingId(meetingData.MeetingId);
         setAttendeeId(attendeeData.AttendeeId);
         
-        // 4. Set up the Chime meeting session
+        // 2. Set up the Chime meeting session
         await setupChimeMeeting(meetingData, attendeeData);
         
       } catch (err) {
@@ -639,6 +710,17 @@ const VirtualSession = ({ sessionId, onEndSession }) => {
     };
   }, [sessionId, auth.user.access_token, auth.user.profile.sub]);
   
+  // Poll for notes and files shared by the other participant while the session is open
+  useEffect(() => {
+    if (!session) return;
+    
+    const interval = setInterval(() => {
+      syncSessionItems().catch(err => console.warn('Error syncing session items:', err));
+    }, 5000);
+    
+    return () => clearInterval(interval);
+  }, [session, sessionId]);
+  
   const setupChimeMeeting = async (meetingData, attendeeData) => {
     try {
       console.log('Setting up Chime meeting with:', { meetingData, attendeeData });
@@ -830,13 +912,28 @@ const VirtualSession = ({ sessionId, onEndSession }) => {
       },
       
       // Meeting status events
+      audioVideoDidStart: () => {
+        meetingConnectedRef.current = true;
+      },
+      
       audioVideoDidStop: (sessionStatus) => {
         const sessionStatusCode = sessionStatus.statusCode();
+        const wasConnected = meetingConnectedRef.current;
+        meetingConnectedRef.current = false;
         setMeetingStatus('stopped');
         
-        if (sessionStatusCode === MeetingSessionStatusCode.MeetingEnded) {
+        if (sessionStatusCode === MeetingSessionStatusCode.MeetingEnded && !wasConnected && !endedJoinRetriedRef.current) {
+          // The meeting ended before we got in (Chime ends meetings nobody joins
+          // within minutes); refreshing makes the backend start a new one
+          console.log('Meeting ended while joining, requesting a new meeting');
+          endedJoinRetriedRef.current = true;
+          rejoinWithFreshToken();
+        } else if (sessionStatusCode === MeetingSessionStatusCode.MeetingEnded) {
           console.log('Meeting ended');
           if (onEndSession) onEndSession();
+        } else if (sessionStatusCode === MeetingSessionStatusCode.AudioAuthenticationRejected) {
+          console.log('Join token rejected, requesting a fresh one');
+          rejoinWithFreshToken();
         } else {
           console.log(`Meeting stopped with code: ${sessionStatusCode}`);
         }
@@ -1678,15 +1775,9 @@ const VirtualSession = ({ sessionId, onEndSession }) => {
         }
       );
       
-      // Add note to local state
-      const newNoteObj = {
-        text: newNote,
-        timestamp: new Date().toISOString(),
-        author_id: auth.user.profile.sub,
-      };
-      
-      setNotes([...notes, newNoteObj]);
+      // Pull the new note (and anything the other participant added) from the server
       setNewNote("");
+      await syncSessionItems();
     } catch (err) {
       console.error("Error adding note:", err);
       setError("Failed to add note. Please try again.");
@@ -1716,16 +1807,9 @@ const VirtualSession = ({ sessionId, onEndSession }) => {
         }
       );
       
-      // Add file to local state
-      const newFileObj = {
-        url: fileUrl,
-        name: fileUpload.name,
-        timestamp: new Date().toISOString(),
-        author_id: auth.user.profile.sub,
-      };
-      
-      setSharedFiles([...sharedFiles, newFileObj]);
+      // Pull the new file (and anything the other participant added) from the server
       setFileUpload(null);
+      await syncSessionItems();
     } catch (err) {
       console.error("Error uploading file:", err);
       setError("Failed to upload file. Please try again.");
@@ -19,6 +19,8 @@ const FinancialReports = ({ profile }) => {
     teacher_summary: {},
     payments: []
   });
+  const [paymentsCursor, setPaymentsCursor] = useState(null);
+  const [loadingPayments, setLoadingPayments] = useState(false);
   const [filters, setFilters] = useState({
     start_date: '',
     end_date: ''
@@ -42,12 +44,18 @@ const FinancialReports = ({ profile }) => {
         queryParams.end_date = new Date(filters.end_date).toISOString();
       }
       
-      const data = await PaymentService.getFinancialReports(queryParams, auth.user?.access_token);
-      setFinancialData(data || {
+      // Summary totals and the first page of transactions are separate requests
+      const [data, paymentsPage] = await Promise.all([
+        PaymentService.getFinancialReports(queryParams, auth.user?.access_token),
+        PaymentService.getFinancialReportPayments(queryParams, auth.user?.access_token)
+      ]);
+      setFinancialData({
         summary: { total_amount: 0, payment_count: 0 },
         teacher_summary: {},
-        payments: []
+        ...(data || {}),
+        payments: paymentsPage?.items || []
       });
+      setPaymentsCursor(paymentsPage?.next_cursor || null);
     } catch (err) {
       console.error('Error fetching financial reports:', err);
       setError('Failed to load financial reports. ' + err.message);
@@ -56,6 +64,32 @@ const FinancialReports = ({ profile }) => {
     }
   };
   
+  const loadMorePayments = async () => {
+    try {
+      setLoadingPayments(true);
+      
+      const queryParams = { cursor: paymentsCursor };
+      if (filters.start_date) {
+        queryParams.start_date = new Date(filters.start_date).toISOString();
+      }
+      if (filters.end_date) {
+        queryParams.end_date = new Date(filters.end_date).toISOString();
+      }
+      
+      const paymentsPage = await PaymentService.getFinancialReportPayments(queryParams, auth.user?.access_token);
+      setFinancialData(prev => ({
+        ...prev,
+        payments: [...prev.payments, ...(paymentsPage?.items || [])]
+      }));
+      setPaymentsCursor(paymentsPage?.next_cursor || null);
+    } catch (err) {
+      console.error('Error loading more payments:', err);
+      setError('Failed to load more payments. ' + err.message);
+    } finally {
+      setLoadingPayments(false);
+    }
+  };
+  
   const handleFilterChange = (e) => {
     const { name, value } = e.target;
     setFilters(prev => ({
@@ -279,6 +313,15 @@ const FinancialReports = ({ profile }) => {
         ) : (
           <p className="no-data">No payment transactions found for the selected period.</p>
         )}
+        {paymentsCursor && (
+          <button
+            className="load-more-button"
+            onClick={loadMorePayments}
+            disabled={loadingPayments}
+          >
+            {loadingPayments ? 'Loading...' : 'Load more transactions'}
+          </button>
+        )}
       </div>
     </div>
   );
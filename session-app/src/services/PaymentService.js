@@ -161,6 +161,32 @@ class PaymentService {
     }
   }
 
+  /**
+   * Get one page of the payment transactions behind a financial report (admin only)
+   * 
+   * @param {Object} filters - Report filters (date range, limit, cursor)
+   * @param {string} token - Authentication token
+   * @returns {Promise} - Promise resolving to { items, next_cursor }
+   */
+  async getFinancialReportPayments(filters, token) {
+    try {
+      const response = await axios.get(
+        `${API_BASE_URL}/admin/financial-reports/payments`,
+        {
+          params: filters,
+          headers: {
+            Authorization: `Bearer ${token}`
+          }
+        }
+      );
+      
+      return response.data;
+    } catch (error) {
+      console.error('Error fetching financial report payments:', error);
+      throw error;
+    }
+  }
+
   /**
    * Save RazorPay configuration (admin only)
    * 